@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth import get_user_model
+from .avatars import use_avatar_upload_handler
 from .serializers import UserSerializer, ProfileSerializer
 
 User = get_user_model()
@@ -12,6 +13,10 @@ User = get_user_model()
 class RegisterView(APIView):
     permission_classes = [AllowAny]
     
+    def initial(self, request, *args, **kwargs):
+        use_avatar_upload_handler(request._request)
+        super().initial(request, *args, **kwargs)
+    
     def post(self, request):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
@@ -55,5 +60,10 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
     
+    def initial(self, request, *args, **kwargs):
+        # Before the body is parsed: avatars are streamed to disk with a size cap
+        use_avatar_upload_handler(request._request)
+        super().initial(request, *args, **kwargs)
+    
     def get_object(self):
         return self.request.user
\ No newline at end of file
@@ -0,0 +1,194 @@
+import hashlib
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import close_old_connections, transaction
+from django.template.defaultfilters import filesizeformat
+
+logger = logging.getLogger(__name__)
+
+AVATAR_DIR = 'avatars'
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(getattr(settings, 'AVATAR_WORKERS', 1), 1),
+            thread_name_prefix='avatars'
+        )
+    return _executor
+
+
+def max_upload_size() -> int:
+    return getattr(settings, 'AVATAR_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+
+
+def avatar_sizes():
+    """Square edges in pixels, smallest first"""
+    return sorted(getattr(settings, 'AVATAR_SIZES', (64, 128, 256)))
+
+
+class AvatarUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded files to a temporary file chunk by chunk and stops writing once
+    a file passes AVATAR_MAX_UPLOAD_SIZE. The rest of an oversized file is read and
+    dropped; its size still reports the full length, so validation rejects it as too large.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.max_size = max_upload_size()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) <= self.max_size:
+            super().receive_data_chunk(raw_data, start)
+        return None
+
+
+def use_avatar_upload_handler(request):
+    """Handle the request's file uploads with AvatarUploadHandler; call before the body is read"""
+    request.upload_handlers = [AvatarUploadHandler(request)]
+
+
+def check_avatar_size(file):
+    if file.size > max_upload_size():
+        raise ValidationError(
+            f'Avatars must be at most {filesizeformat(max_upload_size())} '
+            f'(this one is {filesizeformat(file.size)}).'
+        )
+
+
+def validate_avatar(file):
+    """Size, format and pixel count of a new upload, read from its header without decoding it"""
+    if getattr(file, '_committed', False):
+        # Already stored and processed
+        return
+    check_avatar_size(file)
+
+    from PIL import Image
+    max_pixels = getattr(settings, 'AVATAR_MAX_PIXELS', 25_000_000)
+    try:
+        file.seek(0)
+        with Image.open(file) as image:
+            image_format, (width, height) = image.format, image.size
+    except (OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValidationError('Upload a valid image.')
+    finally:
+        file.seek(0)
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError(f'Avatars must be {", ".join(ALLOWED_FORMATS[:-1])} or {ALLOWED_FORMATS[-1]} images.')
+    if width * height > max_pixels:
+        raise ValidationError(f'Avatars must be at most {max_pixels // 1_000_000} megapixels.')
+
+
+class AvatarFormField(forms.ImageField):
+    """ImageField that reports oversized uploads as such, before trying to decode what was kept of them"""
+
+    def to_python(self, data):
+        if data and getattr(data, 'size', None) is not None:
+            check_avatar_size(data)
+        return super().to_python(data)
+
+
+def render_avatar(data: bytes) -> Dict[int, bytes]:
+    """
+    WebP avatars per size: centre-cropped squares, rotated per EXIF orientation and
+    written without metadata. Raises ValueError for anything Pillow cannot decode.
+    """
+    from PIL import Image, ImageOps
+
+    sizes = avatar_sizes()
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            # JPEGs decode straight to a reduced scale close to the largest size
+            source.draft('RGB', (sizes[-1], sizes[-1]))
+            image = ImageOps.exif_transpose(source)
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ValueError(f'Unreadable image: {exc}') from exc
+
+    rendered = {}
+    # Each size is scaled down from the next larger one rather than from the original
+    for size in reversed(sizes):
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='WEBP', quality=85, method=4)
+        rendered[size] = buffer.getvalue()
+    return rendered
+
+
+def store_avatar(user_id: int, data: bytes, size: int) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    return default_storage.save(f'{AVATAR_DIR}/{user_id}/{digest}-{size}.webp', ContentFile(data))
+
+
+def delete_files(names: Iterable[str]):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError as exc:
+            logger.warning(f"Cannot delete avatar file {name}: {exc}")
+
+
+def process_avatar(user_id: int, name: str) -> Dict[str, str]:
+    """
+    Replace an uploaded avatar by its resized variants and return them as
+    {size: stored name}. The user's avatar then points at the largest variant and
+    the upload is deleted. If the avatar changed meanwhile the result is discarded.
+    """
+    try:
+        with default_storage.open(name, 'rb') as fh:
+            rendered = render_avatar(fh.read())
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Cannot process avatar {name}: {exc}")
+        return {}
+
+    variants = {str(size): store_avatar(user_id, data, size) for size, data in rendered.items()}
+    largest = variants[str(max(rendered))]
+    updated = get_user_model().objects.filter(pk=user_id, avatar=name).update(
+        avatar=largest, avatar_variants=variants
+    )
+    delete_files([name] if updated else variants.values())
+    return variants if updated else {}
+
+
+def _run(user_id: int, name: str):
+    try:
+        process_avatar(user_id, name)
+    except Exception as e:
+        logger.error(f"Error in background avatar job: {str(e)}")
+    finally:
+        close_old_connections()
+
+
+def schedule_avatar(user_id: int, name: str, stale_files: Iterable[str] = ()):
+    """
+    Once the saving transaction commits, delete the files of the previous avatar
+    and process the new upload (if any) in the background, or inline with
+    AVATAR_WORKERS = 0.
+    """
+    stale_files = [stale for stale in stale_files if stale and stale != name]
+
+    def submit():
+        delete_files(stale_files)
+        if not name:
+            return
+        if getattr(settings, 'AVATAR_WORKERS', 1) <= 0:
+            process_avatar(user_id, name)
+        else:
+            _get_executor().submit(_run, user_id, name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:42
+
+import accounts.avatars
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, upload_to='avatars/', validators=[accounts.avatars.validate_avatar]),
+        ),
+    ]
@@ -1,9 +1,14 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.core.files.storage import default_storage
+from .avatars import schedule_avatar, validate_avatar
 
 class User(AbstractUser):
     name = models.CharField(max_length=100, blank=True)
-    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True, validators=[validate_avatar])
+    # Resized copies of the avatar by edge length, built in the background (see accounts.avatars);
+    # once they exist `avatar` is the largest of them
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -11,4 +16,45 @@ class User(AbstractUser):
         return self.name or self.username
 
     def get_full_name(self):
-        return self.name or self.username
\ No newline at end of file
+        return self.name or self.username
+
+    @property
+    def avatar_urls(self):
+        """Variant URLs keyed by edge length ('64', ...); empty while a new avatar is processed"""
+        return {size: default_storage.url(name) for size, name in self.avatar_variants.items()}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Avatar as loaded or last saved, to tell an avatar change from any other save
+        self._saved_avatar = self._avatar_name()
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or 'avatar' in fields:
+            self._saved_avatar = self._avatar_name()
+
+    def _avatar_name(self) -> str:
+        # Read without the descriptor so a deferred avatar is not loaded
+        value = self.__dict__.get('avatar')
+        return getattr(value, 'name', value) or ''
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        uploaded = bool(self.avatar) and not self.avatar._committed
+        changed = (uploaded or self._avatar_name() != self._saved_avatar) and (
+            update_fields is None or 'avatar' in update_fields
+        )
+        if changed:
+            # Files of the previous avatar are deleted once this save commits
+            stale = {self._saved_avatar, *self.avatar_variants.values()}
+            if self.pk:
+                stored = User.objects.filter(pk=self.pk).values_list('avatar', 'avatar_variants').first()
+                if stored:
+                    stale.update([stored[0], *stored[1].values()])
+            self.avatar_variants = {}
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'avatar_variants'}
+        super().save(*args, **kwargs)
+        if changed:
+            self._saved_avatar = self._avatar_name()
+            schedule_avatar(self.pk, self._saved_avatar, stale)
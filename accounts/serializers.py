@@ -1,27 +1,63 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from .avatars import validate_avatar
 
 User = get_user_model()
 
+def clean_avatar(value):
+    """
+    Size, format and pixel checks of accounts.avatars for an uploaded avatar. The
+    serializers take the avatar as a plain file so the size is checked before any
+    attempt to decode what the upload handler kept of an oversized file.
+    """
+    if value:
+        try:
+            validate_avatar(value)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+    return value
+
+class AvatarVariantsField(serializers.Field):
+    """Resized avatar URLs keyed by edge length, like `avatar` absolute when the request is known"""
+    
+    def __init__(self, **kwargs):
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+    
+    def to_representation(self, user):
+        request = self.context.get('request')
+        return {
+            size: request.build_absolute_uri(url) if request is not None else url
+            for size, url in user.avatar_urls.items()
+        }
+
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
+    avatar = serializers.FileField(max_length=100, required=False, allow_null=True)
+    avatar_variants = AvatarVariantsField()
     
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'name', 'password', 'avatar']
-        extra_kwargs = {
-            'password': {'write_only': True}
-        }
+        fields = ['id', 'username', 'email', 'name', 'password', 'avatar', 'avatar_variants']
+        extra_kwargs = {'password': {'write_only': True}}
+    
+    def validate_avatar(self, value):
+        return clean_avatar(value)
     
     def create(self, validated_data):
-        password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # One save: a second one would write back the avatar columns the background job rewrites
+        return User.objects.create_user(**validated_data)
 
 class ProfileSerializer(serializers.ModelSerializer):
+    # Navbars should use a small variant rather than the full `avatar`
+    avatar = serializers.FileField(max_length=100, required=False, allow_null=True)
+    avatar_variants = AvatarVariantsField()
+    
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'name', 'avatar', 'created_at']
-        read_only_fields = ['id', 'username', 'created_at']
\ No newline at end of file
+        fields = ['id', 'username', 'email', 'name', 'avatar', 'avatar_variants', 'created_at']
+        read_only_fields = ['id', 'username', 'created_at']
+    
+    def validate_avatar(self, value):
+        return clean_avatar(value)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import io
+import os
+import tempfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+
+User = get_user_model()
+
+
+class AvatarSaveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw')
+
+    def test_plain_save_leaves_the_avatar_alone(self):
+        User.objects.filter(pk=self.user.pk).update(avatar='avatars/1/a-256.webp', avatar_variants={'256': 'avatars/1/a-256.webp'})
+        with mock.patch('accounts.models.schedule_avatar') as schedule:
+            user = User.objects.get(pk=self.user.pk)
+            user.name = 'Tess'
+            user.save()
+            self.user.save()
+        schedule.assert_not_called()
+
+    def test_clearing_the_avatar_deletes_its_files(self):
+        User.objects.filter(pk=self.user.pk).update(avatar='avatars/1/a-256.webp', avatar_variants={'256': 'avatars/1/a-256.webp'})
+        user = User.objects.get(pk=self.user.pk)
+        user.avatar = None
+        with mock.patch('accounts.models.schedule_avatar') as schedule:
+            user.save()
+        schedule.assert_called_once_with(user.pk, '', {'avatars/1/a-256.webp'})
+        user.refresh_from_db()
+        self.assertEqual(user.avatar_variants, {})
+
+
+class AvatarUploadTests(TestCase):
+    def upload(self, upload):
+        return self.client.patch(
+            '/api/accounts/profile/', encode_multipart(BOUNDARY, {'avatar': upload}),
+            content_type=MULTIPART_CONTENT,
+        )
+
+    @override_settings(AVATAR_MAX_UPLOAD_SIZE=1000)
+    def test_oversized_upload_is_reported_as_too_large(self):
+        self.client.force_login(User.objects.create_user('tester', password='pw'))
+        upload = SimpleUploadedFile('me.jpg', os.urandom(5000), 'image/jpeg')
+        response = self.upload(upload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Avatars must be at most', response.json()['avatar'][0])
+
+    @override_settings(AVATAR_WORKERS=0)
+    def test_upload_is_resized_and_stripped_of_metadata(self):
+        user = User.objects.create_user('tester', password='pw')
+        self.client.force_login(user)
+        exif = Image.Exif()
+        exif[0x0110] = 'Secret Camera'  # Model
+        exif[0x013b] = 'Tess Tester'  # Artist
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display
+        source = io.BytesIO()
+        Image.new('RGB', (3000, 2000), (200, 40, 40)).save(source, 'JPEG', exif=exif.tobytes())
+        self.assertIn(b'Secret Camera', source.getvalue())
+
+        media = self.enterContext(tempfile.TemporaryDirectory())
+        with self.settings(MEDIA_ROOT=media):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload(SimpleUploadedFile('me.jpg', source.getvalue(), 'image/jpeg'))
+            self.assertEqual(response.status_code, 200)
+            user.refresh_from_db()
+            self.assertEqual(sorted(user.avatar_variants, key=int), ['64', '128', '256'])
+            self.assertEqual(user.avatar.name, user.avatar_variants['256'])
+            # The original upload is deleted once the variants exist
+            stored = {
+                os.path.relpath(os.path.join(directory, name), media)
+                for directory, _, names in os.walk(media) for name in names
+            }
+            self.assertEqual(stored, set(user.avatar_variants.values()))
+            for size, name in user.avatar_variants.items():
+                with self.subTest(size=size):
+                    with default_storage.open(name) as stored:
+                        data = stored.read()
+                    self.assertNotIn(b'Secret Camera', data)
+                    self.assertNotIn(b'Tess Tester', data)
+                    with Image.open(io.BytesIO(data)) as image:
+                        self.assertEqual(image.format, 'WEBP')
+                        self.assertEqual(image.size, (int(size), int(size)))
+                        self.assertNotIn('exif', image.info)
+                        self.assertEqual(len(image.getexif()), 0)
@@ -60,7 +60,7 @@ const Layout = ({ children }) => {
             <div className="flex-shrink-0">
               {user?.avatar ? (
                 <img
-                  src={user.avatar}
+                  src={user.avatar_variants?.['64'] || user.avatar}
                   alt={user.name}
                   className="rounded-circle"
                   width="32"
@@ -163,7 +163,8 @@ const AnalyticsPage = () => {
                 analytics.most_worn.slice(0, 5).map((item, index) => (
                   <div key={index} className="d-flex align-items-center mb-3">
                     <img
-                      src={item.image_url}
+                      src={item.thumbnail_url}
+                      loading="lazy"
                       alt={item.name}
                       className="rounded me-3"
                       style={{ width: '48px', height: '48px', objectFit: 'cover' }}
@@ -196,7 +197,8 @@ const AnalyticsPage = () => {
                 analytics.least_worn.slice(0, 5).map((item, index) => (
                   <div key={index} className="d-flex align-items-center mb-3">
                     <img
-                      src={item.image_url}
+                      src={item.thumbnail_url}
+                      loading="lazy"
                       alt={item.name}
                       className="rounded me-3"
                       style={{ width: '48px', height: '48px', objectFit: 'cover' }}
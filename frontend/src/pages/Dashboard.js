@@ -138,7 +138,8 @@ const Dashboard = () => {
                   {analytics.most_worn.slice(0, 5).map((item, index) => (
                     <div key={index} className="d-flex align-items-center mb-3">
                       <img
-                        src={item.image_url}
+                        src={item.thumbnail_url}
+                        loading="lazy"
                         alt={item.name}
                         className="rounded me-3"
                         style={{ width: '48px', height: '48px', objectFit: 'cover' }}
@@ -178,7 +179,8 @@ const Dashboard = () => {
                     <div key={index} className="col-md-4 col-lg-2">
                       <div className="text-center">
                         <img
-                          src={item.image_url}
+                          src={item.thumbnail_url}
+                          loading="lazy"
                           alt={item.name}
                           className="rounded mb-2"
                           style={{ width: '80px', height: '80px', objectFit: 'cover' }}
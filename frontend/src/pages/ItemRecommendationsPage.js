@@ -95,7 +95,7 @@ const ItemRecommendationsPage = () => {
           <div className="row align-items-center">
             <div className="col-auto">
               <img
-                src={recommendations.item?.image_url}
+                src={recommendations.item?.thumbnail_url}
                 alt={recommendations.item_name}
                 className="rounded"
                 style={{ width: '80px', height: '80px', objectFit: 'cover' }}
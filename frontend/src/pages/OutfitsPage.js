@@ -3,16 +3,19 @@ import axios from 'axios';
 
 const OutfitsPage = () => {
   const [outfits, setOutfits] = useState([]);
+  const [nextUrl, setNextUrl] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchOutfits();
   }, []);
 
-  const fetchOutfits = async () => {
+  const fetchOutfits = async (url = null) => {
     try {
-      const response = await axios.get('/api/outfits/');
-      setOutfits(response.data);
+      // Cursor-paginated: follow `next` to append the following page
+      const response = await axios.get(url || '/api/outfits/');
+      setOutfits(url ? [...outfits, ...response.data.results] : response.data.results);
+      setNextUrl(response.data.next);
     } catch (error) {
       console.error('Error fetching outfits:', error);
     } finally {
@@ -83,7 +86,8 @@ const OutfitsPage = () => {
                     {outfit.items.slice(0, 4).map((item, index) => (
                       <div key={index} className="col-6">
                         <img
-                          src={item.image_url}
+                          src={item.thumbnail_url}
+                          loading="lazy"
                           alt={item.name}
                           className="w-100 h-100 object-fit-cover rounded"
                           onError={(e) => {
@@ -134,6 +138,13 @@ const OutfitsPage = () => {
               </div>
             </div>
           ))}
+          {nextUrl && (
+            <div className="col-12 text-center">
+              <button onClick={() => fetchOutfits(nextUrl)} className="btn btn-outline-primary">
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="text-center py-5">
@@ -4,6 +4,7 @@ import axios from 'axios';
 
 const WardrobePage = () => {
   const [items, setItems] = useState([]);
+  const [nextUrl, setNextUrl] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showAddModal, setShowAddModal] = useState(false);
   const [formData, setFormData] = useState({
@@ -24,10 +25,12 @@ const WardrobePage = () => {
     fetchItems();
   }, []);
 
-  const fetchItems = async () => {
+  const fetchItems = async (url = null) => {
     try {
-      const response = await axios.get('/api/wardrobe-items/');
-      setItems(response.data);
+      // Cursor-paginated: follow `next` to append the following page
+      const response = await axios.get(url || '/api/wardrobe-items/');
+      setItems(url ? [...items, ...response.data.results] : response.data.results);
+      setNextUrl(response.data.next);
     } catch (error) {
       console.error('Error fetching items:', error);
     } finally {
@@ -145,7 +148,8 @@ const WardrobePage = () => {
               <div className="wardrobe-item-card">
                 <div className="item-image">
                   <img
-                    src={item.image_url}
+                    src={item.thumbnail_url}
+                    loading="lazy"
                     alt={item.name}
                     onError={(e) => {
                       e.target.src = 'https://images.pexels.com/photos/996329/pexels-photo-996329.jpeg?auto=compress&cs=tinysrgb&w=300';
@@ -202,6 +206,13 @@ const WardrobePage = () => {
               </div>
             </div>
           ))}
+          {nextUrl && (
+            <div className="col-12 text-center">
+              <button onClick={() => fetchItems(nextUrl)} className="btn btn-outline-primary">
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="text-center py-5">
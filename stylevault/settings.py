@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'wardrobe.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -131,7 +132,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'wardrobe.profiling.ProfiledJSONRenderer',
     ],
 }
 
@@ -144,4 +145,104 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # OpenAI API Key for AI recommendations
-OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
\ No newline at end of file
+OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
+
+# LLM client used for shopping suggestions; 'wardrobe.llm.LocalStylistClient' works offline
+AI_LLM_CLIENT = config('AI_LLM_CLIENT', default='wardrobe.llm.OpenAIChatClient')
+AI_LOCAL_LLM_DELAY = config('AI_LOCAL_LLM_DELAY', default=0, cast=float)
+# Seconds before an LLM request is abandoned (the shopping suggestions fall back to mock data)
+AI_LLM_TIMEOUT = config('AI_LLM_TIMEOUT', default=30, cast=float)
+
+# Color families and their compatibility table used by the recommendation rules; after
+# changing it, run rebuild_compatibility_index (and backfill_style_features)
+WARDROBE_COLOR_KNOWLEDGE_BASE = config('WARDROBE_COLOR_KNOWLEDGE_BASE', default='wardrobe.colors.ColorKnowledgeBase')
+
+# Background workers rebuilding a user's compatibility index after a bulk import (0 runs
+# the rebuild inline when the import commits)
+WARDROBE_INDEX_WORKERS = config('WARDROBE_INDEX_WORKERS', default=1, cast=int)
+
+# Background workers computing LLM suggestions for ?async=1 recommendation requests (0 runs
+# them inline). Job state is kept in the database so any process can answer a poll; a job
+# still pending after AI_RECOMMENDATION_JOB_TTL seconds (its process died) reports failed.
+AI_RECOMMENDATION_WORKERS = config('AI_RECOMMENDATION_WORKERS', default=4, cast=int)
+AI_RECOMMENDATION_JOB_TTL = config('AI_RECOMMENDATION_JOB_TTL', default=600, cast=int)
+
+# Maximum concurrent LLM requests for /api/recommendations/batch/
+AI_BATCH_MAX_CONCURRENCY = config('AI_BATCH_MAX_CONCURRENCY', default=8, cast=int)
+
+# Item image thumbnails, built in the background under MEDIA_ROOT/thumbs/ (see wardrobe.thumbnails).
+# The fetcher is pluggable: 'wardrobe.thumbnails.LocalImageFetcher' reads URL paths below
+# WARDROBE_IMAGE_FETCHER_ROOT instead of downloading (for tests and offline development).
+WARDROBE_THUMBNAILS = config('WARDROBE_THUMBNAILS', default=True, cast=bool)
+WARDROBE_IMAGE_FETCHER = config('WARDROBE_IMAGE_FETCHER', default='wardrobe.thumbnails.HTTPImageFetcher')
+WARDROBE_IMAGE_FETCHER_ROOT = config('WARDROBE_IMAGE_FETCHER_ROOT', default=str(BASE_DIR / 'media'))
+WARDROBE_IMAGE_FETCH_TIMEOUT = config('WARDROBE_IMAGE_FETCH_TIMEOUT', default=10, cast=float)
+WARDROBE_IMAGE_MAX_BYTES = config('WARDROBE_IMAGE_MAX_BYTES', default=10 * 1024 * 1024, cast=int)
+WARDROBE_IMAGE_MAX_PIXELS = config('WARDROBE_IMAGE_MAX_PIXELS', default=40_000_000, cast=int)
+# Bounding box edges in pixels; 'avif' is used when Pillow can encode it
+WARDROBE_THUMBNAIL_SIZES = (160, 320, 640)
+WARDROBE_THUMBNAIL_DEFAULT_SIZE = 320
+WARDROBE_THUMBNAIL_FORMATS = ('avif', 'webp')
+# 0 builds thumbnails inline when the saving transaction commits
+WARDROBE_THUMBNAIL_WORKERS = config('WARDROBE_THUMBNAIL_WORKERS', default=2, cast=int)
+
+# Avatar uploads: streamed to disk in chunks, capped, then replaced in the background by
+# metadata-free WebP squares of these sizes (0 workers processes them inline after commit)
+AVATAR_MAX_UPLOAD_SIZE = config('AVATAR_MAX_UPLOAD_SIZE', default=5 * 1024 * 1024, cast=int)
+AVATAR_MAX_PIXELS = config('AVATAR_MAX_PIXELS', default=25_000_000, cast=int)
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_WORKERS = config('AVATAR_WORKERS', default=1, cast=int)
+
+# Caches
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Content-addressed LLM shopping suggestions; locmem evicts least recently used entries
+    'ai_suggestions': {
+        'BACKEND': config('AI_SUGGESTION_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('AI_SUGGESTION_CACHE_LOCATION', default='ai-suggestions'),
+        'TIMEOUT': config('AI_SUGGESTION_CACHE_TTL', default=60 * 60 * 24 * 7, cast=int),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('AI_SUGGESTION_CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
+    },
+}
+AI_SUGGESTION_CACHE = 'ai_suggestions'
+
+# Wardrobe snapshots kept in memory per process, least recently used evicted first
+WARDROBE_SNAPSHOT_CACHE_SIZE = config('WARDROBE_SNAPSHOT_CACHE_SIZE', default=256, cast=int)
+# Read API responses cached per user and wardrobe version (also served as ETag/304)
+WARDROBE_RESPONSE_CACHE = config('WARDROBE_RESPONSE_CACHE', default='default')
+WARDROBE_RESPONSE_CACHE_TTL = config('WARDROBE_RESPONSE_CACHE_TTL', default=300, cast=int)
+
+# Request profiling (wardrobe.profiling.ProfilingMiddleware): SQL count and time, serialization
+# and LLM time per URL name, exported at /api/metrics/ in Prometheus text format
+WARDROBE_PROFILING = config('WARDROBE_PROFILING', default=True, cast=bool)
+# Server-Timing response header with the profile (exposes internals; off unless DEBUG)
+WARDROBE_SERVER_TIMING = config('WARDROBE_SERVER_TIMING', default=DEBUG, cast=bool)
+# /api/metrics/ is staff-only; list scraper addresses here to let them in without a login.
+# Only the direct peer address is checked, so never list a reverse proxy's address.
+WARDROBE_METRICS_ALLOWED_IPS = config('WARDROBE_METRICS_ALLOWED_IPS', default='', cast=Csv())
+# Per-endpoint budgets keyed by '<METHOD> <url name>' (or the bare url name for any method):
+# 'queries', 'total_ms', 'sql_ms', 'serialize_ms' or 'llm_ms'.
+# Query counts include the session, user and wardrobe version lookups, and stay flat as
+# wardrobes grow.
+WARDROBE_PERFORMANCE_BUDGETS = {
+    'GET wardrobe_api:wardrobe-items': {'queries': 4},
+    'GET wardrobe_api:wardrobe-item-detail': {'queries': 4},
+    'POST wardrobe_api:increment-wear': {'queries': 13},
+    'GET wardrobe_api:ai-recommendations': {'queries': 6},
+    'POST wardrobe_api:batch-recommendations': {'queries': 5},
+    'GET wardrobe_api:outfits': {'queries': 5},
+    'GET wardrobe_api:outfit-detail': {'queries': 5},
+    'GET wardrobe_api:outfit-suggest': {'queries': 6},
+    'GET wardrobe_api:analytics': {'queries': 9},
+    'GET wardrobe:dashboard': {'queries': 8},
+    'GET wardrobe:wardrobe_list': {'queries': 3},
+    'GET wardrobe:outfit_list': {'queries': 4},
+    'GET wardrobe:outfit_detail': {'queries': 4},
+    'GET wardrobe:analytics': {'queries': 8},
+}
+# Raise BudgetExceeded instead of logging a warning; turn on in tests so regressions fail them
+WARDROBE_PERFORMANCE_BUDGETS_STRICT = config('WARDROBE_PERFORMANCE_BUDGETS_STRICT', default=False, cast=bool)
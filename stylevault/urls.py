@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from wardrobe.thumbnails import THUMBNAIL_DIR
+from wardrobe.views import serve_thumbnail
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,6 +11,8 @@ urlpatterns = [
     path('api/accounts/', include('accounts.api_urls')),
     path('', include('wardrobe.urls')),
     path('accounts/', include('accounts.urls')),
+    # Served in every environment, ahead of the DEBUG-only media route, for its cache headers
+    path(f'{settings.MEDIA_URL.lstrip("/")}{THUMBNAIL_DIR}/<path:name>', serve_thumbnail, name='thumbnail'),
 ]
 
 if settings.DEBUG:
@@ -1,28 +1,36 @@
-import openai
 import json
-import requests
-from django.conf import settings
 from typing import List, Dict, Any
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from .compatibility import WardrobeMatrix, MATCH_THRESHOLD, match_entry
+from .models import ItemCompatibility
+from .suggestion_cache import get_or_compute_suggestions, suggestion_cache_key
+from .llm import get_llm_client
+from .colors import get_color_knowledge_base, normalize_color, item_color_family
+from .style_features import item_features, styles_from_mask, seasons_from_mask
+from .profiling import profile_section
 
 logger = logging.getLogger(__name__)
 
 class AIRecommendationEngine:
-    def __init__(self):
-        self.openai_api_key = settings.OPENAI_API_KEY
-        if self.openai_api_key:
-            openai.api_key = self.openai_api_key
+    def __init__(self, llm_client=None):
+        self.llm_client = llm_client or get_llm_client()
+        self.colors = get_color_knowledge_base()
     
-    def get_recommendations_for_item(self, item, user_wardrobe_items) -> Dict[str, Any]:
+    def get_recommendations_for_item(self, item, user_wardrobe_items=None, include_suggestions=True,
+                                     shopping_suggestions=None) -> Dict[str, Any]:
         """
-        Generate AI-powered recommendations for a wardrobe item
+        Generate AI-powered recommendations for a wardrobe item.
+        Without user_wardrobe_items, matches come from the precomputed compatibility index.
+        With include_suggestions=False only the rule-based parts are computed (no LLM call).
         """
         try:
             # Get existing wardrobe matches
             existing_matches = self._find_existing_matches(item, user_wardrobe_items)
             
             # Get AI-powered shopping suggestions
-            shopping_suggestions = self._get_ai_shopping_suggestions(item)
+            if shopping_suggestions is None:
+                shopping_suggestions = self._get_ai_shopping_suggestions(item) if include_suggestions else []
             
             # Generate style analysis
             style_analysis = self._analyze_item_style(item)
@@ -40,32 +48,70 @@ class AIRecommendationEngine:
             logger.error(f"Error generating recommendations: {str(e)}")
             return self._get_fallback_recommendations(item, user_wardrobe_items)
     
-    def _find_existing_matches(self, item, user_items) -> List[Dict]:
-        """Find matching items in user's existing wardrobe"""
-        matches = []
+    def get_recommendations_for_items(self, items, user_wardrobe_items, max_concurrency=4) -> List[Dict[str, Any]]:
+        """
+        Generate recommendations for several items of one wardrobe.
+        The wardrobe is encoded once and LLM prompts run concurrently, at most max_concurrency in flight.
+        """
+        # An item never matches itself (no category pairs with its own), so the
+        # wardrobe can include the requested items; a prebuilt WardrobeMatrix is used as is
+        matrix = user_wardrobe_items
+        if not isinstance(matrix, WardrobeMatrix):
+            matrix = self.build_wardrobe_matrix(user_wardrobe_items)
+        suggestions = self._get_batch_shopping_suggestions(items, max_concurrency)
+        
+        return [
+            self.get_recommendations_for_item(item, matrix, shopping_suggestions=item_suggestions)
+            for item, item_suggestions in zip(items, suggestions)
+        ]
+    
+    def _get_batch_shopping_suggestions(self, items, max_concurrency) -> List[List[Dict]]:
+        """Shopping suggestions per item, one LLM request per distinct prompt"""
+        if self.llm_client is None:
+            return [self._get_mock_shopping_suggestions(item) for item in items]
+        
+        prompts = {}
+        for item in items:
+            prompts.setdefault(suggestion_cache_key(item), item)
         
-        for wardrobe_item in user_items:
-            compatibility_score = self._calculate_compatibility(item, wardrobe_item)
-            if compatibility_score > 0.6:
-                matches.append({
-                    'id': wardrobe_item.id,
-                    'name': wardrobe_item.name,
-                    'category': wardrobe_item.category,
-                    'color': wardrobe_item.color,
-                    'brand': wardrobe_item.brand,
-                    'image_url': wardrobe_item.image_url,
-                    'compatibility_score': compatibility_score,
-                    'reason': self._get_compatibility_reason(item, wardrobe_item)
-                })
+        # Worker threads don't see the request profile, so the whole fan-out counts as LLM time
+        with profile_section('llm'), \
+                ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts)))) as executor:
+            results = dict(zip(prompts, executor.map(self._get_ai_shopping_suggestions, prompts.values())))
         
-        return sorted(matches, key=lambda x: x['compatibility_score'], reverse=True)[:5]
+        return [results[suggestion_cache_key(item)] for item in items]
+    
+    def _find_existing_matches(self, item, user_items) -> List[Dict]:
+        """Find matching items in user's existing wardrobe"""
+        if user_items is None:
+            return self._find_indexed_matches(item)
+        
+        # Scores the whole wardrobe in one vectorized pass; callers scoring several
+        # items against the same wardrobe can pass a prebuilt WardrobeMatrix
+        if not isinstance(user_items, WardrobeMatrix):
+            user_items = self.build_wardrobe_matrix(user_items)
+        return user_items.top_matches(item, k=5, threshold=MATCH_THRESHOLD)
+    
+    def _find_indexed_matches(self, item, limit=5) -> List[Dict]:
+        """Top matches from the compatibility index maintained on item writes"""
+        entries = ItemCompatibility.objects.filter(item=item).select_related('match').order_by(
+            '-score', '-match__created_at'
+        )[:limit]
+        return [
+            match_entry(item, entry.match, entry.score, entry.colors_match, entry.categories_match)
+            for entry in entries
+        ]
+    
+    def build_wardrobe_matrix(self, user_items) -> WardrobeMatrix:
+        """Encode a user's wardrobe once for batched compatibility scoring"""
+        return WardrobeMatrix(user_items, self)
     
     def _calculate_compatibility(self, item1, item2) -> float:
         """Calculate compatibility score between two items"""
         score = 0.0
         
         # Color compatibility
-        if self._colors_match(item1.color, item2.color):
+        if self._families_match(item_color_family(item1), item_color_family(item2)):
             score += 0.3
         
         # Category compatibility
@@ -79,31 +125,12 @@ class AIRecommendationEngine:
         return min(score, 1.0)
     
     def _colors_match(self, color1: str, color2: str) -> bool:
-        """Check if colors are compatible"""
-        neutral_colors = ['white', 'black', 'gray', 'grey', 'beige', 'cream', 'navy']
-        complementary_pairs = [
-            ('blue', 'white'), ('black', 'white'), ('navy', 'white'),
-            ('red', 'black'), ('blue', 'denim'), ('brown', 'cream')
-        ]
-        
-        color1_lower = color1.lower()
-        color2_lower = color2.lower()
-        
-        # Same color family
-        if color1_lower == color2_lower:
-            return True
-        
-        # Neutral colors go with everything
-        if color1_lower in neutral_colors or color2_lower in neutral_colors:
-            return True
-        
-        # Check complementary pairs
-        for pair in complementary_pairs:
-            if (color1_lower in pair[0] and color2_lower in pair[1]) or \
-               (color1_lower in pair[1] and color2_lower in pair[0]):
-                return True
-        
-        return False
+        """Check if two free-text colors are compatible"""
+        return self._families_match(normalize_color(color1), normalize_color(color2))
+    
+    def _families_match(self, family1: str, family2: str) -> bool:
+        """Check if two canonical color families are compatible (table lookup)"""
+        return self.colors.match(family1, family2)
     
     def _categories_compatible(self, cat1: str, cat2: str) -> bool:
         """Check if categories work well together"""
@@ -127,7 +154,7 @@ class AIRecommendationEngine:
         """Generate a reason for why items are compatible"""
         reasons = []
         
-        if self._colors_match(item1.color, item2.color):
+        if self._families_match(item_color_family(item1), item_color_family(item2)):
             reasons.append(f"Colors {item1.color} and {item2.color} complement each other")
         
         if self._categories_compatible(item1.category, item2.category):
@@ -141,40 +168,49 @@ class AIRecommendationEngine:
     
     def _get_ai_shopping_suggestions(self, item) -> List[Dict]:
         """Get AI-powered shopping suggestions from external sources"""
-        if not self.openai_api_key:
+        if self.llm_client is None:
             return self._get_mock_shopping_suggestions(item)
         
         try:
-            # Create a prompt for OpenAI
-            prompt = f"""
-            I have a {item.category.lower()} that is {item.color} in color, made by {item.brand or 'unknown brand'}.
-            The item is called "{item.name}".
-            
-            Please suggest 5 complementary clothing items that would pair well with this item.
-            For each suggestion, provide:
-            1. Item name
-            2. Category
-            3. Suggested colors
-            4. Price range
-            5. Why it pairs well
-            
-            Format the response as JSON with this structure:
-            {{
-                "suggestions": [
-                    {{
-                        "name": "item name",
-                        "category": "category",
-                        "colors": ["color1", "color2"],
-                        "price_range": "price range",
-                        "reason": "why it pairs well",
-                        "style": "style description"
-                    }}
-                ]
-            }}
-            """
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
+            # Identical prompts are answered from the content-addressed cache
+            return get_or_compute_suggestions(item, lambda: self._request_ai_shopping_suggestions(item))
+        
+        except Exception as e:
+            logger.error(f"Error getting AI suggestions: {str(e)}")
+            return self._get_mock_shopping_suggestions(item)
+    
+    def _request_ai_shopping_suggestions(self, item) -> List[Dict]:
+        """Ask the LLM for shopping suggestions; raises on API or parsing errors"""
+        # Create a prompt for OpenAI
+        prompt = f"""
+        I have a {item.category.lower()} that is {item.color} in color, made by {item.brand or 'unknown brand'}.
+        The item is called "{item.name}".
+        
+        Please suggest 5 complementary clothing items that would pair well with this item.
+        For each suggestion, provide:
+        1. Item name
+        2. Category
+        3. Suggested colors
+        4. Price range
+        5. Why it pairs well
+        
+        Format the response as JSON with this structure:
+        {{
+            "suggestions": [
+                {{
+                    "name": "item name",
+                    "category": "category",
+                    "colors": ["color1", "color2"],
+                    "price_range": "price range",
+                    "reason": "why it pairs well",
+                    "style": "style description"
+                }}
+            ]
+        }}
+        """
+        
+        with profile_section('llm'):
+            ai_response = self.llm_client.complete(
                 messages=[
                     {"role": "system", "content": "You are a professional fashion stylist and personal shopper."},
                     {"role": "user", "content": prompt}
@@ -182,26 +218,20 @@ class AIRecommendationEngine:
                 max_tokens=1000,
                 temperature=0.7
             )
-            
-            ai_response = response.choices[0].message.content
-            suggestions_data = json.loads(ai_response)
-            
-            # Enhance suggestions with mock product data
-            enhanced_suggestions = []
-            for suggestion in suggestions_data.get('suggestions', []):
-                enhanced_suggestions.append({
-                    **suggestion,
-                    'image_url': self._get_mock_product_image(suggestion['category']),
-                    'store': self._get_suggested_store(suggestion.get('price_range', '')),
-                    'link': '#',  # In real implementation, this would be actual product links
-                    'price': self._extract_price_from_range(suggestion.get('price_range', ''))
-                })
-            
-            return enhanced_suggestions[:5]
-        
-        except Exception as e:
-            logger.error(f"Error getting AI suggestions: {str(e)}")
-            return self._get_mock_shopping_suggestions(item)
+        suggestions_data = json.loads(ai_response)
+        
+        # Enhance suggestions with mock product data
+        enhanced_suggestions = []
+        for suggestion in suggestions_data.get('suggestions', []):
+            enhanced_suggestions.append({
+                **suggestion,
+                'image_url': self._get_mock_product_image(suggestion['category']),
+                'store': self._get_suggested_store(suggestion.get('price_range', '')),
+                'link': '#',  # In real implementation, this would be actual product links
+                'price': self._extract_price_from_range(suggestion.get('price_range', ''))
+            })
+        
+        return enhanced_suggestions[:5]
     
     def _get_mock_shopping_suggestions(self, item) -> List[Dict]:
         """Fallback mock suggestions when AI is not available"""
@@ -276,81 +306,28 @@ class AIRecommendationEngine:
         ])
     
     def _analyze_item_style(self, item) -> Dict[str, Any]:
-        """Analyze the style characteristics of an item"""
-        style_keywords = {
-            'casual': ['casual', 'relaxed', 'comfortable', 'everyday'],
-            'formal': ['formal', 'dress', 'business', 'professional'],
-            'trendy': ['trendy', 'fashion', 'modern', 'contemporary'],
-            'classic': ['classic', 'timeless', 'traditional', 'elegant']
-        }
-        
-        item_text = f"{item.name} {' '.join(item.tags)}".lower()
-        detected_styles = []
-        
-        for style, keywords in style_keywords.items():
-            if any(keyword in item_text for keyword in keywords):
-                detected_styles.append(style)
-        
-        if not detected_styles:
-            detected_styles = ['versatile']
+        """Analyze the style characteristics of an item (stored on save, see style_features)"""
+        features = item_features(item)
         
         return {
-            'primary_style': detected_styles[0] if detected_styles else 'versatile',
-            'style_tags': detected_styles,
-            'formality_level': self._determine_formality(item),
-            'versatility_score': self._calculate_versatility(item),
-            'seasonal_suitability': self._determine_seasonality(item)
+            'primary_style': features['primary_style'],
+            'style_tags': styles_from_mask(features['style_mask']),
+            'formality_level': features['formality'],
+            'versatility_score': features['versatility'],
+            'seasonal_suitability': seasons_from_mask(features['season_mask'])
         }
     
     def _determine_formality(self, item) -> str:
         """Determine the formality level of an item"""
-        formal_indicators = ['suit', 'dress', 'blazer', 'formal', 'business']
-        casual_indicators = ['jeans', 'casual', 't-shirt', 'sneakers', 'hoodie']
-        
-        item_text = f"{item.name} {' '.join(item.tags)}".lower()
-        
-        if any(indicator in item_text for indicator in formal_indicators):
-            return 'formal'
-        elif any(indicator in item_text for indicator in casual_indicators):
-            return 'casual'
-        else:
-            return 'smart-casual'
+        return item_features(item)['formality']
     
     def _calculate_versatility(self, item) -> float:
         """Calculate how versatile an item is (0-1 scale)"""
-        versatile_colors = ['black', 'white', 'navy', 'gray', 'beige']
-        versatile_categories = ['Tops', 'Bottoms']
-        
-        score = 0.5  # Base score
-        
-        if item.color.lower() in versatile_colors:
-            score += 0.3
-        
-        if item.category in versatile_categories:
-            score += 0.2
-        
-        return min(score, 1.0)
+        return item_features(item)['versatility']
     
     def _determine_seasonality(self, item) -> List[str]:
         """Determine which seasons an item is suitable for"""
-        seasonal_keywords = {
-            'spring': ['light', 'cotton', 'spring'],
-            'summer': ['summer', 'shorts', 'tank', 'sandals', 'light'],
-            'fall': ['fall', 'autumn', 'jacket', 'boots'],
-            'winter': ['winter', 'coat', 'warm', 'wool', 'heavy']
-        }
-        
-        item_text = f"{item.name} {' '.join(item.tags)}".lower()
-        suitable_seasons = []
-        
-        for season, keywords in seasonal_keywords.items():
-            if any(keyword in item_text for keyword in keywords):
-                suitable_seasons.append(season)
-        
-        if not suitable_seasons:
-            suitable_seasons = ['all-season']
-        
-        return suitable_seasons
+        return seasons_from_mask(item_features(item)['season_mask'])
     
     def _calculate_confidence_score(self, existing_matches, shopping_suggestions) -> float:
         """Calculate overall confidence in recommendations"""
@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q, F, Count, Sum, Avg, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from typing import Dict, Any, Optional
+from .models import WardrobeItem, Outfit
+from .stats import get_wardrobe_stats, get_histograms
+from .style_features import SEASON_BITS
+
+User = get_user_model()
+
+PRICE_BUCKETS = {
+    'under_50': Q(wardrobe_items__price__lt=50),
+    '50_to_100': Q(wardrobe_items__price__gte=50, wardrobe_items__price__lt=100),
+    '100_to_200': Q(wardrobe_items__price__gte=100, wardrobe_items__price__lt=200),
+    'over_200': Q(wardrobe_items__price__gte=200),
+}
+
+
+def wardrobe_summary(user_id) -> Dict[str, Any]:
+    """
+    Scalar wardrobe stats and price buckets computed live in a single query.
+    Anchored on the user row so users without items still get one row of zeros.
+    """
+    outfit_count = Outfit.objects.filter(user=OuterRef('pk')).order_by().values('user').annotate(
+        count=Count('id')
+    ).values('count')
+
+    row = User.objects.filter(pk=user_id).values('pk').annotate(
+        total_items=Count('wardrobe_items'),
+        total_value=Sum('wardrobe_items__price'),
+        total_wear=Sum('wardrobe_items__wear_count'),
+        avg_wear_count=Avg('wardrobe_items__wear_count'),
+        total_outfits=Coalesce(Subquery(outfit_count), Value(0)),
+        **{f'price_{bucket}': Count('wardrobe_items', filter=condition) for bucket, condition in PRICE_BUCKETS.items()}
+    ).order_by().first() or {}
+
+    return {
+        'total_items': row.get('total_items', 0),
+        'total_outfits': row.get('total_outfits', 0),
+        'total_value': row.get('total_value') or 0,
+        'total_wear': row.get('total_wear') or 0,
+        'avg_wear_count': row.get('avg_wear_count') or 0,
+        'price_ranges': {bucket: row.get(f'price_{bucket}', 0) for bucket in PRICE_BUCKETS},
+    }
+
+
+def style_breakdown(items) -> Dict[str, Any]:
+    """Item counts per formality and per season, aggregated in SQL from the stored feature columns"""
+    formality = items.order_by('formality').values('formality').annotate(count=Count('id'))
+    season_bits = {f'{season}_bit': F('season_mask').bitand(bit) for season, bit in SEASON_BITS.items()}
+    seasons = items.order_by().alias(**season_bits).aggregate(
+        **{season: Count('id', filter=Q(**{f'{season}_bit__gt': 0})) for season in SEASON_BITS},
+        all_season=Count('id', filter=Q(season_mask=0)),
+    )
+    return {
+        'formality_data': [{'formality': row['formality'], 'count': row['count']} for row in formality],
+        'season_data': seasons,
+    }
+
+
+def build_analytics(user, least_worn_limit: Optional[int] = 10) -> Dict[str, Any]:
+    """
+    Everything the analytics page and API show, shared by both.
+    Totals and histograms are read from the WardrobeStats rollup instead of scanning
+    items; a missing rollup is built by the single-query wardrobe_summary() above.
+    The API lists the 10 least worn items, the page all of them (least_worn_limit=None).
+    """
+    items = WardrobeItem.objects.filter(user=user)
+    least_worn = items.filter(wear_count__lt=3)
+    stats = get_wardrobe_stats(user)
+    histograms = get_histograms(user)
+
+    return {
+        'total_items': stats.total_items,
+        'total_outfits': stats.total_outfits,
+        'total_value': stats.total_value,
+        'avg_wear_count': stats.avg_wear_count,
+        'price_ranges': stats.price_ranges,
+        'category_data': [
+            {'category': bucket.value, 'count': bucket.count, 'total_value': bucket.total_value,
+             'avg_wear': bucket.avg_wear}
+            for bucket in histograms['category']
+        ],
+        'color_data': [
+            {'color': bucket.value, 'count': bucket.count}
+            for bucket in histograms['color'][:10]
+        ],
+        'brand_data': [
+            {'brand': bucket.value, 'count': bucket.count, 'total_value': bucket.total_value}
+            for bucket in histograms['brand'][:10]
+        ],
+        'most_worn': items.order_by('-wear_count')[:10],
+        'least_worn': least_worn[:least_worn_limit] if least_worn_limit is not None else least_worn,
+        **style_breakdown(items),
+    }
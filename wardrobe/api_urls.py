@@ -5,10 +5,18 @@ app_name = 'wardrobe_api'
 
 urlpatterns = [
     path('wardrobe-items/', api_views.WardrobeItemListCreateView.as_view(), name='wardrobe-items'),
+    path('wardrobe-items/import/', api_views.ImportWardrobeItemsView.as_view(), name='wardrobe-items-import'),
     path('wardrobe-items/<int:pk>/', api_views.WardrobeItemDetailView.as_view(), name='wardrobe-item-detail'),
     path('wardrobe-items/<int:pk>/wear/', api_views.IncrementWearCountView.as_view(), name='increment-wear'),
     path('wardrobe-items/<int:pk>/recommendations/', api_views.AIRecommendationsView.as_view(), name='ai-recommendations'),
+    path('recommendations/batch/', api_views.BatchRecommendationsView.as_view(), name='batch-recommendations'),
+    path('recommendation-jobs/<str:token>/', api_views.RecommendationJobView.as_view(), name='recommendation-job'),
     path('outfits/', api_views.OutfitListCreateView.as_view(), name='outfits'),
+    path('outfits/suggest/', api_views.OutfitSuggestView.as_view(), name='outfit-suggest'),
     path('outfits/<int:pk>/', api_views.OutfitDetailView.as_view(), name='outfit-detail'),
+    path('outfits/<int:pk>/wear/', api_views.OutfitWearView.as_view(), name='outfit-wear'),
+    path('wear-events/bulk/', api_views.BulkWearEventsView.as_view(), name='bulk-wear-events'),
     path('analytics/', api_views.AnalyticsView.as_view(), name='analytics'),
+    path('export/<str:fmt>/', api_views.ExportView.as_view(), name='export'),
+    path('metrics/', api_views.MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
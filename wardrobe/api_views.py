@@ -1,48 +1,160 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
-from django.db.models import Count, Sum, Avg
+from rest_framework.permissions import BasePermission
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
 from .models import WardrobeItem, Outfit
-from .serializers import WardrobeItemSerializer, OutfitSerializer
+from .serializers import (
+    WardrobeItemSerializer, OutfitSerializer, RecommendationBatchSerializer,
+    BulkWearSerializer, OutfitWearSerializer,
+)
 from .ai_recommendations import AIRecommendationEngine
+from .analytics import build_analytics
+from .wear import Wear, record_wear, record_wears
+from .search import search_items
+from .pagination import KeysetCursorPagination
+from .exporter import EXPORT_FORMATS, SECTIONS, export_stream
+from .outfit_generator import OutfitGenerator, load_candidates
+from .importer import IMPORT_FORMATS, detect_format, import_items, iter_rows
+from .recommendation_jobs import start_suggestions_job, get_job
+from .snapshot import get_snapshot
+from .http_cache import wardrobe_cached
+from .profiling import PrometheusTextRenderer, metrics
 import json
 
+@method_decorator(wardrobe_cached, name='get')
 class WardrobeItemListCreateView(generics.ListCreateAPIView):
     serializer_class = WardrobeItemSerializer
+    pagination_class = KeysetCursorPagination
     
     def get_queryset(self):
-        return WardrobeItem.objects.filter(user=self.request.user)
+        queryset = WardrobeItem.objects.filter(user=self.request.user)
+        query = self.request.query_params.get('q')
+        if query:
+            queryset = search_items(queryset, self.request.user, query)
+        return queryset
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+@method_decorator(wardrobe_cached, name='get')
 class WardrobeItemDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = WardrobeItemSerializer
     
     def get_queryset(self):
         return WardrobeItem.objects.filter(user=self.request.user)
 
+class ImportWardrobeItemsView(APIView):
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV or JSON Lines file as "file"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fmt = request.data.get('format') or detect_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response({'error': f'Format must be one of: {", ".join(IMPORT_FORMATS)}'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        # Rows committed before an error stay imported; the report lists what failed
+        report = import_items(request.user, iter_rows(upload.file, fmt))
+        response_status = status.HTTP_201_CREATED if report['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+
 class IncrementWearCountView(APIView):
     def post(self, request, pk):
         try:
             item = WardrobeItem.objects.get(pk=pk, user=request.user)
-            item.wear_count += 1
-            item.save()
-            return Response({'success': True, 'new_count': item.wear_count})
+            outfit = None
+            if request.data.get('outfit'):
+                outfit = Outfit.objects.get(pk=request.data['outfit'], user=request.user)
+            new_count = record_wear(item, outfit=outfit)
+            return Response({'success': True, 'new_count': new_count, 'last_worn': item.last_worn})
         except WardrobeItem.DoesNotExist:
             return Response({'success': False, 'error': 'Item not found'}, 
                           status=status.HTTP_404_NOT_FOUND)
+        except (Outfit.DoesNotExist, ValueError):
+            return Response({'success': False, 'error': 'Outfit not found'},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+class BulkWearEventsView(APIView):
+    def post(self, request):
+        serializer = BulkWearSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        events = serializer.validated_data['events']
+        items = WardrobeItem.objects.filter(user=request.user).in_bulk({event['item'] for event in events})
+        outfits = Outfit.objects.filter(user=request.user).in_bulk(
+            {event['outfit'] for event in events if event.get('outfit')}
+        )
+        
+        errors = {}
+        for index, event in enumerate(events):
+            if event['item'] not in items:
+                errors[index] = 'Item not found'
+            elif event.get('outfit') and event['outfit'] not in outfits:
+                errors[index] = 'Outfit not found'
+        if errors:
+            return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            result = record_wears(request.user.id, [
+                Wear(items[event['item']], event.get('worn_at'), outfits.get(event.get('outfit')),
+                     event.get('idempotency_key'))
+                for event in events
+            ])
+        except IntegrityError:
+            # A concurrent retry recorded the same idempotency key first
+            return Response({'success': False, 'error': 'Duplicate submission in progress'},
+                          status=status.HTTP_409_CONFLICT)
+        return Response({'success': True, **result})
+
+class OutfitWearView(APIView):
+    def post(self, request, pk):
+        try:
+            outfit = Outfit.objects.prefetch_related('items').get(pk=pk, user=request.user)
+        except Outfit.DoesNotExist:
+            return Response({'success': False, 'error': 'Outfit not found'},
+                          status=status.HTTP_404_NOT_FOUND)
+        
+        serializer = OutfitWearSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        key = serializer.validated_data.get('idempotency_key')
+        worn_at = serializer.validated_data.get('worn_at')
+        try:
+            result = record_wears(request.user.id, [
+                Wear(item, worn_at, outfit, f'{key}:{item.pk}' if key else None)
+                for item in outfit.items.all()
+            ])
+        except IntegrityError:
+            return Response({'success': False, 'error': 'Duplicate submission in progress'},
+                          status=status.HTTP_409_CONFLICT)
+        return Response({'success': True, **result})
 
 class AIRecommendationsView(APIView):
     def get(self, request, pk):
         try:
             item = WardrobeItem.objects.get(pk=pk, user=request.user)
-            user_items = WardrobeItem.objects.filter(user=request.user).exclude(pk=pk)
             
-            # Generate AI recommendations
+            # Generate AI recommendations (existing matches come from the compatibility index)
             ai_engine = AIRecommendationEngine()
-            recommendations = ai_engine.get_recommendations_for_item(item, user_items)
+            if request.query_params.get('async') in ('1', 'true'):
+                # Rule-based results now, LLM suggestions from a background job
+                recommendations = ai_engine.get_recommendations_for_item(item, include_suggestions=False)
+                job = start_suggestions_job(item, ai_engine)
+                recommendations['shopping_suggestions'] = job.pop('shopping_suggestions')
+                recommendations['suggestions_job'] = job
+            else:
+                recommendations = ai_engine.get_recommendations_for_item(item)
             
             return Response({
                 'item': WardrobeItemSerializer(item).data,
@@ -51,66 +163,130 @@ class AIRecommendationsView(APIView):
         except WardrobeItem.DoesNotExist:
             return Response({'error': 'Item not found'}, status=status.HTTP_404_NOT_FOUND)
 
+class BatchRecommendationsView(APIView):
+    def post(self, request):
+        serializer = RecommendationBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        # The wardrobe comes from the snapshot cache, encoded once and shared across
+        # all requested items; full rows are loaded for the requested items alone
+        item_ids = list(dict.fromkeys(serializer.validated_data['item_ids']))
+        snapshot = get_snapshot(request.user.id)
+        items_by_id = WardrobeItem.objects.filter(user=request.user).in_bulk(item_ids)
+        items = [items_by_id[item_id] for item_id in item_ids if item_id in items_by_id]
+        
+        ai_engine = AIRecommendationEngine()
+        recommendations = ai_engine.get_recommendations_for_items(
+            items, snapshot.matrix(ai_engine), max_concurrency=settings.AI_BATCH_MAX_CONCURRENCY
+        )
+        
+        return Response({
+            'results': [
+                {'item': WardrobeItemSerializer(item).data, 'recommendations': item_recommendations}
+                for item, item_recommendations in zip(items, recommendations)
+            ],
+            'missing_ids': [item_id for item_id in item_ids if item_id not in items_by_id],
+        })
+
+class RecommendationJobView(APIView):
+    def get(self, request, token):
+        job = get_job(token, request.user.id)
+        if job is None:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
+
+@method_decorator(wardrobe_cached, name='get')
 class OutfitListCreateView(generics.ListCreateAPIView):
     serializer_class = OutfitSerializer
+    pagination_class = KeysetCursorPagination
     
     def get_queryset(self):
-        return Outfit.objects.filter(user=self.request.user)
+        return OutfitSerializer.setup_eager_loading(Outfit.objects.filter(user=self.request.user))
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+@method_decorator(wardrobe_cached, name='get')
+class OutfitSuggestView(APIView):
+    def get(self, request):
+        season = request.query_params.get('season', '')
+        seasons = {choice.lower(): choice for choice, _ in Outfit.SEASON_CHOICES}
+        if season and season.lower() not in seasons:
+            return Response({'error': f'Season must be one of: {", ".join(seasons.values())}'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        try:
+            k = max(1, min(int(request.query_params.get('k', 5)), 20))
+        except ValueError:
+            return Response({'error': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        occasion = request.query_params.get('occasion', '')
+        
+        # Full rows are loaded for the chosen items alone
+        suggestions = OutfitGenerator(load_candidates(request.user)).suggest(occasion=occasion, season=season, k=k)
+        chosen = WardrobeItem.objects.in_bulk({item.id for suggestion in suggestions for item in suggestion['items']})
+        
+        return Response({
+            'occasion': occasion,
+            'season': seasons.get(season.lower(), 'All seasons'),
+            'outfits': [
+                {
+                    'item_ids': [item.id for item in suggestion['items']],
+                    'items': WardrobeItemSerializer([chosen[item.id] for item in suggestion['items']], many=True).data,
+                    'score': suggestion['score'],
+                    'compatibility': suggestion['compatibility'],
+                }
+                for suggestion in suggestions
+            ],
+        })
+
+@method_decorator(wardrobe_cached, name='get')
 class OutfitDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = OutfitSerializer
     
     def get_queryset(self):
-        return Outfit.objects.filter(user=self.request.user)
+        return OutfitSerializer.setup_eager_loading(Outfit.objects.filter(user=self.request.user))
 
+@method_decorator(wardrobe_cached, name='get')
 class AnalyticsView(APIView):
     def get(self, request):
-        user = request.user
-        items = WardrobeItem.objects.filter(user=user)
-        outfits = Outfit.objects.filter(user=user)
-        
-        # Category analysis
-        category_data = items.values('category').annotate(
-            count=Count('id'),
-            total_value=Sum('price'),
-            avg_wear=Avg('wear_count')
-        ).order_by('-count')
-        
-        # Color analysis
-        color_data = items.values('color').annotate(
-            count=Count('id')
-        ).order_by('-count')[:10]
-        
-        # Brand analysis
-        brand_data = items.exclude(brand='').values('brand').annotate(
-            count=Count('id'),
-            total_value=Sum('price')
-        ).order_by('-count')[:10]
-        
-        # Wear patterns
-        most_worn = WardrobeItemSerializer(items.order_by('-wear_count')[:10], many=True).data
-        least_worn = WardrobeItemSerializer(items.filter(wear_count__lt=3)[:10], many=True).data
-        
-        # Price analysis
-        price_ranges = {
-            'under_50': items.filter(price__lt=50).count(),
-            '50_to_100': items.filter(price__gte=50, price__lt=100).count(),
-            '100_to_200': items.filter(price__gte=100, price__lt=200).count(),
-            'over_200': items.filter(price__gte=200).count(),
-        }
+        analytics = build_analytics(request.user)
         
         return Response({
-            'total_items': items.count(),
-            'total_outfits': outfits.count(),
-            'total_value': items.aggregate(Sum('price'))['price__sum'] or 0,
-            'avg_wear_count': items.aggregate(Avg('wear_count'))['wear_count__avg'] or 0,
-            'category_data': list(category_data),
-            'color_data': list(color_data),
-            'brand_data': list(brand_data),
-            'most_worn': most_worn,
-            'least_worn': least_worn,
-            'price_ranges': price_ranges,
-        })
\ No newline at end of file
+            'total_items': analytics['total_items'],
+            'total_outfits': analytics['total_outfits'],
+            'total_value': analytics['total_value'],
+            'avg_wear_count': analytics['avg_wear_count'],
+            'category_data': list(analytics['category_data']),
+            'color_data': list(analytics['color_data']),
+            'brand_data': list(analytics['brand_data']),
+            'most_worn': WardrobeItemSerializer(analytics['most_worn'], many=True).data,
+            'least_worn': WardrobeItemSerializer(analytics['least_worn'], many=True).data,
+            'price_ranges': analytics['price_ranges'],
+            'formality_data': analytics['formality_data'],
+            'season_data': analytics['season_data'],
+        })
+
+class ExportView(APIView):
+    def get(self, request, fmt):
+        section = request.query_params.get('section', 'items')
+        if fmt not in EXPORT_FORMATS or section not in SECTIONS:
+            return Response({'error': f'Export formats: {", ".join(EXPORT_FORMATS)}; CSV sections: {", ".join(SECTIONS)}'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        chunks, content_type, filename = export_stream(request.user, fmt, section)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class IsStaffOrMetricsScraper(BasePermission):
+    def has_permission(self, request, view):
+        allowed_ips = getattr(settings, 'WARDROBE_METRICS_ALLOWED_IPS', [])
+        return request.user.is_staff or request.META.get('REMOTE_ADDR') in allowed_ips
+
+class MetricsView(APIView):
+    """Per-view request profiles in Prometheus text format, for staff and allowed scrapers"""
+    permission_classes = [IsStaffOrMetricsScraper]
+    renderer_classes = [PrometheusTextRenderer]
+    
+    def get(self, request):
+        return Response(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
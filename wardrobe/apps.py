@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class WardrobeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'wardrobe'
\ No newline at end of file
+    name = 'wardrobe'
+
+    def ready(self):
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,159 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+FAMILY_MAX_LENGTH = 30
+_WORD_RE = re.compile(r'[a-z]+')
+_HEX_RE = re.compile(r'#([0-9a-f]{3}|[0-9a-f]{6})')
+
+
+class ColorKnowledgeBase:
+    """
+    Canonical color families, the free-text names that map to them, and which
+    families go together. Swap it through settings.WARDROBE_COLOR_KNOWLEDGE_BASE.
+    """
+
+    # Family -> names and words that normalize to it
+    families: Dict[str, List[str]] = {
+        'white': ['white', 'ivory', 'off white', 'snow', 'pearl'],
+        'cream': ['cream', 'ecru', 'eggshell', 'vanilla'],
+        'beige': ['beige', 'tan', 'khaki', 'camel', 'sand', 'nude', 'taupe', 'stone'],
+        'black': ['black', 'jet', 'onyx', 'ebony'],
+        'gray': ['gray', 'grey', 'charcoal', 'silver', 'slate', 'heather', 'ash'],
+        'navy': ['navy', 'navy blue', 'midnight', 'midnight blue', 'dark blue'],
+        'blue': ['blue', 'light blue', 'sky', 'baby blue', 'cobalt', 'royal blue', 'azure', 'turquoise', 'teal'],
+        'denim': ['denim', 'indigo', 'chambray', 'washed blue'],
+        'red': ['red', 'burgundy', 'maroon', 'crimson', 'wine', 'scarlet', 'cherry', 'oxblood'],
+        'pink': ['pink', 'blush', 'rose', 'fuchsia', 'magenta', 'coral', 'salmon'],
+        'orange': ['orange', 'rust', 'peach', 'apricot', 'tangerine'],
+        'yellow': ['yellow', 'mustard', 'gold', 'lemon', 'ochre'],
+        'green': ['green', 'olive', 'sage', 'mint', 'emerald', 'forest', 'army', 'lime'],
+        'purple': ['purple', 'violet', 'lavender', 'lilac', 'plum', 'mauve'],
+        'brown': ['brown', 'chocolate', 'cognac', 'coffee', 'mocha', 'chestnut', 'espresso'],
+    }
+    # Family -> reference RGB values; hex colors normalize to the family of the nearest one
+    swatches: Dict[str, List[Tuple[int, int, int]]] = {
+        'white': [(255, 255, 255)],
+        'cream': [(255, 253, 208)],
+        'beige': [(225, 198, 153), (210, 180, 140)],
+        'black': [(0, 0, 0)],
+        'gray': [(64, 64, 64), (128, 128, 128), (192, 192, 192)],
+        'navy': [(0, 0, 128), (25, 25, 112)],
+        'blue': [(0, 0, 255), (30, 144, 255), (135, 206, 235)],
+        'denim': [(21, 96, 189)],
+        'red': [(255, 0, 0), (220, 20, 60), (128, 0, 32)],
+        'pink': [(255, 192, 203), (255, 105, 180), (255, 0, 255)],
+        'orange': [(255, 165, 0), (183, 65, 14)],
+        'yellow': [(255, 255, 0), (255, 215, 0)],
+        'green': [(0, 128, 0), (0, 255, 0), (128, 128, 0)],
+        'purple': [(128, 0, 128), (230, 230, 250)],
+        'brown': [(139, 69, 19), (150, 75, 0)],
+    }
+    # Families that go with everything
+    neutrals = frozenset({'white', 'black', 'gray', 'beige', 'cream', 'navy'})
+    complementary = frozenset({
+        ('blue', 'white'), ('black', 'white'), ('navy', 'white'),
+        ('red', 'black'), ('blue', 'denim'), ('brown', 'cream'),
+    })
+
+    def __init__(self):
+        self.names = {}
+        for family, names in self.families.items():
+            for name in names:
+                self.names[name] = family
+        self.family_list = list(self.families)
+        self.family_ids = {family: index for index, family in enumerate(self.family_list)}
+        self.table = np.array(
+            [[self._compatible(f1, f2) for f2 in self.family_list] for f1 in self.family_list],
+            dtype=bool
+        )
+
+    def _compatible(self, family1: str, family2: str) -> bool:
+        return (
+            family1 == family2
+            or family1 in self.neutrals or family2 in self.neutrals
+            or (family1, family2) in self.complementary or (family2, family1) in self.complementary
+        )
+
+    def normalize(self, color: str) -> str:
+        """
+        Canonical family of a free-text color: the nearest swatch for a hex code
+        ('#1F2A5C' -> navy), the whole phrase if known, else the last known word
+        ('Light Blue' -> blue), else the cleaned text itself.
+        """
+        color = (color or '').strip().lower()
+        hex_code = _HEX_RE.fullmatch(color)
+        if hex_code:
+            return self.nearest_swatch(hex_code.group(1))
+        words = _WORD_RE.findall(color)
+        phrase = ' '.join(words)
+        if phrase in self.names:
+            return self.names[phrase]
+        for word in reversed(words):
+            if word in self.names:
+                return self.names[word]
+        return phrase[:FAMILY_MAX_LENGTH]
+
+    def nearest_swatch(self, hex_code: str) -> str:
+        """Family with the swatch closest to a 3- or 6-digit hex code, by RGB distance"""
+        if len(hex_code) == 3:
+            hex_code = ''.join(digit * 2 for digit in hex_code)
+        rgb = [int(hex_code[index:index + 2], 16) for index in (0, 2, 4)]
+        distance, family = min(
+            (sum((a - b) ** 2 for a, b in zip(rgb, swatch)), family)
+            for family, swatches in self.swatches.items() for swatch in swatches
+        )
+        return family
+
+    def match(self, family1: str, family2: str) -> bool:
+        """O(1) compatibility of two families; unknown families only match themselves or neutrals"""
+        id1 = self.family_ids.get(family1)
+        id2 = self.family_ids.get(family2)
+        if id1 is not None and id2 is not None:
+            return bool(self.table[id1, id2])
+        return family1 == family2 or family1 in self.neutrals or family2 in self.neutrals
+
+    def match_table(self, families: Iterable[str]) -> np.ndarray:
+        """Square compatibility matrix over a list of families, for batch scoring"""
+        families = list(families)
+        ids = np.array([self.family_ids.get(family, -1) for family in families], dtype=np.int64)
+        if (ids >= 0).all():
+            return self.table[np.ix_(ids, ids)]
+        return np.array([[self.match(f1, f2) for f2 in families] for f1 in families], dtype=bool).reshape(
+            len(families), len(families)
+        )
+
+
+@lru_cache(maxsize=1)
+def get_color_knowledge_base() -> ColorKnowledgeBase:
+    """The process-wide knowledge base named by settings.WARDROBE_COLOR_KNOWLEDGE_BASE"""
+    path = getattr(settings, 'WARDROBE_COLOR_KNOWLEDGE_BASE', 'wardrobe.colors.ColorKnowledgeBase')
+    return import_string(path)()
+
+
+@lru_cache(maxsize=4096)
+def normalize_color(color: str) -> str:
+    return get_color_knowledge_base().normalize(color)
+
+
+def loaded_value(item, field: str):
+    """
+    A field's value if it is already loaded, else None. Never triggers a deferred
+    field query; slotted rows (wardrobe snapshots) have no instance __dict__.
+    """
+    values = getattr(item, '__dict__', None)
+    if values is None:
+        return getattr(item, field, None)
+    return values.get(field)
+
+
+def item_color_family(item) -> str:
+    """Stored family, or normalized on the fly for unsaved or partially loaded items"""
+    return loaded_value(item, 'color_family') or normalize_color(item.color)
+
+
+def colors_match(color1: str, color2: str) -> bool:
+    return get_color_knowledge_base().match(normalize_color(color1), normalize_color(color2))
@@ -0,0 +1,224 @@
+import numpy as np
+from typing import List, Dict, Any, Iterable
+from .colors import item_color_family
+
+COLOR_WEIGHT = 0.3
+CATEGORY_WEIGHT = 0.4
+STYLE_WEIGHT = 0.3
+MATCH_THRESHOLD = 0.6
+
+
+def _score_table() -> np.ndarray:
+    """Score for every (color, category, style) outcome, indexed by c*4 + k*2 + s"""
+    table = np.zeros(8, dtype=np.float64)
+    for code in range(8):
+        # Same accumulation order as AIRecommendationEngine._calculate_compatibility
+        score = 0.0
+        if code & 4:
+            score += COLOR_WEIGHT
+        if code & 2:
+            score += CATEGORY_WEIGHT
+        if code & 1:
+            score += STYLE_WEIGHT
+        table[code] = min(score, 1.0)
+    return table
+
+
+SCORE_TABLE = _score_table()
+# Descending rank of each table entry, used to break ties by wardrobe order
+SCORE_RANK = np.unique(-SCORE_TABLE, return_inverse=True)[1].astype(np.int64)
+
+
+class _Vocabulary:
+    """Maps hashable values to dense integer IDs"""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, value) -> int:
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+
+class WardrobeMatrix:
+    """
+    A user's wardrobe encoded once into NumPy arrays for batched compatibility scoring.
+
+    Color families, categories and brands become integer IDs, tags become bitsets, and the
+    engine's scalar rules are evaluated only over the (small) vocabularies. Scores
+    and reasons are identical to AIRecommendationEngine._calculate_compatibility.
+    """
+
+    def __init__(self, items: Iterable, engine):
+        self.engine = engine
+        self.items = list(items)
+
+        self._colors = _Vocabulary()
+        self._categories = _Vocabulary()
+        self._brands = _Vocabulary()
+        self._tags = _Vocabulary()
+
+        n = len(self.items)
+        self.color_ids = np.empty(n, dtype=np.int64)
+        self.category_ids = np.empty(n, dtype=np.int64)
+        self.brand_ids = np.empty(n, dtype=np.int64)
+        item_tag_ids = []
+
+        for index, item in enumerate(self.items):
+            self.color_ids[index] = self._colors.get(item_color_family(item))
+            self.category_ids[index] = self._categories.get(item.category)
+            self.brand_ids[index] = self._brands.get(item.brand)
+            item_tag_ids.append([self._tags.get(tag) for tag in set(item.tags)])
+
+        self.tag_bits = self._encode_tags(item_tag_ids)
+
+        # Compatibility lookup tables over the wardrobe's own vocabularies
+        colors = self._colors.values
+        categories = self._categories.values
+        self.color_table = engine.colors.match_table(colors)
+        self.category_table = np.array(
+            [[engine._categories_compatible(k1, k2) for k2 in categories] for k1 in categories],
+            dtype=bool
+        ).reshape(len(categories), len(categories))
+
+    def __len__(self):
+        return len(self.items)
+
+    def _encode_tags(self, item_tag_ids: List[List[int]]) -> np.ndarray:
+        """Pack each item's tag IDs into rows of uint64 words"""
+        words = max(1, (len(self._tags) + 63) // 64)
+        bits = np.zeros((len(item_tag_ids), words), dtype=np.uint64)
+        for row, tag_ids in enumerate(item_tag_ids):
+            for tag_id in tag_ids:
+                bits[row, tag_id // 64] |= np.uint64(1) << np.uint64(tag_id % 64)
+        return bits
+
+    def _query_bits(self, item) -> np.ndarray:
+        """Tag bitset for an item scored against this wardrobe"""
+        bits = np.zeros(self.tag_bits.shape[1], dtype=np.uint64)
+        for tag in set(item.tags):
+            tag_id = self._tags.ids.get(tag)
+            if tag_id is not None:
+                bits[tag_id // 64] |= np.uint64(1) << np.uint64(tag_id % 64)
+        return bits
+
+    def match_codes(self, item, reverse: bool = False) -> np.ndarray:
+        """
+        Outcome codes (c*4 + k*2 + s) of one item against every wardrobe item.
+
+        With reverse=True the wardrobe items are scored against the item instead,
+        which only differs for the (asymmetric) category rule.
+        """
+        family = item_color_family(item)
+        color_row = np.fromiter(
+            (self.engine._families_match(family, other) for other in self._colors.values),
+            dtype=bool, count=len(self._colors)
+        )
+        if reverse:
+            categories = (self.engine._categories_compatible(other, item.category) for other in self._categories.values)
+        else:
+            categories = (self.engine._categories_compatible(item.category, other) for other in self._categories.values)
+        category_row = np.fromiter(categories, dtype=bool, count=len(self._categories))
+
+        color_ok = color_row[self.color_ids]
+        category_ok = category_row[self.category_ids]
+        style_ok = np.any(self.tag_bits & self._query_bits(item), axis=1)
+        if item.brand:
+            brand_id = self._brands.ids.get(item.brand)
+            if brand_id is not None:
+                style_ok |= self.brand_ids == brand_id
+
+        return color_ok * 4 + category_ok * 2 + style_ok.astype(np.int64)
+
+    def score_item(self, item) -> np.ndarray:
+        """Compatibility scores of one item against every wardrobe item"""
+        if not self.items:
+            return np.zeros(0, dtype=np.float64)
+        return SCORE_TABLE[self.match_codes(item)]
+
+    def score_pairs(self) -> np.ndarray:
+        """N×N matrix where [i, j] is the compatibility of item i with item j"""
+        return SCORE_TABLE[self.pair_codes()]
+
+    def pair_codes(self, rows=slice(None)) -> np.ndarray:
+        """
+        Outcome codes where [i, j] is row item i scored against wardrobe item j, for
+        every ordered pair (N×N) or only the given rows (a slice or positions).
+        """
+        n = len(self.items)
+        if not n:
+            return np.zeros((0, 0), dtype=np.int64)
+
+        color_ok = self.color_table[np.ix_(self.color_ids[rows], self.color_ids)]
+        category_ok = self.category_table[np.ix_(self.category_ids[rows], self.category_ids)]
+
+        style_ok = np.zeros(color_ok.shape, dtype=bool)
+        for word in range(self.tag_bits.shape[1]):
+            column = self.tag_bits[:, word]
+            style_ok |= (column[rows][:, None] & column[None, :]) != 0
+        branded = np.array([bool(item.brand) for item in self.items], dtype=bool)
+        style_ok |= branded[rows][:, None] & (self.brand_ids[rows][:, None] == self.brand_ids[None, :])
+
+        return color_ok * 4 + category_ok * 2 + style_ok.astype(np.int64)
+
+    def top_matches(self, item, k: int = 5, threshold: float = MATCH_THRESHOLD) -> List[Dict[str, Any]]:
+        """Best k matches above threshold, in the same order as the scalar engine"""
+        if not self.items:
+            return []
+
+        codes = self.match_codes(item)
+        return [self._build_match(item, index, int(codes[index])) for index in top_positions(codes, k, threshold)]
+
+    def _build_match(self, item, index: int, code: int) -> Dict[str, Any]:
+        return match_entry(item, self.items[index], float(SCORE_TABLE[code]), bool(code & 4), bool(code & 2))
+
+
+def top_positions(codes: np.ndarray, k: int, threshold: float = MATCH_THRESHOLD) -> List[int]:
+    """Positions of the best k outcome codes scoring above threshold, best first"""
+    candidates = np.flatnonzero(SCORE_TABLE[codes] > threshold)
+    if not candidates.size:
+        return []
+
+    # Unique sort key: score rank first, wardrobe position second (stable like sorted())
+    keys = SCORE_RANK[codes[candidates]] * len(codes) + candidates
+    if candidates.size > k:
+        keep = np.argpartition(keys, k - 1)[:k]
+        candidates, keys = candidates[keep], keys[keep]
+    return candidates[np.argsort(keys)].tolist()
+
+
+def match_entry(item, wardrobe_item, score: float, colors_match: bool, categories_match: bool) -> Dict[str, Any]:
+    """Serialized existing-wardrobe match, as returned in recommendations"""
+    return {
+        'id': wardrobe_item.id,
+        'name': wardrobe_item.name,
+        'category': wardrobe_item.category,
+        'color': wardrobe_item.color,
+        'brand': wardrobe_item.brand,
+        'image_url': wardrobe_item.image_url,
+        'compatibility_score': score,
+        'reason': compatibility_reason(item, wardrobe_item, colors_match, categories_match)
+    }
+
+
+def compatibility_reason(item1, item2, colors_match: bool, categories_match: bool) -> str:
+    """Same text as AIRecommendationEngine._get_compatibility_reason without re-running the rules"""
+    reasons = []
+
+    if colors_match:
+        reasons.append(f"Colors {item1.color} and {item2.color} complement each other")
+
+    if categories_match:
+        reasons.append(f"{item1.category} pairs well with {item2.category}")
+
+    common_tags = set(item1.tags).intersection(set(item2.tags))
+    if common_tags:
+        reasons.append(f"Shared style: {', '.join(common_tags)}")
+
+    return '; '.join(reasons) if reasons else "Good overall style match"
@@ -0,0 +1,185 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from typing import List
+from .models import WardrobeItem, ItemCompatibility
+from .ai_recommendations import AIRecommendationEngine
+from .compatibility import SCORE_TABLE, MATCH_THRESHOLD, top_positions
+
+logger = logging.getLogger(__name__)
+
+# Fields that feed the compatibility rules; saves touching only other fields skip reindexing
+INDEXED_FIELDS = frozenset({'color', 'category', 'brand', 'tags'})
+# Lookups read an item's top few matches, so only those are stored (O(N) rows per wardrobe)
+MATCHES_PER_ITEM = 5
+# Pair codes scored at once when refilling many items, bounding memory for large wardrobes
+BLOCK_CELLS = 1_000_000
+
+
+def _entry(user_id, item_id, match_id, code) -> ItemCompatibility:
+    return ItemCompatibility(
+        user_id=user_id,
+        item_id=item_id,
+        match_id=match_id,
+        score=float(SCORE_TABLE[code]),
+        colors_match=bool(code & 4),
+        categories_match=bool(code & 2),
+    )
+
+
+def _load_wardrobe(user_id) -> List[WardrobeItem]:
+    """
+    The fields the rules read, newest first: the lookup breaks score ties by the
+    newest match, and top_positions breaks them by wardrobe position.
+    """
+    return list(
+        WardrobeItem.objects.filter(user_id=user_id).order_by('-created_at', '-pk')
+        .only('id', 'user_id', 'color', 'color_family', 'category', 'brand', 'tags', 'created_at')
+    )
+
+
+def _write_matches(user_id, items, matrix, positions) -> int:
+    """
+    Replace the stored matches of the items at `positions`, scoring them in blocks.
+    An item never matches itself (no category pairs with its own), so its own column
+    needs no masking. Returns the number of entries written.
+    """
+    positions = list(positions)
+    ItemCompatibility.objects.filter(item_id__in=[items[position].pk for position in positions]).delete()
+    block = max(1, BLOCK_CELLS // max(1, len(items)))
+    written = 0
+    for start in range(0, len(positions), block):
+        rows = positions[start:start + block]
+        entries = [
+            _entry(user_id, items[row].pk, items[match].pk, int(codes[match]))
+            for row, codes in zip(rows, matrix.pair_codes(rows))
+            for match in top_positions(codes, MATCHES_PER_ITEM)
+        ]
+        ItemCompatibility.objects.bulk_create(entries, batch_size=1000)
+        written += len(entries)
+    return written
+
+
+def update_item_index(item):
+    """
+    Bring the index up to date after one item was created or changed, in O(N) for
+    its owner's wardrobe: the item's own matches are recomputed, and it is merged
+    into every other item's stored list. Only items that listed it before and may
+    now have a better match waiting outside their list are rescored in full.
+    """
+    items = _load_wardrobe(item.user_id)
+    positions = {other.pk: position for position, other in enumerate(items)}
+    position = positions.get(item.pk)
+    if position is None:
+        return
+    matrix = AIRecommendationEngine().build_wardrobe_matrix(items)
+    backward = matrix.match_codes(items[position], reverse=True)
+
+    stored = {}
+    for row in ItemCompatibility.objects.filter(user_id=item.user_id).exclude(item_id=item.pk).values(
+        'id', 'item_id', 'match_id', 'score', 'colors_match', 'categories_match'
+    ):
+        stored.setdefault(row['item_id'], []).append(row)
+
+    def rank(score, match_position):
+        return -score, match_position
+
+    deleted, created, refill = [], [], [position]
+    for other_position, other in enumerate(items):
+        if other_position == position:
+            continue
+        code = int(backward[other_position])
+        new = _entry(item.user_id, other.pk, item.pk, code)
+        qualifies = new.score > MATCH_THRESHOLD
+        entries = stored.get(other.pk, [])
+        listed = next((entry for entry in entries if entry['match_id'] == item.pk), None)
+
+        if listed is not None:
+            if (listed['score'], listed['colors_match'], listed['categories_match']) == (
+                new.score, new.colors_match, new.categories_match
+            ):
+                continue
+            if len(entries) >= MATCHES_PER_ITEM:
+                # Its slot may now belong to a match that was not stored
+                refill.append(other_position)
+                continue
+            # A list with free slots already holds every qualifying match
+            deleted.append(listed['id'])
+            if qualifies:
+                created.append(new)
+        elif qualifies:
+            if len(entries) < MATCHES_PER_ITEM:
+                created.append(new)
+                continue
+            worst = max(entries, key=lambda entry: rank(entry['score'], positions[entry['match_id']]))
+            if rank(new.score, position) < rank(worst['score'], positions[worst['match_id']]):
+                deleted.append(worst['id'])
+                created.append(new)
+
+    with transaction.atomic():
+        ItemCompatibility.objects.filter(pk__in=deleted).delete()
+        ItemCompatibility.objects.bulk_create(created)
+        _write_matches(item.user_id, items, matrix, refill)
+
+
+def refill_item_matches(user_id, item_ids):
+    """Recompute the stored matches of the given items, e.g. after one they listed was deleted"""
+    item_ids = set(item_ids)
+    if not item_ids:
+        return
+    items = _load_wardrobe(user_id)
+    positions = [position for position, item in enumerate(items) if item.pk in item_ids]
+    if not positions:
+        return
+    matrix = AIRecommendationEngine().build_wardrobe_matrix(items)
+    with transaction.atomic():
+        _write_matches(user_id, items, matrix, positions)
+
+
+def rebuild_user_index(user_id) -> int:
+    """
+    Rebuild a user's whole index from scratch; returns the number of entries.
+    Scoring is O(N²) but runs in blocks, so memory stays O(N).
+    """
+    items = _load_wardrobe(user_id)
+    matrix = AIRecommendationEngine().build_wardrobe_matrix(items)
+    with transaction.atomic():
+        ItemCompatibility.objects.filter(user_id=user_id).delete()
+        return _write_matches(user_id, items, matrix, range(len(items)))
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'WARDROBE_INDEX_WORKERS', 1),
+            thread_name_prefix='compatibility-index'
+        )
+    return _executor
+
+
+def _run_rebuild(user_id):
+    try:
+        rebuild_user_index(user_id)
+    except Exception as e:
+        logger.error(f"Error in background compatibility index rebuild: {str(e)}")
+    finally:
+        close_old_connections()
+
+
+def schedule_index_rebuild(user_id):
+    """
+    Rebuild a user's index in the background once the current transaction commits
+    (inline with WARDROBE_INDEX_WORKERS = 0). Bulk imports use this instead of
+    indexing each chunk, since pairing new items with the wardrobe costs O(N) per item.
+    """
+    def submit():
+        if getattr(settings, 'WARDROBE_INDEX_WORKERS', 1) <= 0:
+            rebuild_user_index(user_id)
+        else:
+            _get_executor().submit(_run_rebuild, user_id)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,103 @@
+import csv
+import json
+import zipfile
+from typing import Dict, Any, Iterator
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import WardrobeItem, Outfit, OutfitItem, WearEvent
+
+EXPORT_FORMATS = ('jsonl', 'csv', 'zip')
+EXPORT_CHUNK_SIZE = 1000
+
+# Section name -> (model, user lookup, exported columns)
+SECTIONS = {
+    'items': (WardrobeItem, 'user', (
+        'id', 'name', 'category', 'color', 'brand', 'price', 'image_url', 'tags',
+        'wear_count', 'last_worn', 'created_at', 'updated_at',
+    )),
+    'outfits': (Outfit, 'user', ('id', 'name', 'occasion', 'season', 'rating', 'created_at', 'updated_at')),
+    'outfit_items': (OutfitItem, 'outfit__user', ('outfit_id', 'wardrobe_item_id', 'created_at')),
+    'wear_events': (WearEvent, 'user', ('id', 'wardrobe_item_id', 'outfit_id', 'worn_at', 'created_at')),
+}
+
+
+def iter_records(user, section: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """One section's rows as dicts, fetched chunk by chunk in id order"""
+    model, user_lookup, columns = SECTIONS[section]
+    queryset = model.objects.filter(**{user_lookup: user}).order_by('pk').values(*columns)
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _cell(value):
+    if isinstance(value, list):
+        # Same comma-separated tags the CSV importer reads
+        return ', '.join(str(tag) for tag in value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return '' if value is None else value
+
+
+class _Echo:
+    """File-like object whose write() hands the data back, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def iter_jsonl(user) -> Iterator[str]:
+    """Every section as JSON Lines, each record tagged with its section"""
+    for section in SECTIONS:
+        for record in iter_records(user, section):
+            yield json.dumps({'type': section, **record}, cls=DjangoJSONEncoder) + '\n'
+
+
+def iter_csv(user, section: str = 'items') -> Iterator[str]:
+    """One section as CSV with a header row"""
+    columns = SECTIONS[section][2]
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for record in iter_records(user, section):
+        yield writer.writerow([_cell(record[column]) for column in columns])
+
+
+class _ZipStream:
+    """Unseekable sink for ZipFile; buffered output is drained between writes"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(user) -> Iterator[bytes]:
+    """A zip with one CSV per section, produced incrementally"""
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for section in SECTIONS:
+            with archive.open(f'{section}.csv', 'w', force_zip64=True) as entry:
+                for line in iter_csv(user, section):
+                    entry.write(line.encode('utf-8'))
+                    if len(stream.chunks) > 16:
+                        yield stream.drain()
+            yield stream.drain()
+    yield stream.drain()
+
+
+def export_stream(user, fmt: str, section: str = 'items'):
+    """(chunk iterator, content type, file name) for an export format"""
+    if fmt == 'jsonl':
+        return iter_jsonl(user), 'application/x-ndjson', 'wardrobe.jsonl'
+    if fmt == 'csv':
+        return iter_csv(user, section), 'text/csv', f'wardrobe-{section}.csv'
+    if fmt == 'zip':
+        return iter_zip(user), 'application/zip', 'wardrobe.zip'
+    raise ValueError(f'Unsupported export format: {fmt}')
@@ -85,7 +85,7 @@ class WardrobeFilterForm(forms.Form):
         required=False,
         widget=forms.TextInput(attrs={
             'class': 'form-control',
-            'placeholder': 'Search your wardrobe...'
+            'placeholder': 'Search by name, brand, color or tag...'
         })
     )
     category = forms.ChoiceField(
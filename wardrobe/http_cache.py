@@ -0,0 +1,61 @@
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.response import Response
+from .versions import wardrobe_version
+
+CACHE_ALIAS = getattr(settings, 'WARDROBE_RESPONSE_CACHE', 'default')
+CACHE_TTL = getattr(settings, 'WARDROBE_RESPONSE_CACHE_TTL', 300)
+KEY_PREFIX = 'wardrobe-response:v1'
+
+
+def response_etag(request, version: int) -> str:
+    """Strong validator for one user's view of a URL at a wardrobe version"""
+    parts = [str(request.user.pk), str(version), request.get_full_path(), getattr(request, 'accepted_media_type', '')]
+    return '"%s"' % hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def _finish(response, etag: str):
+    response['ETag'] = etag
+    # Per-user data: browsers may keep it but must revalidate, shared caches must not
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie', 'Authorization'))
+    return response
+
+
+def wardrobe_cached(view_func):
+    """
+    Conditional GET and server-side caching for a read API view (apply with
+    method_decorator on `get`).
+
+    The user's wardrobe version, bumped on commit by every item, outfit and wear
+    write, is the validator: a matching If-None-Match costs a 304 without touching
+    the view, and otherwise the response data cached for that version is reused, so
+    serialization only runs once per change. No Last-Modified is sent: its one-second
+    resolution would let a second write within the same second answer 304 wrongly.
+    """
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        # Read the version before the data, so a write landing mid-request bumps it again
+        version = wardrobe_version(request.user.pk)
+        etag = response_etag(request, version)
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return _finish(not_modified, etag)
+
+        cache = caches[CACHE_ALIAS]
+        key = f'{KEY_PREFIX}:{request.user.pk}:{etag.strip(chr(34))}'
+        data = cache.get(key)
+        if data is not None:
+            return _finish(Response(data), etag)
+
+        response = view_func(request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            cache.set(key, response.data, CACHE_TTL)
+            _finish(response, etag)
+        return response
+
+    return _wrapped
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Dict, Any, Iterator, Iterable, Tuple
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from .models import WardrobeItem
+from .serializers import WardrobeItemSerializer
+from .compatibility_index import schedule_index_rebuild
+from .search import index_items
+from .stats import rebuild_user_stats
+from .thumbnail_jobs import schedule_thumbnails
+from .versions import bump_wardrobe_version
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_CHUNK_SIZE = 500
+# Keep the report bounded for files that are mostly invalid
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename: str, default: str = 'csv') -> str:
+    """Import format from a file name: .jsonl/.ndjson are JSON Lines, anything else CSV"""
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def _csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Drop blank cells so optional fields take their defaults, and split the tags cell"""
+    data = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+    tags = data.get('tags')
+    if tags is not None:
+        if tags.startswith('['):
+            try:
+                data['tags'] = json.loads(tags)
+            except ValueError:
+                pass
+        else:
+            data['tags'] = [tag.strip() for tag in tags.split(',') if tag.strip()]
+    return data
+
+
+def iter_rows(stream, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Lazily parse a binary stream into (row number, data) pairs.
+    Unparseable JSON lines yield an error string instead of a dict. Text that is not
+    UTF-8 ends the stream with an error row, so the rows before it are still imported
+    and the report says where it stopped (text is decoded in blocks, so a few rows
+    just before the bad bytes may be skipped too).
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f'Unsupported import format: {fmt}')
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    number = 0
+    try:
+        if fmt == 'csv':
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                yield number, _csv_row(row)
+        else:
+            for number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    yield number, 'Invalid JSON'
+                    continue
+                yield number, data if isinstance(data, dict) else 'Expected a JSON object'
+    except UnicodeDecodeError:
+        yield number + 1, 'File must be UTF-8 encoded; this row and all after it were not imported'
+
+
+def import_items(user, rows: Iterable[Tuple[int, Any]], chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Validate rows with WardrobeItemSerializer and bulk insert them chunk by chunk.
+
+    Each chunk is its own transaction, so memory stays flat for large files and a
+    failure part-way keeps the chunks already committed. bulk_create skips the
+    model signals, so the search index and the wardrobe version are updated per
+    chunk. Work that depends on the whole wardrobe runs once at the end instead, so a
+    chunk costs the same however many items the user already has: the stats rollup
+    is rebuilt and the compatibility index rebuild is queued.
+    """
+    report = {'created': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    rows = iter(rows)
+    # One serializer validates every row; building its fields per row dominates otherwise
+    validator = WardrobeItemSerializer()
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        items = []
+        for number, data in chunk:
+            try:
+                if not isinstance(data, dict):
+                    raise ValidationError({'non_field_errors': [data]})
+                item = WardrobeItem(user=user, **validator.run_validation(data))
+                # bulk_create bypasses save(), which keeps the derived columns in sync
+                item.update_derived_fields()
+                items.append(item)
+                continue
+            except ValidationError as exc:
+                errors = exc.detail
+
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'row': number, 'errors': errors})
+            else:
+                report['errors_truncated'] = True
+
+        if items:
+            with transaction.atomic():
+                created = WardrobeItem.objects.bulk_create(items)
+                index_items(created)
+                bump_wardrobe_version(user.pk)
+                schedule_thumbnails(created)
+            report['created'] += len(created)
+
+    if report['created']:
+        rebuild_user_stats(user.pk)
+        schedule_index_rebuild(user.pk)
+    return report
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from functools import lru_cache
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from typing import List, Dict, Optional
+
+
+class OpenAIChatClient:
+    """
+    Chat completions through the OpenAI API.
+
+    The SDK is imported and its client built on first use, so workers that never
+    call the API don't pay for the import. One instance is shared per process
+    (see get_llm_client) and its httpx pool keeps HTTPS connections alive between
+    requests; it is safe to use from several threads.
+    """
+    model = 'gpt-3.5-turbo'
+    # HTTP connection pool shared by every thread of the process
+    max_connections = 20
+    keepalive_expiry = 60.0
+
+    def __init__(self):
+        self.api_key = settings.OPENAI_API_KEY
+        self.timeout = getattr(settings, 'AI_LLM_TIMEOUT', 30)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import httpx
+                    import openai
+                    http_client = httpx.Client(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                            keepalive_expiry=self.keepalive_expiry,
+                        ),
+                    )
+                    self._client = openai.OpenAI(api_key=self.api_key, timeout=self.timeout, http_client=http_client)
+        return self._client
+
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+
+
+class LocalStylistClient:
+    """
+    Offline stand-in for the LLM used in development and tests.
+    Returns a fixed, well-formed suggestions payload after an optional simulated delay.
+    """
+    suggestions = [
+        {
+            'name': 'Slim Chino Trousers',
+            'category': 'Bottoms',
+            'colors': ['khaki', 'navy'],
+            'price_range': '$50-80',
+            'reason': 'Neutral bottoms that balance most tops',
+            'style': 'Smart casual'
+        },
+        {
+            'name': 'White Leather Sneakers',
+            'category': 'Shoes',
+            'colors': ['white'],
+            'price_range': '$80-120',
+            'reason': 'Clean footwear that works with casual and smart looks',
+            'style': 'Minimal'
+        },
+        {
+            'name': 'Merino Crew Sweater',
+            'category': 'Tops',
+            'colors': ['gray', 'navy'],
+            'price_range': '$60-100',
+            'reason': 'Layering piece in versatile neutral tones',
+            'style': 'Classic'
+        },
+    ]
+
+    def __init__(self, delay: Optional[float] = None):
+        self.delay = getattr(settings, 'AI_LOCAL_LLM_DELAY', 0) if delay is None else delay
+
+    def is_configured(self) -> bool:
+        return True
+
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        return json.dumps({'suggestions': self.suggestions})
+
+
+@lru_cache(maxsize=None)
+def _load_client(path: str):
+    return import_string(path)()
+
+
+def get_llm_client():
+    """The process-wide client named by settings.AI_LLM_CLIENT, or None if it is not configured"""
+    client = _load_client(getattr(settings, 'AI_LLM_CLIENT', 'wardrobe.llm.OpenAIChatClient'))
+    return client if client.is_configured() else None
+
+
+@receiver(setting_changed)
+def reset_llm_client(setting, **kwargs):
+    # Clients read their settings once, when they are created
+    if setting in ('AI_LLM_CLIENT', 'OPENAI_API_KEY', 'AI_LLM_TIMEOUT', 'AI_LOCAL_LLM_DELAY'):
+        _load_client.cache_clear()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from wardrobe.models import WardrobeItem
+from wardrobe.style_features import FEATURE_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Compute and store the style feature columns (and color family) for existing wardrobe items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every item, not only rows that were never computed')
+
+    def handle(self, *args, **options):
+        items = WardrobeItem.objects.order_by('pk')
+        if not options['all']:
+            items = items.filter(formality='')
+        chunk_size = options['chunk_size']
+
+        # Keyset over pk: rows that get filled in drop out of the filter without skipping others
+        count = 0
+        last_pk = 0
+        while True:
+            chunk = list(items.filter(pk__gt=last_pk).only('id', 'name', 'tags', 'color', 'category')[:chunk_size])
+            if not chunk:
+                break
+            for item in chunk:
+                item.update_derived_fields()
+            WardrobeItem.objects.bulk_update(chunk, ['color_family', *FEATURE_FIELDS])
+            count += len(chunk)
+            last_pk = chunk[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f'Stored style features for {count} items'))
@@ -0,0 +1,179 @@
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+from itertools import cycle
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+from wardrobe.profiling import profiled
+from wardrobe.synthetic import generate_wardrobe, throwaway_database
+from wardrobe.versions import bump_wardrobe_version
+
+User = get_user_model()
+
+
+def _percentile(values, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the hot endpoints through the Django test client against synthetic wardrobes '
+        'in a throwaway test database and report latency percentiles, query counts and peak memory as JSON'
+    )
+
+    # name -> (method, url for one of the user's item ids, cached by wardrobe version)
+    SCENARIOS = {
+        'wardrobe_list': ('get', lambda item: reverse('wardrobe:wardrobe_list'), False),
+        'api_wardrobe_items': ('get', lambda item: reverse('wardrobe_api:wardrobe-items'), True),
+        'analytics': ('get', lambda item: reverse('wardrobe_api:analytics'), True),
+        'recommendations': ('get', lambda item: reverse('wardrobe_api:ai-recommendations', args=[item]), False),
+        'outfits': ('get', lambda item: reverse('wardrobe_api:outfits'), True),
+        'wear': ('post', lambda item: reverse('wardrobe_api:increment-wear', args=[item]), False),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--items', type=int, default=500, help='Items per user')
+        parser.add_argument('--outfits', type=int, default=50, help='Outfits per user')
+        parser.add_argument('--wear-events', type=int, default=2000, help='Wear events per user')
+        parser.add_argument('--runs', type=int, default=30, help='Requests per scenario')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--scenario', action='append', dest='scenarios', choices=sorted(self.SCENARIOS),
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--output', help='Also write the report to this file')
+        parser.add_argument('--compare', help='Baseline report to compute deltas against')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read baseline {options["compare"]}: {exc}')
+
+        # Synthetic users live in a throwaway test database; requests commit like in
+        # production, so on-commit cache invalidation runs
+        with throwaway_database():
+            users = []
+            for index in range(options['users']):
+                user = User.objects.create_user(username=f'bench-{index}')
+                generate_wardrobe(user, options['items'], options['outfits'], options['wear_events'],
+                                  seed=options['seed'] + index)
+                users.append(user)
+            # Stub LLM: recommendations are measured without network calls
+            with override_settings(AI_LLM_CLIENT='wardrobe.llm.LocalStylistClient', AI_LOCAL_LLM_DELAY=0):
+                scenarios = self._run(users, options['scenarios'] or list(self.SCENARIOS), options['runs'])
+
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                **{key: options[key] for key in ('users', 'items', 'outfits', 'wear_events', 'runs', 'seed')},
+            },
+            'scenarios': scenarios,
+        }
+        if baseline is not None:
+            report['compare'] = self._compare(baseline.get('scenarios', {}), scenarios)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+        self.stdout.write(output)
+
+    def _run(self, users, names, runs):
+        clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            item_ids = list(user.wardrobe_items.values_list('id', flat=True)[:runs])
+            clients.append((client, user, cycle(item_ids or [0])))
+
+        results = {}
+        for name in names:
+            method, url, cacheable = self.SCENARIOS[name]
+            results[name] = self._measure(clients, method, url, runs, invalidate=True)
+            if cacheable:
+                results[f'{name}:cached'] = self._measure(clients, method, url, runs, invalidate=False)
+        return results
+
+    def _measure(self, clients, method, url, runs, invalidate):
+        """Latency and queries over `runs` requests, then peak memory over one more"""
+        targets = cycle(clients)
+
+        def request():
+            client, user, item_ids = next(targets)
+            if invalidate:
+                # As after any write: the cached response for this version is unusable
+                bump_wardrobe_version(user.pk)
+            path = url(next(item_ids))
+            with profiled() as profile:
+                response = getattr(client, method)(path)
+            if response.status_code >= 400:
+                raise CommandError(f'{method.upper()} {path} returned {response.status_code}')
+            return profile
+
+        # Warm-up, so one-time imports and cache fills are not measured
+        request()
+        timings, queries = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            profile = request()
+            timings.append((time.perf_counter() - start) * 1000)
+            queries.append(profile.queries)
+
+        tracemalloc.start()
+        try:
+            request()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'p50_ms': round(_percentile(timings, 50), 2),
+            'p95_ms': round(_percentile(timings, 95), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': _percentile(queries, 50),
+            'max_queries': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    @staticmethod
+    def _compare(baseline, scenarios):
+        """Ratio of latencies and difference of query counts against a baseline report"""
+        deltas = {}
+        for name, result in scenarios.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            deltas[name] = {
+                'p50_ratio': round(result['p50_ms'] / before['p50_ms'], 2) if before['p50_ms'] else None,
+                'p95_ratio': round(result['p95_ms'] / before['p95_ms'], 2) if before['p95_ms'] else None,
+                'queries_delta': result['queries'] - before['queries'],
+                'peak_memory_ratio': (round(result['peak_memory_kb'] / before['peak_memory_kb'], 2)
+                                      if before['peak_memory_kb'] else None),
+            }
+        return deltas
@@ -0,0 +1,60 @@
+import json
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wardrobe.analytics import build_analytics
+from wardrobe.stats import rebuild_user_stats
+from wardrobe.synthetic import generate_items, generate_wear_events, throwaway_database
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure query count and latency of the analytics builder on a synthetic wardrobe'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000)
+        parser.add_argument('--wear-events', type=int, default=20000)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = User.objects.create_user(username='analytics-benchmark')
+            rng = random.Random(options['seed'])
+            items = generate_items(user, options['items'], rng)
+            generate_wear_events(user, items, [], options['wear_events'], rng)
+            # bulk_create skips the signals that maintain the rollup
+            rebuild_user_stats(user.pk)
+            report = self._measure(user, options['runs'])
+            report['items'] = options['items']
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def _evaluate(self, user):
+        data = build_analytics(user)
+        for key in ('category_data', 'color_data', 'brand_data', 'most_worn', 'least_worn'):
+            data[key] = list(data[key])
+        return data
+
+    def _measure(self, user, runs):
+        with CaptureQueriesContext(connection) as queries:
+            self._evaluate(user)
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            self._evaluate(user)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return {
+            'queries': len(queries.captured_queries),
+            'latency_ms': {
+                'p50': round(statistics.median(timings), 2),
+                'max': round(max(timings), 2),
+            },
+        }
@@ -0,0 +1,85 @@
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from wardrobe.models import WardrobeItem
+from wardrobe.snapshot import SnapshotCache, load_snapshot
+from wardrobe.synthetic import generate_items, throwaway_database
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare memory per item and load latency of wardrobe snapshots against model instances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=5000)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = User.objects.create_user(username='snapshot-benchmark')
+            generate_items(user, options['items'], random.Random(options['seed']))
+            report = self._measure(user, options['items'], options['runs'])
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def _retained_bytes(load) -> int:
+        """Bytes still allocated after load() while its result is alive"""
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = load()
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del result
+        return size
+
+    @staticmethod
+    def _latency(load, runs: int):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            load()
+            timings.append((time.perf_counter() - start) * 1000)
+        return {'p50': round(statistics.median(timings), 2), 'max': round(max(timings), 2)}
+
+    def _measure(self, user, count, runs):
+        def load_models():
+            return list(WardrobeItem.objects.filter(user=user))
+
+        def load_rows():
+            return load_snapshot(user.pk)
+
+        cache = SnapshotCache(max_size=1)
+        cache.get(user.pk)
+        with CaptureQueriesContext(connection) as warm_queries:
+            cache.get(user.pk)
+
+        model_bytes = self._retained_bytes(load_models)
+        snapshot_bytes = self._retained_bytes(load_rows)
+        per_item = max(count, 1)
+
+        return {
+            'items': count,
+            'bytes_per_item': {
+                'model_instances': round(model_bytes / per_item),
+                'snapshot': round(snapshot_bytes / per_item),
+            },
+            'load_ms': {
+                'model_instances': self._latency(load_models, runs),
+                'snapshot_cold': self._latency(load_rows, runs),
+                'snapshot_warm': self._latency(lambda: cache.get(user.pk), runs),
+            },
+            'warm_queries': len(warm_queries.captured_queries),
+        }
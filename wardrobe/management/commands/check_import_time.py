@@ -0,0 +1,71 @@
+import os
+import re
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Imported on first use only; a worker that merely serves requests must not load them.
+# (requests is not listed: rest_framework.compat imports it whenever it is installed.
+# numpy is not listed either: the compatibility score and color tables are numpy arrays
+# built at import, and the post_save signals reindex through them on every item write,
+# so a worker needs numpy as soon as it handles its first write.)
+LAZY_MODULES = ('openai', 'httpx', 'PIL')
+
+# What a worker does before it serves its first request
+STARTUP = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns; '
+    'from django.core.wsgi import get_wsgi_application; get_wsgi_application()'
+)
+
+# "import time: self [us] | cumulative | imported package", nesting shown by indentation
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def measure_startup():
+    """(total microseconds, {module: cumulative microseconds}) of a fresh worker's imports"""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'stylevault.settings')}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise CommandError(f'Worker startup failed:\n{result.stderr[-2000:]}')
+
+    total, modules = 0, {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        modules[module] = int(cumulative)
+        if not indent:
+            total += int(cumulative)
+    return total, modules
+
+
+class Command(BaseCommand):
+    help = 'Measure worker startup imports with -X importtime and fail if lazily loaded modules are imported'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Show the slowest top-level imports')
+        parser.add_argument('--max-ms', type=float, help='Also fail when startup imports take longer than this')
+
+    def handle(self, *args, **options):
+        total, modules = measure_startup()
+
+        top_level = sorted(
+            ((module, us) for module, us in modules.items() if '.' not in module),
+            key=lambda entry: -entry[1]
+        )
+        for module, us in top_level[:options['top']]:
+            self.stdout.write(f'{us / 1000:9.1f} ms  {module}')
+        self.stdout.write(f'Startup imports: {total / 1000:.1f} ms, {len(modules)} modules')
+
+        eager = [module for module in LAZY_MODULES if module in modules]
+        if eager:
+            raise CommandError(f'Imported at startup but should load lazily: {", ".join(eager)}')
+        if options['max_ms'] is not None and total / 1000 > options['max_ms']:
+            raise CommandError(f'Startup imports took {total / 1000:.1f} ms (limit {options["max_ms"]} ms)')
+        self.stdout.write(self.style.SUCCESS('No heavy optional modules imported at startup'))
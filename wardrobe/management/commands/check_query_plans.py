@@ -0,0 +1,65 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from wardrobe.models import WardrobeItem, Outfit, ItemCompatibility, WearEvent
+from wardrobe.pagination import KeysetPaginator
+
+# Full table scans as reported by EXPLAIN on each backend
+FULL_SCAN = {
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)(?!\w)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+def hot_queries(user_id=1):
+    """The per-user queries behind views.py and api_views.py, keyed by where they run"""
+    items = WardrobeItem.objects.filter(user_id=user_id)
+    outfits = Outfit.objects.filter(user_id=user_id)
+    item_pages = KeysetPaginator(items, 12)
+    cursor = [timezone.now(), 1]
+
+    return {
+        'wardrobe_list': item_pages.queryset[:13],
+        'wardrobe_list (next page)': item_pages.queryset.filter(item_pages._after(cursor))[:13],
+        'wardrobe_list (category)': KeysetPaginator(items.filter(category='Tops'), 12).queryset[:13],
+        'dashboard most_worn': items.order_by('-wear_count')[:5],
+        'dashboard least_worn': items.filter(wear_count__lt=3)[:5],
+        'wardrobe item detail': items.filter(pk=1),
+        'outfit_list': KeysetPaginator(outfits, 9).queryset[:10],
+        'outfit detail': outfits.filter(pk=1),
+        'price ranges': items.filter(price__gte=50, price__lt=100).values('price'),
+        'existing matches': ItemCompatibility.objects.filter(item_id=1).order_by('-score', '-match__created_at')[:5],
+        'wear history': WearEvent.objects.filter(user_id=user_id)[:20],
+    }
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot wardrobe queries and fail if any of them scans a whole table'
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN.get(connection.vendor)
+        if pattern is None:
+            self.stdout.write(self.style.WARNING(f'No plan check for {connection.vendor}'))
+            return
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small dev tables make sequential scans look cheaper; ask whether an index can be used at all
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in hot_queries().items():
+                plan = queryset.explain()
+                scans = pattern.findall(plan)
+                if scans:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'{name}: full scan of {", ".join(scans)}'))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(f'{name}: ok')
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries do not use an index')
+        self.stdout.write(self.style.SUCCESS('All hot queries use an index'))
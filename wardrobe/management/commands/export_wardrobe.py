@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from wardrobe.exporter import EXPORT_FORMATS, SECTIONS, export_stream
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Write a user's wardrobe, outfits and wear history to a file for offline backup"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='zip')
+        parser.add_argument('--section', choices=tuple(SECTIONS), default='items',
+                            help='Section to write for --format csv')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user named {options["username"]}')
+
+        chunks = export_stream(user, options['format'], options['section'])[0]
+        size = 0
+        with open(options['path'], 'wb') as output:
+            for chunk in chunks:
+                data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                output.write(data)
+                size += len(data)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {size} bytes to {options["path"]}'))
@@ -0,0 +1,39 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from wardrobe.models import WardrobeItem
+from wardrobe.thumbnail_jobs import process_image
+
+
+class Command(BaseCommand):
+    help = 'Build missing item thumbnails inline, e.g. after bulk inserts or to retry failed images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only items of this username')
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry images that failed before')
+        parser.add_argument('--force', action='store_true', help='Rebuild every thumbnail')
+        parser.add_argument('--limit', type=int, help='Process at most this many distinct images')
+
+    def handle(self, *args, **options):
+        items = WardrobeItem.objects.exclude(image_url='')
+        if options['user']:
+            items = items.filter(user__username=options['user'])
+        if not options['force']:
+            stale = ~Q(thumbnail_source=F('image_url'))
+            if options['retry_failed']:
+                stale |= Q(thumbnails={})
+            items = items.filter(stale)
+
+        by_url = defaultdict(list)
+        for pk, url in items.values_list('pk', 'image_url').iterator():
+            by_url[url].append(pk)
+        urls = list(by_url)[:options['limit']]
+
+        built = failed = 0
+        for url in urls:
+            # Forced and retried images are fetched again rather than copied from another item
+            if process_image(url, by_url[url], reuse=not (options['force'] or options['retry_failed'])):
+                built += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(f'Thumbnails built for {len(urls)} images: {built} ok, {failed} failed'))
@@ -0,0 +1,35 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from wardrobe.importer import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, detect_format, import_items, iter_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Stream wardrobe items for one user from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS,
+                            help='Defaults to the file extension (.jsonl/.ndjson, otherwise CSV)')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user named {options["username"]}')
+
+        fmt = options['format'] or detect_format(options['path'])
+        with open(options['path'], 'rb') as stream:
+            report = import_items(user, iter_rows(stream, fmt), chunk_size=options['chunk_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f'Row {error["row"]}: {json.dumps(error["errors"])}')
+        if report['errors_truncated']:
+            self.stderr.write('Further row errors omitted')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report["created"]} items for {user.username}, {report["failed"]} rows failed'
+        ))
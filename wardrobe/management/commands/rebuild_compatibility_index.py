@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from wardrobe.compatibility_index import rebuild_user_index
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the precomputed item compatibility index from scratch; required once after '
+        'migration 0003 (color families) and after changing WARDROBE_COLOR_KNOWLEDGE_BASE'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help='Only rebuild for this username (repeatable)')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        for user in users.iterator():
+            count = rebuild_user_index(user.pk)
+            self.stdout.write(f'{user.username}: {count} compatibility entries')
+
+        self.stdout.write(self.style.SUCCESS('Compatibility index rebuilt'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from wardrobe.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Drop and repopulate the wardrobe full-text search index (migration 0009 fills it and '
+        'item writes keep it current; use this to repair it)'
+    )
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            self.stdout.write(self.style.WARNING('No full-text backend for this database; search uses icontains'))
+            return
+
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} wardrobe items'))
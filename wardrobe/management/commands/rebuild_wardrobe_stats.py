@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from wardrobe.stats import rebuild_user_stats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Recompute the WardrobeStats rollups from items and outfits (repairs drift)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help='Only rebuild for this username (repeatable)')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        count = 0
+        for user in users.iterator():
+            rebuild_user_stats(user.pk)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt wardrobe stats for {count} users'))
@@ -0,0 +1,153 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:57
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Outfit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('occasion', models.CharField(max_length=50)),
+                ('season', models.CharField(choices=[('All seasons', 'All seasons'), ('Spring', 'Spring'), ('Summer', 'Summer'), ('Fall', 'Fall'), ('Winter', 'Winter')], default='All seasons', max_length=20)),
+                ('rating', models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WardrobeItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('category', models.CharField(choices=[('Tops', 'Tops'), ('Bottoms', 'Bottoms'), ('Outerwear', 'Outerwear'), ('Shoes', 'Shoes'), ('Accessories', 'Accessories')], max_length=20)),
+                ('color', models.CharField(max_length=50)),
+                ('brand', models.CharField(blank=True, max_length=50)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('image_url', models.URLField()),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('wear_count', models.PositiveIntegerField(default=0)),
+                ('last_worn', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wardrobe_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WardrobeStatsBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('category', 'Category'), ('color', 'Color'), ('brand', 'Brand')], max_length=10)),
+                ('value', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_wear', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wardrobe_stats_buckets', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WardrobeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_items', models.IntegerField(default=0)),
+                ('total_outfits', models.IntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_wear', models.IntegerField(default=0)),
+                ('price_under_50', models.IntegerField(default=0)),
+                ('price_50_to_100', models.IntegerField(default=0)),
+                ('price_100_to_200', models.IntegerField(default=0)),
+                ('price_over_200', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='wardrobe_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'wardrobe stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutfitItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('outfit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wardrobe.outfit')),
+                ('wardrobe_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wardrobe.wardrobeitem')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='outfit',
+            name='items',
+            field=models.ManyToManyField(through='wardrobe.OutfitItem', to='wardrobe.wardrobeitem'),
+        ),
+        migrations.AddField(
+            model_name='outfit',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outfits', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='ItemCompatibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('colors_match', models.BooleanField(default=False)),
+                ('categories_match', models.BooleanField(default=False)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compatibilities', to='wardrobe.wardrobeitem')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='wardrobe.wardrobeitem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_compatibilities', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WearEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('worn_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('idempotency_key', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('outfit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='wear_events', to='wardrobe.outfit')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wear_events', to=settings.AUTH_USER_MODEL)),
+                ('wardrobe_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wear_events', to='wardrobe.wardrobeitem')),
+            ],
+            options={
+                'ordering': ['-worn_at'],
+                'indexes': [models.Index(fields=['user', 'worn_at'], name='wardrobe_wear_user_worn')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='wearevent',
+            constraint=models.UniqueConstraint(fields=('user', 'idempotency_key'), name='wardrobe_wear_idempotency'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='wardrobestatsbucket',
+            unique_together={('user', 'dimension', 'value')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='outfititem',
+            unique_together={('outfit', 'wardrobe_item')},
+        ),
+        migrations.AddIndex(
+            model_name='itemcompatibility',
+            index=models.Index(fields=['item', '-score'], name='wardrobe_compat_item_score'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='itemcompatibility',
+            unique_together={('item', 'match')},
+        ),
+    ]
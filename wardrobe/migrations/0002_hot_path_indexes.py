@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outfit',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='wardrobe_outfit_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='wardrobeitem',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='wardrobe_item_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='wardrobeitem',
+            index=models.Index(fields=['user', '-wear_count'], name='wardrobe_item_user_wear'),
+        ),
+        migrations.AddIndex(
+            model_name='wardrobeitem',
+            index=models.Index(fields=['user', 'category', '-created_at'], name='wardrobe_item_user_category'),
+        ),
+        migrations.AddIndex(
+            model_name='wardrobeitem',
+            index=models.Index(fields=['user', 'price'], name='wardrobe_item_user_price'),
+        ),
+        migrations.AddIndex(
+            model_name='wardrobeitem',
+            index=models.Index(condition=models.Q(('wear_count__lt', 3)), fields=['user', '-created_at'], name='wardrobe_item_underused'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:10
+#
+# Color matching moves from substring rules to these families, so compatibility
+# entries computed before this migration are stale: run
+# `python manage.py rebuild_compatibility_index` once after migrating an existing
+# database. The index scoring depends on the live recommendation code and models,
+# which a migration cannot freeze, so it is not rebuilt here.
+
+import re
+from django.db import migrations, models
+
+
+# Frozen copy of wardrobe.colors.ColorKnowledgeBase.families as of this migration,
+# so later changes to the live table do not change what the backfill writes
+COLOR_FAMILIES = {
+    'white': ['white', 'ivory', 'off white', 'snow', 'pearl'],
+    'cream': ['cream', 'ecru', 'eggshell', 'vanilla'],
+    'beige': ['beige', 'tan', 'khaki', 'camel', 'sand', 'nude', 'taupe', 'stone'],
+    'black': ['black', 'jet', 'onyx', 'ebony'],
+    'gray': ['gray', 'grey', 'charcoal', 'silver', 'slate', 'heather', 'ash'],
+    'navy': ['navy', 'navy blue', 'midnight', 'midnight blue', 'dark blue'],
+    'blue': ['blue', 'light blue', 'sky', 'baby blue', 'cobalt', 'royal blue', 'azure', 'turquoise', 'teal'],
+    'denim': ['denim', 'indigo', 'chambray', 'washed blue'],
+    'red': ['red', 'burgundy', 'maroon', 'crimson', 'wine', 'scarlet', 'cherry', 'oxblood'],
+    'pink': ['pink', 'blush', 'rose', 'fuchsia', 'magenta', 'coral', 'salmon'],
+    'orange': ['orange', 'rust', 'peach', 'apricot', 'tangerine'],
+    'yellow': ['yellow', 'mustard', 'gold', 'lemon', 'ochre'],
+    'green': ['green', 'olive', 'sage', 'mint', 'emerald', 'forest', 'army', 'lime'],
+    'purple': ['purple', 'violet', 'lavender', 'lilac', 'plum', 'mauve'],
+    'brown': ['brown', 'chocolate', 'cognac', 'coffee', 'mocha', 'chestnut', 'espresso'],
+}
+COLOR_NAMES = {name: family for family, names in COLOR_FAMILIES.items() for name in names}
+
+
+def normalize_color(color):
+    words = re.findall(r'[a-z]+', (color or '').lower())
+    phrase = ' '.join(words)
+    if phrase in COLOR_NAMES:
+        return COLOR_NAMES[phrase]
+    for word in reversed(words):
+        if word in COLOR_NAMES:
+            return COLOR_NAMES[word]
+    return phrase[:30]
+
+
+def backfill_color_family(apps, schema_editor):
+    WardrobeItem = apps.get_model('wardrobe', 'WardrobeItem')
+    colors = list(WardrobeItem.objects.order_by().values_list('color', flat=True).distinct())
+    for color in colors:
+        WardrobeItem.objects.filter(color=color).update(color_family=normalize_color(color))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wardrobeitem',
+            name='color_family',
+            field=models.CharField(blank=True, editable=False, max_length=30),
+        ),
+        migrations.RunPython(backfill_color_family, migrations.RunPython.noop),
+    ]
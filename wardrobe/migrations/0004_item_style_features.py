@@ -0,0 +1,108 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:13
+
+from django.db import migrations, models
+
+# Frozen copy of wardrobe.style_features.compute_features as of this migration
+STYLES = ('casual', 'formal', 'trendy', 'classic', 'versatile')
+STYLE_KEYWORDS = {
+    'casual': ('casual', 'relaxed', 'comfortable', 'everyday'),
+    'formal': ('formal', 'dress', 'business', 'professional'),
+    'trendy': ('trendy', 'fashion', 'modern', 'contemporary'),
+    'classic': ('classic', 'timeless', 'traditional', 'elegant'),
+}
+FORMAL_INDICATORS = ('suit', 'dress', 'blazer', 'formal', 'business')
+CASUAL_INDICATORS = ('jeans', 'casual', 't-shirt', 'sneakers', 'hoodie')
+SEASON_BITS = {'spring': 1, 'summer': 2, 'fall': 4, 'winter': 8}
+SEASONAL_KEYWORDS = {
+    'spring': ('light', 'cotton', 'spring'),
+    'summer': ('summer', 'shorts', 'tank', 'sandals', 'light'),
+    'fall': ('fall', 'autumn', 'jacket', 'boots'),
+    'winter': ('winter', 'coat', 'warm', 'wool', 'heavy'),
+}
+VERSATILE_COLORS = frozenset({'black', 'white', 'navy', 'gray', 'beige'})
+VERSATILE_CATEGORIES = frozenset({'Tops', 'Bottoms'})
+FEATURE_FIELDS = ('primary_style', 'style_mask', 'formality', 'season_mask', 'versatility')
+
+
+def compute_features(item):
+    text = f"{item.name} {' '.join(item.tags or [])}".lower()
+
+    styles = [style for style, keywords in STYLE_KEYWORDS.items() if any(keyword in text for keyword in keywords)]
+    styles = styles or ['versatile']
+
+    if any(indicator in text for indicator in FORMAL_INDICATORS):
+        formality = 'formal'
+    elif any(indicator in text for indicator in CASUAL_INDICATORS):
+        formality = 'casual'
+    else:
+        formality = 'smart-casual'
+
+    season_mask = 0
+    for season, keywords in SEASONAL_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            season_mask |= SEASON_BITS[season]
+
+    versatility = 0.5
+    if (item.color or '').lower() in VERSATILE_COLORS:
+        versatility += 0.3
+    if item.category in VERSATILE_CATEGORIES:
+        versatility += 0.2
+
+    return {
+        'primary_style': styles[0],
+        'style_mask': sum(1 << STYLES.index(style) for style in styles),
+        'formality': formality,
+        'season_mask': season_mask,
+        'versatility': min(versatility, 1.0),
+    }
+
+
+def backfill_style_features(apps, schema_editor):
+    WardrobeItem = apps.get_model('wardrobe', 'WardrobeItem')
+    items = WardrobeItem.objects.order_by('pk').only('id', 'name', 'tags', 'color', 'category')
+    last_pk = 0
+    while True:
+        chunk = list(items.filter(pk__gt=last_pk)[:1000])
+        if not chunk:
+            break
+        for item in chunk:
+            for field, value in compute_features(item).items():
+                setattr(item, field, value)
+        WardrobeItem.objects.bulk_update(chunk, FEATURE_FIELDS)
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0003_item_color_family'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wardrobeitem',
+            name='formality',
+            field=models.CharField(blank=True, choices=[('casual', 'Casual'), ('smart-casual', 'Smart casual'), ('formal', 'Formal')], editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='wardrobeitem',
+            name='primary_style',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='wardrobeitem',
+            name='season_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='wardrobeitem',
+            name='style_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='wardrobeitem',
+            name='versatility',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_style_features, migrations.RunPython.noop),
+    ]
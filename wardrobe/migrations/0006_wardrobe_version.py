@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_avatar_variants'),
+        ('wardrobe', '0005_item_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WardrobeVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='wardrobe_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:40
+
+from django.db import migrations
+
+# The index now keeps only each item's best matches (wardrobe.compatibility_index.MATCHES_PER_ITEM
+# as of this migration); drop the rest, in the order lookups read them
+MATCHES_PER_ITEM = 5
+
+
+def trim_compatibility_index(apps, schema_editor):
+    ItemCompatibility = apps.get_model('wardrobe', 'ItemCompatibility')
+    rows = ItemCompatibility.objects.order_by('item_id', '-score', '-match__created_at', '-match_id')
+    extra = []
+    item_id, kept = None, 0
+    for pk, row_item_id in rows.values_list('id', 'item_id').iterator(chunk_size=2000):
+        if row_item_id != item_id:
+            item_id, kept = row_item_id, 0
+        kept += 1
+        if kept > MATCHES_PER_ITEM:
+            extra.append(pk)
+    for start in range(0, len(extra), 1000):
+        ItemCompatibility.objects.filter(pk__in=extra[start:start + 1000]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0007_recommendation_job'),
+    ]
+
+    operations = [
+        # Reversing keeps the trimmed index; rebuild_compatibility_index restores every pair on older code
+        migrations.RunPython(trim_compatibility_index, migrations.RunPython.noop),
+    ]
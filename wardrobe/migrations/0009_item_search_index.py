@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-17 13:05
+
+from django.db import migrations
+
+# Frozen copy of the wardrobe.search backends' tables as of this migration. Databases
+# without a full-text backend get no table and search with icontains. The table may
+# already exist (it used to be created after migrate), so it is emptied and refilled.
+SEARCH_TABLE = 'wardrobe_item_search'
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B') || "
+    "setweight(to_tsvector('simple', %s), 'C') || setweight(to_tsvector('simple', %s), 'C')"
+)
+CREATE = {
+    'sqlite': [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+        f'name, brand, color, tags, user_id UNINDEXED, tokenize="unicode61 remove_diacritics 2")',
+    ],
+    'postgresql': [
+        f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+        f'item_id bigint PRIMARY KEY REFERENCES wardrobe_wardrobeitem (id) ON DELETE CASCADE '
+        f'DEFERRABLE INITIALLY DEFERRED, user_id bigint NOT NULL, document tsvector NOT NULL)',
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)',
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_user ON {SEARCH_TABLE} (user_id)',
+    ],
+}
+INSERT = {
+    'sqlite': f'INSERT INTO {SEARCH_TABLE} (rowid, name, brand, color, tags, user_id) VALUES (%s, %s, %s, %s, %s, %s)',
+    'postgresql': f'INSERT INTO {SEARCH_TABLE} (item_id, document, user_id) VALUES (%s, {POSTGRES_DOCUMENT}, %s)',
+}
+CHUNK_SIZE = 1000
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE:
+        return
+    WardrobeItem = apps.get_model('wardrobe', 'WardrobeItem')
+    items = WardrobeItem.objects.using(schema_editor.connection.alias).only(
+        'id', 'user_id', 'name', 'brand', 'color', 'tags'
+    )
+    with schema_editor.connection.cursor() as cursor:
+        for statement in CREATE[vendor]:
+            cursor.execute(statement)
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        rows = []
+        for item in items.iterator(CHUNK_SIZE):
+            tags = ' '.join(str(tag) for tag in item.tags or [])
+            rows.append((item.pk, item.name, item.brand or '', item.color, tags, item.user_id))
+            if len(rows) >= CHUNK_SIZE:
+                cursor.executemany(INSERT[vendor], rows)
+                rows = []
+        if rows:
+            cursor.executemany(INSERT[vendor], rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0008_trim_compatibility_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
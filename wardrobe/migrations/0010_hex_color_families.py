@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:20
+#
+# Hex colors ('#1F2A5C') now normalize to the family of the nearest swatch instead of
+# their letters. Compatibility entries of the refreshed items are stale: run
+# `python manage.py rebuild_compatibility_index` once after migrating, as for 0003.
+
+import re
+from django.db import migrations
+
+# Frozen copy of wardrobe.colors.ColorKnowledgeBase.swatches as of this migration
+COLOR_SWATCHES = {
+    'white': [(255, 255, 255)],
+    'cream': [(255, 253, 208)],
+    'beige': [(225, 198, 153), (210, 180, 140)],
+    'black': [(0, 0, 0)],
+    'gray': [(64, 64, 64), (128, 128, 128), (192, 192, 192)],
+    'navy': [(0, 0, 128), (25, 25, 112)],
+    'blue': [(0, 0, 255), (30, 144, 255), (135, 206, 235)],
+    'denim': [(21, 96, 189)],
+    'red': [(255, 0, 0), (220, 20, 60), (128, 0, 32)],
+    'pink': [(255, 192, 203), (255, 105, 180), (255, 0, 255)],
+    'orange': [(255, 165, 0), (183, 65, 14)],
+    'yellow': [(255, 255, 0), (255, 215, 0)],
+    'green': [(0, 128, 0), (0, 255, 0), (128, 128, 0)],
+    'purple': [(128, 0, 128), (230, 230, 250)],
+    'brown': [(139, 69, 19), (150, 75, 0)],
+}
+HEX_RE = re.compile(r'#([0-9a-f]{3}|[0-9a-f]{6})')
+
+
+def hex_color_family(color):
+    match = HEX_RE.fullmatch((color or '').strip().lower())
+    if not match:
+        return None
+    hex_code = match.group(1)
+    if len(hex_code) == 3:
+        hex_code = ''.join(digit * 2 for digit in hex_code)
+    rgb = [int(hex_code[index:index + 2], 16) for index in (0, 2, 4)]
+    distance, family = min(
+        (sum((a - b) ** 2 for a, b in zip(rgb, swatch)), family)
+        for family, swatches in COLOR_SWATCHES.items() for swatch in swatches
+    )
+    return family
+
+
+def refresh_hex_color_families(apps, schema_editor):
+    WardrobeItem = apps.get_model('wardrobe', 'WardrobeItem')
+    colors = WardrobeItem.objects.filter(color__contains='#').order_by().values_list('color', flat=True).distinct()
+    for color in list(colors):
+        family = hex_color_family(color)
+        if family:
+            WardrobeItem.objects.filter(color=color).update(color_family=family)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wardrobe', '0009_item_search_index'),
+    ]
+
+    operations = [
+        # Older code reads any stored family, so reversing keeps the refreshed ones
+        migrations.RunPython(refresh_hex_color_families, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from .colors import FAMILY_MAX_LENGTH, normalize_color
+from .style_features import FORMALITY_CHOICES, SOURCE_FIELDS, FEATURE_FIELDS, compute_features
+from .thumbnails import picture_sources, pick_thumbnail
 
 User = get_user_model()
 
@@ -17,10 +21,22 @@ class WardrobeItem(models.Model):
     name = models.CharField(max_length=100)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     color = models.CharField(max_length=50)
+    # Canonical family of `color`, kept in sync on save (see wardrobe.colors)
+    color_family = models.CharField(max_length=FAMILY_MAX_LENGTH, blank=True, editable=False)
     brand = models.CharField(max_length=50, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     image_url = models.URLField()
+    # Stored thumbnail names per format and size, built in the background from
+    # thumbnail_source (see wardrobe.thumbnail_jobs); empty if that image failed
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+    thumbnail_source = models.URLField(blank=True, editable=False)
     tags = models.JSONField(default=list, blank=True)
+    # Style features derived on save from name, tags, color and category (see wardrobe.style_features)
+    primary_style = models.CharField(max_length=20, blank=True, editable=False)
+    style_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    formality = models.CharField(max_length=20, choices=FORMALITY_CHOICES, blank=True, editable=False)
+    season_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    versatility = models.FloatField(default=0, editable=False)
     wear_count = models.PositiveIntegerField(default=0)
     last_worn = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -28,10 +44,51 @@ class WardrobeItem(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination seeks on (user, created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='wardrobe_item_user_created'),
+            models.Index(fields=['user', '-wear_count'], name='wardrobe_item_user_wear'),
+            models.Index(fields=['user', 'category', '-created_at'], name='wardrobe_item_user_category'),
+            models.Index(fields=['user', 'price'], name='wardrobe_item_user_price'),
+            # Underused items (wear_count < 3); skipped on backends without partial indexes
+            models.Index(
+                fields=['user', '-created_at'], name='wardrobe_item_underused',
+                condition=models.Q(wear_count__lt=3)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.category})"
 
+    def update_derived_fields(self):
+        """Recompute color_family and the style feature columns from their source fields"""
+        self.color_family = normalize_color(self.color)
+        for field, value in compute_features(self).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.update_derived_fields()
+        elif SOURCE_FIELDS.intersection(update_fields):
+            self.update_derived_fields()
+            kwargs['update_fields'] = {*update_fields, 'color_family', *FEATURE_FIELDS}
+        super().save(*args, **kwargs)
+
+    @property
+    def current_thumbnails(self):
+        """Thumbnails of the current image_url; empty until they are built"""
+        return self.thumbnails if self.thumbnail_source == self.image_url else {}
+
+    @property
+    def thumbnail_url(self):
+        """Card-sized WebP thumbnail, falling back to the full-size image_url"""
+        return pick_thumbnail(self.current_thumbnails) or self.image_url
+
+    @property
+    def thumbnail_sources(self):
+        return picture_sources(self.current_thumbnails)
+
     def get_tags_display(self):
         return ', '.join(self.tags) if self.tags else ''
 
@@ -58,6 +115,9 @@ class Outfit(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='wardrobe_outfit_user_created'),
+        ]
 
     def __str__(self):
         return self.name
@@ -76,4 +136,128 @@ class OutfitItem(models.Model):
         unique_together = ('outfit', 'wardrobe_item')
 
     def __str__(self):
-        return f"{self.outfit.name} - {self.wardrobe_item.name}"
\ No newline at end of file
+        return f"{self.outfit.name} - {self.wardrobe_item.name}"
+
+class WearEvent(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wear_events')
+    wardrobe_item = models.ForeignKey(WardrobeItem, on_delete=models.CASCADE, related_name='wear_events')
+    outfit = models.ForeignKey(Outfit, on_delete=models.SET_NULL, null=True, blank=True, related_name='wear_events')
+    worn_at = models.DateTimeField(default=timezone.now)
+    # Client-supplied key so queued offline logs can be retried safely
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-worn_at']
+        indexes = [
+            models.Index(fields=['user', 'worn_at'], name='wardrobe_wear_user_worn'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'idempotency_key'], name='wardrobe_wear_idempotency'),
+        ]
+
+    def __str__(self):
+        return f"{self.wardrobe_item.name} worn {self.worn_at:%Y-%m-%d}"
+
+class ItemCompatibility(models.Model):
+    # Each item's best few matches, kept current on item writes (see wardrobe.compatibility_index)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='item_compatibilities')
+    item = models.ForeignKey(WardrobeItem, on_delete=models.CASCADE, related_name='compatibilities')
+    match = models.ForeignKey(WardrobeItem, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    colors_match = models.BooleanField(default=False)
+    categories_match = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('item', 'match')
+        indexes = [
+            models.Index(fields=['item', '-score'], name='wardrobe_compat_item_score'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} -> {self.match_id} ({self.score})"
+
+class WardrobeStats(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='wardrobe_stats')
+    total_items = models.IntegerField(default=0)
+    total_outfits = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_wear = models.IntegerField(default=0)
+    price_under_50 = models.IntegerField(default=0)
+    price_50_to_100 = models.IntegerField(default=0)
+    price_100_to_200 = models.IntegerField(default=0)
+    price_over_200 = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'wardrobe stats'
+
+    def __str__(self):
+        return f"Stats for {self.user}"
+
+    @property
+    def avg_wear_count(self):
+        return self.total_wear / self.total_items if self.total_items else 0
+
+    @property
+    def price_ranges(self):
+        return {
+            'under_50': self.price_under_50,
+            '50_to_100': self.price_50_to_100,
+            '100_to_200': self.price_100_to_200,
+            'over_200': self.price_over_200,
+        }
+
+class WardrobeStatsBucket(models.Model):
+    DIMENSION_CHOICES = [
+        ('category', 'Category'),
+        ('color', 'Color'),
+        ('brand', 'Brand'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wardrobe_stats_buckets')
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_wear = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'dimension', 'value')
+
+    def __str__(self):
+        return f"{self.dimension}={self.value}: {self.count}"
+
+    @property
+    def avg_wear(self):
+        return self.total_wear / self.count if self.count else 0
+
+
+class RecommendationJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    ]
+
+    token = models.CharField(max_length=32, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recommendation_jobs')
+    item = models.ForeignKey(WardrobeItem, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    shopping_suggestions = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='wardrobe_job_created'),
+        ]
+
+    def __str__(self):
+        return f"Suggestions job {self.token} ({self.status})"
+
+class WardrobeVersion(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='wardrobe_version')
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Wardrobe version {self.version} of {self.user_id}"
@@ -0,0 +1,165 @@
+import numpy as np
+from typing import List, Dict, Any, Optional
+from .ai_recommendations import AIRecommendationEngine
+from .compatibility import SCORE_TABLE
+from .snapshot import SnapshotItem, get_snapshot
+from .style_features import SEASON_BITS, item_features
+
+REQUIRED_SLOTS = ('Tops', 'Bottoms', 'Shoes')
+OPTIONAL_SLOTS = ('Outerwear', 'Accessories')
+SLOTS = REQUIRED_SLOTS + OPTIONAL_SLOTS
+
+# Outfit score = PAIR_WEIGHT * mean pairwise compatibility + FIT_WEIGHT * mean occasion fit
+PAIR_WEIGHT = 0.8
+FIT_WEIGHT = 0.2
+BEAM_WIDTH = 64
+# Per-slot candidates kept (best occasion fit first) before the search starts
+MAX_CANDIDATES = 150
+
+OCCASION_FORMALITY = {
+    'formal': 'formal', 'business': 'formal', 'wedding': 'formal', 'interview': 'formal',
+    'work': 'smart-casual', 'office': 'smart-casual', 'date': 'smart-casual', 'party': 'smart-casual',
+    'dinner': 'smart-casual', 'casual': 'casual', 'weekend': 'casual', 'travel': 'casual',
+    'sport': 'casual', 'gym': 'casual',
+}
+FORMALITY_LEVELS = ('casual', 'smart-casual', 'formal')
+
+
+def load_candidates(user) -> List[SnapshotItem]:
+    """
+    A user's slot items from the wardrobe snapshot cache.
+    Building model instances costs more than the search itself on large wardrobes.
+    """
+    return [item for item in get_snapshot(user.pk).items if item.category in SLOTS]
+
+
+class OutfitGenerator:
+    """
+    Builds complete outfits (top, bottom and shoes, plus optional outerwear and
+    accessories) from a wardrobe with beam search over pairwise compatibility.
+
+    Slots are filled in a fixed order; after each slot only the BEAM_WIDTH best
+    partial outfits survive, so the cost grows linearly with the number of items
+    instead of with the Cartesian product of the slots.
+    """
+
+    def __init__(self, items, engine: Optional[AIRecommendationEngine] = None):
+        self.items = list(items)
+        self.engine = engine or AIRecommendationEngine()
+
+    def suggest(self, occasion: str = '', season: str = '', k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k outfits for an occasion and season, best first"""
+        candidates, fit = [], []
+        for item in self.items:
+            if item.category not in SLOTS:
+                continue
+            features = item_features(item)
+            if self._in_season(features, season):
+                candidates.append(item)
+                fit.append(self._occasion_fit(item, features, occasion))
+        fit = np.array(fit, dtype=np.float64)
+
+        slots = []
+        for slot in SLOTS:
+            indices = np.array([i for i, item in enumerate(candidates) if item.category == slot], dtype=np.int64)
+            if not indices.size and slot in REQUIRED_SLOTS:
+                return []
+            # Stable, so equally fitting items keep wardrobe order
+            order = np.argsort(-fit[indices], kind='stable')[:MAX_CANDIDATES]
+            slots.append((indices[order], slot in OPTIONAL_SLOTS))
+
+        kept = np.concatenate([indices for indices, _ in slots])
+        items = [candidates[i] for i in kept.tolist()]
+        fit = fit[kept]
+        # Symmetric pair scores: the category rule is one-directional
+        pair = SCORE_TABLE[self.engine.build_wardrobe_matrix(items).pair_codes()]
+        pair = (pair + pair.T) / 2
+
+        offset = 0
+        local_slots = []
+        for indices, optional in slots:
+            local_slots.append((np.arange(offset, offset + indices.size), optional))
+            offset += indices.size
+
+        members, pair_sum, fit_sum = self._search(local_slots, pair, fit, max(BEAM_WIDTH, k))
+        scores = self._score(pair_sum, fit_sum, members)
+        best = np.argsort(-scores, kind='stable')[:k]
+
+        suggestions = []
+        for row in best.tolist():
+            chosen = [int(i) for i in members[row] if i >= 0]
+            size = len(chosen)
+            suggestions.append({
+                'items': [items[i] for i in chosen],
+                'score': round(float(scores[row]), 4),
+                'compatibility': round(float(pair_sum[row] / (size * (size - 1) / 2)), 4),
+            })
+        return suggestions
+
+    def _search(self, slots, pair: np.ndarray, fit: np.ndarray, beam_width: int):
+        """
+        Beam search over the slots. States are rows of `members` (item index per
+        slot, -1 for a skipped optional slot) with running pair and fit sums.
+        """
+        members = np.zeros((1, 0), dtype=np.int64)
+        pair_sum = np.zeros(1)
+        fit_sum = np.zeros(1)
+
+        for candidates, optional in slots:
+            chosen = np.where(members >= 0, members, 0)
+            present = (members >= 0).astype(np.float64)
+            # Added pair score of every (state, candidate): sum over the state's items
+            added = np.einsum('sm,smc->sc', present, pair[chosen][:, :, candidates]) if members.shape[1] else \
+                np.zeros((1, candidates.size))
+
+            states = members.shape[0]
+            new_members = np.concatenate([
+                np.repeat(members, candidates.size, axis=0),
+                np.tile(candidates, states)[:, None],
+            ], axis=1)
+            new_pair = (pair_sum[:, None] + added).ravel()
+            new_fit = (fit_sum[:, None] + fit[candidates][None, :]).ravel()
+
+            if optional:
+                skipped = np.concatenate([members, np.full((states, 1), -1, dtype=np.int64)], axis=1)
+                new_members = np.concatenate([new_members, skipped])
+                new_pair = np.concatenate([new_pair, pair_sum])
+                new_fit = np.concatenate([new_fit, fit_sum])
+
+            members, pair_sum, fit_sum = new_members, new_pair, new_fit
+            # Single items have no pairs yet, so only prune once outfits have two
+            if members.shape[1] >= 2 and members.shape[0] > beam_width:
+                scores = self._score(pair_sum, fit_sum, members)
+                keep = np.argpartition(-scores, beam_width - 1)[:beam_width]
+                members, pair_sum, fit_sum = members[keep], pair_sum[keep], fit_sum[keep]
+
+        return members, pair_sum, fit_sum
+
+    @staticmethod
+    def _score(pair_sum: np.ndarray, fit_sum: np.ndarray, members: np.ndarray) -> np.ndarray:
+        sizes = (members >= 0).sum(axis=1).astype(np.float64)
+        pairs = np.maximum(sizes * (sizes - 1) / 2, 1)
+        return PAIR_WEIGHT * pair_sum / pairs + FIT_WEIGHT * fit_sum / np.maximum(sizes, 1)
+
+    @staticmethod
+    def _in_season(features: Dict[str, Any], season: str) -> bool:
+        season = (season or '').lower()
+        if season not in SEASON_BITS:
+            return True
+        mask = features['season_mask']
+        # No season keywords means all-season
+        return not mask or bool(mask & SEASON_BITS[season])
+
+    @staticmethod
+    def _occasion_fit(item, features: Dict[str, Any], occasion: str) -> float:
+        """1.0 for the occasion's formality (or a matching tag), 0.5 one level off, 0 otherwise"""
+        occasion = (occasion or '').lower().strip()
+        if not occasion:
+            return 1.0
+        if occasion in (tag.lower() for tag in item.tags):
+            return 1.0
+        target = OCCASION_FORMALITY.get(occasion)
+        if target is None:
+            return 1.0
+        distance = abs(FORMALITY_LEVELS.index(target) - FORMALITY_LEVELS.index(features['formality']))
+        return 1.0 - distance / 2
@@ -0,0 +1,24 @@
+from django.db.models import Count, Prefetch
+from .models import WardrobeItem
+
+PREVIEW_ITEMS = 4
+
+
+def with_item_count(queryset):
+    """Annotate item_count so listing pages don't run a COUNT per outfit"""
+    return queryset.annotate(item_count=Count('items'))
+
+
+def with_preview_items(queryset, limit: int = PREVIEW_ITEMS):
+    """
+    Prefetch only the newest `limit` items of each outfit into preview_items.
+    Django runs this as one windowed query for the whole page.
+    """
+    return queryset.prefetch_related(
+        Prefetch('items', queryset=WardrobeItem.objects.all()[:limit], to_attr='preview_items')
+    )
+
+
+def with_items(queryset):
+    """Prefetch every item of each outfit, for full serialization"""
+    return queryset.prefetch_related('items')
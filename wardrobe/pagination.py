@@ -0,0 +1,188 @@
+import base64
+import binascii
+import json
+import math
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework import exceptions
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def encode_cursor(values) -> str:
+    payload = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _is_cursor_value(value) -> bool:
+    """What encode_cursor writes: strings and numbers a database column can hold"""
+    if isinstance(value, str):
+        return True
+    if isinstance(value, int):
+        return -2 ** 63 <= value < 2 ** 63
+    return isinstance(value, float) and math.isfinite(value)
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or not all(_is_cursor_value(value) for value in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, has_previous):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over the queryset's ordering plus a final id tie-break.
+
+    Each page is a range scan starting right after the last row of the previous
+    page, so no COUNT(*) or OFFSET is needed and deep pages cost the same as the first.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.per_page = per_page
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering.append('-id' if ordering and ordering[0].startswith('-') else 'id')
+        self.ordering = ordering
+        self.queryset = queryset.order_by(*ordering)
+
+    def _fields(self):
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def _to_python(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field('id' if name == 'pk' else name)
+        except FieldDoesNotExist:
+            # Annotations such as search_rank are numbers and round-trip through JSON unchanged
+            if isinstance(value, str):
+                raise ValidationError('Invalid cursor')
+            return value
+        try:
+            return field.to_python(value)
+        except TypeError:
+            raise ValidationError('Invalid cursor')
+
+    def _after(self, values):
+        """Rows strictly after the cursor position in ordering order"""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._fields(), values):
+            condition |= equal & Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_page(self, cursor=None) -> KeysetPage:
+        """Page after cursor; an invalid cursor raises ValueError"""
+        queryset = self.queryset
+        if cursor:
+            values = decode_cursor(cursor)
+            fields = self._fields()
+            if len(values) != len(fields):
+                raise ValueError('Invalid cursor')
+            try:
+                values = [self._to_python(name, value) for (name, _), value in zip(fields, values)]
+            except ValidationError:
+                raise ValueError('Invalid cursor')
+            queryset = queryset.filter(self._after(values))
+
+        rows = list(queryset[:self.per_page + 1])
+        object_list = rows[:self.per_page]
+        next_cursor = None
+        if len(rows) > self.per_page:
+            last = object_list[-1]
+            next_cursor = encode_cursor([getattr(last, name) for name, _ in self._fields()])
+        return KeysetPage(object_list, next_cursor, has_previous=bool(cursor))
+
+
+def paginate_request(request, queryset, per_page) -> KeysetPage:
+    """Keyset page for a template view, with querystrings for the next and first pages"""
+    paginator = KeysetPaginator(queryset, per_page)
+    try:
+        page = paginator.get_page(request.GET.get('cursor'))
+    except ValueError:
+        page = paginator.get_page()
+
+    query = request.GET.copy()
+    query.pop('cursor', None)
+    page.first_query = query.urlencode()
+    if page.next_cursor:
+        query['cursor'] = page.next_cursor
+    page.next_query = query.urlencode()
+    return page
+
+
+class KeysetCursorPagination(BasePagination):
+    """DRF pagination backed by KeysetPaginator: {'next': url, 'results': [...]}"""
+    page_size = 24
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.get_page_size(request))
+        try:
+            self.page = paginator.get_page(request.query_params.get(self.cursor_query_param))
+        except ValueError:
+            raise exceptions.ValidationError({self.cursor_query_param: ['Invalid cursor.']})
+        return list(self.page)
+
+    def get_next_link(self):
+        if not self.page.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.page.next_cursor)
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'first': {'type': 'string'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,276 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('sql', 'serialize', 'llm')
+# Budget keys: 'queries' plus '<section>_ms' and 'total_ms'
+BUDGET_KEYS = ('queries', 'total_ms') + tuple(f'{section}_ms' for section in SECTIONS)
+# Upper bounds (ms) of the request latency histogram
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class BudgetExceeded(AssertionError):
+    """A request or block went over its query or time budget"""
+
+
+class Profile:
+    """Query count and per-section milliseconds of one request or block"""
+
+    __slots__ = ('queries', 'timings', 'total_ms', '_open')
+
+    def __init__(self):
+        self.queries = 0
+        self.timings = dict.fromkeys(SECTIONS, 0.0)
+        self.total_ms = 0.0
+        self._open = set()
+
+    def as_dict(self) -> Dict[str, float]:
+        data = {'queries': self.queries, 'total_ms': round(self.total_ms, 3)}
+        data.update({f'{section}_ms': round(ms, 3) for section, ms in self.timings.items()})
+        return data
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, shown per request in browser dev tools"""
+        parts = [f'{section};dur={ms:.1f}' for section, ms in self.timings.items()]
+        parts.append(f'total;dur={self.total_ms:.1f};desc="{self.queries} queries"')
+        return ', '.join(parts)
+
+
+_current: ContextVar[Optional[Profile]] = ContextVar('wardrobe_profile', default=None)
+
+
+@contextmanager
+def profile_section(name: str):
+    """Time a block into the current profile; nested blocks of the same name count once"""
+    profile = _current.get()
+    if profile is None or name in profile._open:
+        yield
+        return
+    profile._open.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.timings[name] += (time.perf_counter() - start) * 1000
+        profile._open.discard(name)
+
+
+class ProfiledJSONRenderer(JSONRenderer):
+    """JSONRenderer whose encoding time counts as serialization"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with profile_section('serialize'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class PrometheusTextRenderer(BaseRenderer):
+    """Renders text exposition format strings (and error payloads as plain text)"""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return str(data).encode(self.charset)
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.timings['sql'] += (time.perf_counter() - start) * 1000
+
+
+@contextmanager
+def profiled():
+    """
+    Profile the enclosed block: queries on every database alias plus the time of
+    profile_section blocks. A nested profile also counts towards the outer one.
+    Work handed to other threads is not seen, since their context starts empty.
+    """
+    parent = _current.get()
+    profile = Profile()
+    token = _current.set(profile)
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            # An outer profile's wrappers already see this thread's queries
+            if parent is None:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_record_query))
+            yield profile
+    finally:
+        profile.total_ms = (time.perf_counter() - start) * 1000
+        _current.reset(token)
+        if parent is not None:
+            parent.queries += profile.queries
+            for section, ms in profile.timings.items():
+                if section not in parent._open:
+                    parent.timings[section] += ms
+
+
+def budget_violations(profile: Profile, budget: Dict[str, float]) -> List[str]:
+    """Human-readable list of the limits a profile went over"""
+    measured = profile.as_dict()
+    return [
+        f'{key} {measured[key]} > {limit}'
+        for key, limit in budget.items()
+        if key in BUDGET_KEYS and limit is not None and measured[key] > limit
+    ]
+
+
+@contextmanager
+def query_budget(label: str = 'block', **budget):
+    """
+    Fail the enclosed block with BudgetExceeded when it goes over budget, e.g.
+
+        with query_budget('analytics', queries=3):
+            client.get('/api/analytics/')
+    """
+    unknown = set(budget) - set(BUDGET_KEYS)
+    if unknown:
+        raise ValueError(f'Unknown budget keys: {", ".join(sorted(unknown))}')
+    with profiled() as profile:
+        yield profile
+    violations = budget_violations(profile, budget)
+    if violations:
+        raise BudgetExceeded(f'{label} over budget: {"; ".join(violations)}')
+
+
+class MetricsRegistry:
+    """Process-wide request totals per view name, exposed in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._collectors = []
+
+    def register_collector(self, collector: Callable[[], Dict[str, Tuple[str, str, float]]]):
+        """Add a callable returning {metric name: (type, help, value)}, read on every scrape"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def record(self, view: str, profile: Profile, over_budget: bool = False):
+        with self._lock:
+            entry = self._views.get(view)
+            if entry is None:
+                entry = self._views[view] = {
+                    'requests': 0, 'queries': 0, 'over_budget': 0,
+                    'seconds': dict.fromkeys(SECTIONS + ('total',), 0.0),
+                    'buckets': [0] * len(LATENCY_BUCKETS),
+                }
+            entry['requests'] += 1
+            entry['queries'] += profile.queries
+            entry['over_budget'] += int(over_budget)
+            for section, ms in profile.timings.items():
+                entry['seconds'][section] += ms / 1000
+            entry['seconds']['total'] += profile.total_ms / 1000
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if profile.total_ms <= bound:
+                    entry['buckets'][index] += 1
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                view: {**entry, 'seconds': dict(entry['seconds']), 'buckets': list(entry['buckets'])}
+                for view, entry in self._views.items()
+            }
+
+    def render_prometheus(self) -> str:
+        views = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        def label(view, **extra):
+            pairs = [('view', view)] + list(extra.items())
+            return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+        family('stylevault_requests_total', 'counter', 'Profiled requests',
+               [f'stylevault_requests_total{label(view)} {entry["requests"]}' for view, entry in views])
+        family('stylevault_db_queries_total', 'counter', 'SQL queries run by requests',
+               [f'stylevault_db_queries_total{label(view)} {entry["queries"]}' for view, entry in views])
+        family('stylevault_section_seconds_total', 'counter', 'Time spent per request section',
+               [f'stylevault_section_seconds_total{label(view, section=section)} {seconds:.6f}'
+                for view, entry in views for section, seconds in entry['seconds'].items() if section != 'total'])
+        family('stylevault_budget_exceeded_total', 'counter', 'Requests over their performance budget',
+               [f'stylevault_budget_exceeded_total{label(view)} {entry["over_budget"]}' for view, entry in views])
+
+        samples = []
+        for view, entry in views:
+            for bound, count in zip(LATENCY_BUCKETS, entry['buckets']):
+                samples.append(f'stylevault_request_duration_seconds_bucket{label(view, le=bound / 1000)} {count}')
+            samples.append(f'stylevault_request_duration_seconds_bucket{label(view, le="+Inf")} {entry["requests"]}')
+            samples.append(f'stylevault_request_duration_seconds_sum{label(view)} {entry["seconds"]["total"]:.6f}')
+            samples.append(f'stylevault_request_duration_seconds_count{label(view)} {entry["requests"]}')
+        family('stylevault_request_duration_seconds', 'histogram', 'Request latency', samples)
+
+        for collector in list(self._collectors):
+            for name, (kind, help_text, value) in collector().items():
+                family(name, kind, help_text, [f'{name} {value}'])
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metrics = MetricsRegistry()
+
+
+class ProfilingMiddleware:
+    """
+    Profile every request, record it under its URL name in `metrics`, add a
+    Server-Timing header (with WARDROBE_SERVER_TIMING), and check settings.WARDROBE_PERFORMANCE_BUDGETS
+    ('GET wardrobe_api:analytics', or a bare URL name for every method).
+    Over-budget requests are logged, or raise BudgetExceeded when
+    WARDROBE_PERFORMANCE_BUDGETS_STRICT is on (as it should be in tests).
+    Streaming bodies are produced after the middleware returns and are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'WARDROBE_PROFILING', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'WARDROBE_PERFORMANCE_BUDGETS', {})
+        self.strict = getattr(settings, 'WARDROBE_PERFORMANCE_BUDGETS_STRICT', False)
+        self.server_timing = getattr(settings, 'WARDROBE_SERVER_TIMING', settings.DEBUG)
+
+    def __call__(self, request):
+        with profiled() as profile:
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        budget = self.budgets.get(f'{request.method} {view}', self.budgets.get(view))
+        violations = budget_violations(profile, budget) if budget else []
+        metrics.record(view, profile, over_budget=bool(violations))
+        if self.server_timing:
+            response['Server-Timing'] = profile.server_timing()
+
+        if violations:
+            message = f'{request.method} {request.path} ({view}) over budget: {"; ".join(violations)}'
+            if self.strict:
+                raise BudgetExceeded(message)
+            logger.warning(message)
+        return response
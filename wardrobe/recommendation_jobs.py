@@ -0,0 +1,85 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from typing import Dict, Any, Optional
+from .models import RecommendationJob
+from .suggestion_cache import get_cached_suggestions
+
+logger = logging.getLogger(__name__)
+
+# Job state lives in RecommendationJob rows so a poll may land on any process; the jobs
+# themselves run on this process's thread pool
+JOB_TTL = getattr(settings, 'AI_RECOMMENDATION_JOB_TTL', 600)
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'AI_RECOMMENDATION_WORKERS', 4),
+            thread_name_prefix='ai-suggestions'
+        )
+    return _executor
+
+
+def _expiry_cutoff():
+    return timezone.now() - timedelta(seconds=JOB_TTL)
+
+
+def _run_job(token: str, item, engine):
+    try:
+        suggestions = engine._get_ai_shopping_suggestions(item)
+        state = {'status': 'complete', 'shopping_suggestions': suggestions}
+    except Exception as e:
+        logger.error(f"Error in background suggestions job: {str(e)}")
+        state = {'status': 'failed', 'shopping_suggestions': []}
+    try:
+        RecommendationJob.objects.filter(token=token, status='pending').update(**state)
+    finally:
+        close_old_connections()
+
+
+def start_suggestions_job(item, engine) -> Dict[str, Any]:
+    """
+    Deliver shopping suggestions without blocking the request.
+    Returns them inline when already cached, otherwise a token for polling the background job
+    (run inline at commit with AI_RECOMMENDATION_WORKERS = 0).
+    """
+    suggestions = get_cached_suggestions(item) if engine.llm_client is not None else None
+    if suggestions is not None:
+        return {'status': 'complete', 'token': None, 'shopping_suggestions': suggestions}
+
+    # Expired jobs are cleared as new ones start
+    RecommendationJob.objects.filter(created_at__lt=_expiry_cutoff()).delete()
+    token = uuid.uuid4().hex
+    RecommendationJob.objects.create(token=token, user_id=item.user_id, item=item)
+
+    def submit():
+        if getattr(settings, 'AI_RECOMMENDATION_WORKERS', 4) <= 0:
+            _run_job(token, item, engine)
+        else:
+            _get_executor().submit(_run_job, token, item, engine)
+
+    transaction.on_commit(submit)
+    return {'status': 'pending', 'token': token, 'shopping_suggestions': []}
+
+
+def get_job(token: str, user_id: int) -> Optional[Dict[str, Any]]:
+    """Job state for its owner, or None if unknown or expired"""
+    job = RecommendationJob.objects.filter(token=token, user_id=user_id).values(
+        'item_id', 'status', 'shopping_suggestions', 'created_at'
+    ).first()
+    if job is None:
+        return None
+    if job.pop('created_at') < _expiry_cutoff():
+        if job['status'] != 'pending':
+            return None
+        # Its worker never reported back, so the client should stop polling
+        job['status'] = 'failed'
+    return job
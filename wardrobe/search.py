@@ -0,0 +1,184 @@
+import logging
+import re
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import WardrobeItem
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'wardrobe_item_search'
+SEARCH_FIELDS = frozenset({'name', 'brand', 'color', 'tags'})
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class _SQLiteBackend:
+    """FTS5 virtual table keyed by item id, ranked with BM25"""
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+            f'name, brand, color, tags, user_id UNINDEXED, tokenize="unicode61 remove_diacritics 2")'
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def upsert(self, cursor, rows):
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, brand, color, tags, user_id) VALUES (%s, %s, %s, %s, %s, %s)',
+            rows
+        )
+
+    def delete(self, cursor, item_id):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [item_id])
+
+    def match(self, tokens) -> str:
+        # Quote every token so user input can never be parsed as FTS5 syntax; trailing * = prefix match
+        return ' AND '.join(f'"{token}"*' for token in tokens)
+
+    def matching_ids(self):
+        return f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND user_id = %s'
+
+    def rank(self, table):
+        # bm25 is lower for better matches; name outweighs brand, color and tags
+        return (
+            f'SELECT bm25({SEARCH_TABLE}, 10.0, 5.0, 3.0, 2.0) FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = {table}.id'
+        )
+
+
+class _PostgresBackend:
+    """Weighted tsvector per item with a GIN index, ranked with ts_rank"""
+
+    document = (
+        "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C') || setweight(to_tsvector('simple', %s), 'C')"
+    )
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            f'item_id bigint PRIMARY KEY REFERENCES wardrobe_wardrobeitem (id) ON DELETE CASCADE '
+            f'DEFERRABLE INITIALLY DEFERRED, user_id bigint NOT NULL, document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_user ON {SEARCH_TABLE} (user_id)')
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def upsert(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (item_id, document, user_id) VALUES (%s, {self.document}, %s) '
+            f'ON CONFLICT (item_id) DO UPDATE SET document = EXCLUDED.document, user_id = EXCLUDED.user_id',
+            rows
+        )
+
+    def delete(self, cursor, item_id):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE item_id = %s', [item_id])
+
+    def match(self, tokens) -> str:
+        return ' & '.join(f"{token}:*" for token in tokens)
+
+    def matching_ids(self):
+        return (
+            f"SELECT item_id FROM {SEARCH_TABLE} "
+            f"WHERE document @@ to_tsquery('simple', %s) AND user_id = %s"
+        )
+
+    def rank(self, table):
+        # Negated so that, as with bm25, lower sorts first
+        return (
+            f"SELECT -ts_rank(document, to_tsquery('simple', %s)) FROM {SEARCH_TABLE} "
+            f"WHERE item_id = {table}.id"
+        )
+
+
+_BACKENDS = {
+    'sqlite': _SQLiteBackend,
+    'postgresql': _PostgresBackend,
+}
+
+
+def get_backend():
+    """Full-text backend for the default database, or None to fall back to icontains"""
+    backend = _BACKENDS.get(connection.vendor)
+    return backend() if backend else None
+
+
+def _row(item):
+    tags = ' '.join(str(tag) for tag in item.tags or [])
+    return (item.pk, item.name, item.brand or '', item.color, tags, item.user_id)
+
+
+def index_item(item):
+    index_items([item])
+
+
+def index_items(items):
+    """Index several items at once, e.g. after a bulk_create that skipped the signals"""
+    backend = get_backend()
+    if backend and items:
+        with connection.cursor() as cursor:
+            backend.upsert(cursor, [_row(item) for item in items])
+
+
+def unindex_item(item_id):
+    backend = get_backend()
+    if backend:
+        with connection.cursor() as cursor:
+            backend.delete(cursor, item_id)
+
+
+@transaction.atomic
+def rebuild_index(chunk_size=1000) -> int:
+    """Drop and repopulate the search index from all wardrobe items"""
+    backend = get_backend()
+    if not backend:
+        return 0
+
+    count = 0
+    with connection.cursor() as cursor:
+        backend.drop(cursor)
+        backend.create(cursor)
+        rows = []
+        for item in WardrobeItem.objects.only('id', 'user_id', 'name', 'brand', 'color', 'tags').iterator(chunk_size):
+            rows.append(_row(item))
+            if len(rows) >= chunk_size:
+                backend.upsert(cursor, rows)
+                count += len(rows)
+                rows = []
+        if rows:
+            backend.upsert(cursor, rows)
+            count += len(rows)
+    return count
+
+
+def search_items(queryset, user, query):
+    """
+    Filter a user's item queryset to matches for a free-text query, best matches first.
+    Matches words by prefix across name, brand, color and tags.
+    """
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return queryset
+
+    backend = get_backend()
+    if backend is None:
+        conditions = Q()
+        for token in tokens:
+            conditions &= (
+                Q(name__icontains=token) | Q(brand__icontains=token) |
+                Q(color__icontains=token) | Q(tags__icontains=token)
+            )
+        return queryset.filter(conditions)
+
+    match = backend.match(tokens)
+    table = WardrobeItem._meta.db_table
+    return queryset.filter(
+        id__in=RawSQL(backend.matching_ids(), [match, user.pk])
+    ).annotate(
+        search_rank=RawSQL(backend.rank(table), [match])
+    ).order_by('search_rank', '-created_at')
@@ -1,21 +1,38 @@
 from rest_framework import serializers
 from .models import WardrobeItem, Outfit, OutfitItem
+from .outfits import with_items
+from .profiling import profile_section
+from .thumbnails import thumbnail_urls
 
-class WardrobeItemSerializer(serializers.ModelSerializer):
+class ProfiledModelSerializer(serializers.ModelSerializer):
+    """Representation time counts as serialization in request profiles"""
+    
+    def to_representation(self, instance):
+        with profile_section('serialize'):
+            return super().to_representation(instance)
+
+class WardrobeItemSerializer(ProfiledModelSerializer):
+    # Card-sized WebP (image_url until thumbnails are built) and every size per format
+    thumbnail_url = serializers.CharField(read_only=True)
+    thumbnails = serializers.SerializerMethodField()
+    
     class Meta:
         model = WardrobeItem
-        fields = ['id', 'name', 'category', 'color', 'brand', 'price', 'image_url', 
-                 'tags', 'wear_count', 'last_worn', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'wear_count', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'category', 'color', 'color_family', 'brand', 'price', 'image_url', 
+                 'thumbnail_url', 'thumbnails', 'tags', 'wear_count', 'last_worn', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'color_family', 'wear_count', 'created_at', 'updated_at']
+    
+    def get_thumbnails(self, obj):
+        return thumbnail_urls(obj.current_thumbnails)
 
-class OutfitItemSerializer(serializers.ModelSerializer):
+class OutfitItemSerializer(ProfiledModelSerializer):
     wardrobe_item = WardrobeItemSerializer(read_only=True)
     
     class Meta:
         model = OutfitItem
         fields = ['wardrobe_item']
 
-class OutfitSerializer(serializers.ModelSerializer):
+class OutfitSerializer(ProfiledModelSerializer):
     items = WardrobeItemSerializer(many=True, read_only=True)
     item_ids = serializers.ListField(
         child=serializers.IntegerField(),
@@ -29,6 +46,11 @@ class OutfitSerializer(serializers.ModelSerializer):
                  'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Prefetch the nested items so a page of outfits costs two queries"""
+        return with_items(queryset)
+    
     def create(self, validated_data):
         item_ids = validated_data.pop('item_ids', [])
         outfit = Outfit.objects.create(**validated_data)
@@ -56,4 +78,31 @@ class OutfitSerializer(serializers.ModelSerializer):
             )
             instance.items.set(wardrobe_items)
         
-        return instance
\ No newline at end of file
+        return instance
+
+class RecommendationBatchSerializer(serializers.Serializer):
+    item_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        min_length=1,
+        max_length=100
+    )
+
+class WearEventInputSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    worn_at = serializers.DateTimeField(required=False)
+    outfit = serializers.IntegerField(required=False, allow_null=True)
+    idempotency_key = serializers.CharField(max_length=64, required=False)
+
+class BulkWearSerializer(serializers.Serializer):
+    events = WearEventInputSerializer(many=True)
+
+    def validate_events(self, events):
+        if not events:
+            raise serializers.ValidationError('At least one event is required.')
+        if len(events) > 500:
+            raise serializers.ValidationError('At most 500 events per request.')
+        return events
+
+class OutfitWearSerializer(serializers.Serializer):
+    worn_at = serializers.DateTimeField(required=False)
+    idempotency_key = serializers.CharField(max_length=64, required=False)
\ No newline at end of file
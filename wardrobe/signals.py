@@ -0,0 +1,102 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import WardrobeItem, Outfit, ItemCompatibility
+from .compatibility_index import INDEXED_FIELDS, refill_item_matches, update_item_index
+from .search import SEARCH_FIELDS, index_item, unindex_item
+from .stats import (
+    affects_stats, item_snapshot, stored_snapshot,
+    record_item_saved, record_item_deleted, record_outfit_count,
+)
+from .thumbnail_jobs import schedule_thumbnails
+from .versions import bump_wardrobe_version
+
+
+@receiver(post_save, sender=WardrobeItem)
+def reindex_item_compatibility(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Keep the compatibility index current"""
+    if raw:
+        return
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    update_item_index(instance)
+
+
+@receiver(pre_delete, sender=WardrobeItem)
+def find_compatibility_referrers(sender, instance, **kwargs):
+    # The item's own entries go with it by FK cascade; the items listing it need a replacement
+    instance._compatibility_referrers = list(
+        ItemCompatibility.objects.filter(match_id=instance.pk).values_list('item_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=WardrobeItem)
+def refill_compatibility_referrers(sender, instance, **kwargs):
+    refill_item_matches(instance.user_id, instance.__dict__.pop('_compatibility_referrers', ()))
+
+
+@receiver(pre_save, sender=WardrobeItem)
+def snapshot_item_for_stats(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Read the stored row so the rollup delta reflects what actually changes in the database
+    if not raw and affects_stats(update_fields):
+        instance._stats_snapshot = stored_snapshot(instance)
+
+
+@receiver(post_save, sender=WardrobeItem)
+def update_search_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    index_item(instance)
+
+
+@receiver(post_delete, sender=WardrobeItem)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_item(instance.pk)
+
+
+@receiver(post_save, sender=WardrobeItem)
+def queue_thumbnails(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Build thumbnails for new or changed images after the save commits"""
+    if raw or (update_fields is not None and 'image_url' not in update_fields):
+        return
+    schedule_thumbnails([instance])
+
+
+@receiver(post_save, sender=WardrobeItem)
+@receiver(post_delete, sender=WardrobeItem)
+@receiver(post_save, sender=Outfit)
+@receiver(post_delete, sender=Outfit)
+def bump_version_on_change(sender, instance, raw=False, **kwargs):
+    """Stale out the owner's cached wardrobe snapshots and API responses"""
+    if not raw:
+        bump_wardrobe_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Outfit.items.through)
+def bump_version_on_outfit_items_change(sender, instance, action, **kwargs):
+    # The instance is the outfit or, for reverse changes, the item; both belong to the user
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_wardrobe_version(instance.user_id)
+
+
+@receiver(post_save, sender=WardrobeItem)
+def update_stats_on_item_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if not raw and affects_stats(update_fields):
+        record_item_saved(instance, instance.__dict__.pop('_stats_snapshot', None), update_fields)
+
+
+@receiver(post_delete, sender=WardrobeItem)
+def update_stats_on_item_delete(sender, instance, **kwargs):
+    record_item_deleted(item_snapshot(instance))
+
+
+@receiver(post_save, sender=Outfit)
+def update_stats_on_outfit_create(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_outfit_count(instance.user_id, 1)
+
+
+@receiver(post_delete, sender=Outfit)
+def update_stats_on_outfit_delete(sender, instance, **kwargs):
+    record_outfit_count(instance.user_id, -1)
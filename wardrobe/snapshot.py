@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from django.conf import settings
+from .colors import normalize_color
+from .models import WardrobeItem
+from .style_features import FEATURE_FIELDS, compute_features
+from .versions import wardrobe_version
+
+SNAPSHOT_FIELDS = ('id', 'name', 'category', 'color', 'color_family', 'brand', 'image_url', 'tags') + FEATURE_FIELDS
+SHARED_FIELDS = ('category', 'color', 'color_family', 'brand', 'image_url', 'primary_style', 'formality')
+CACHE_SIZE = getattr(settings, 'WARDROBE_SNAPSHOT_CACHE_SIZE', 256)
+
+
+class SnapshotItem:
+    """
+    Read-only row of a wardrobe snapshot with just the fields the recommendation
+    rules read. Slotted, so a row costs a fraction of a WardrobeItem instance.
+    """
+
+    __slots__ = SNAPSHOT_FIELDS
+
+    def __init__(self, row):
+        for field in SNAPSHOT_FIELDS:
+            setattr(self, field, row[field])
+
+    def __repr__(self):
+        return f'<SnapshotItem {self.id}: {self.name}>'
+
+
+class WardrobeSnapshot:
+    """A user's wardrobe as of one version stamp, newest items first"""
+
+    __slots__ = ('user_id', 'version', 'items', '_matrix')
+
+    def __init__(self, user_id: int, version: int, items: List[SnapshotItem]):
+        self.user_id = user_id
+        self.version = version
+        self.items = items
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def matrix(self, engine):
+        """WardrobeMatrix of the snapshot, encoded on first use and kept with it"""
+        if self._matrix is None:
+            self._matrix = engine.build_wardrobe_matrix(self.items)
+        return self._matrix
+
+
+def load_snapshot(user_id: int, version: Optional[int] = None) -> WardrobeSnapshot:
+    """Build a snapshot straight from the database"""
+    if version is None:
+        version = wardrobe_version(user_id)
+    items = []
+    # Rows repeat the same few categories, colors, brands and tag sets; keep one copy of each
+    shared = {}
+    for row in WardrobeItem.objects.filter(user_id=user_id).values_list(*SNAPSHOT_FIELDS).iterator():
+        row = dict(zip(SNAPSHOT_FIELDS, row))
+        for field in SHARED_FIELDS:
+            row[field] = shared.setdefault(row[field], row[field])
+        tags = tuple(shared.setdefault(tag, tag) for tag in row['tags'])
+        row['tags'] = shared.setdefault(tags, tags)
+        # Rows saved before the derived columns existed are filled in once here
+        row['color_family'] = row['color_family'] or normalize_color(row['color'])
+        if not row['formality']:
+            item = SnapshotItem({**row, **dict.fromkeys(FEATURE_FIELDS)})
+            row.update(compute_features(item))
+        items.append(SnapshotItem(row))
+    return WardrobeSnapshot(user_id, version, items)
+
+
+class SnapshotCache:
+    """
+    Bounded LRU of wardrobe snapshots per process. An entry is served only while
+    its version matches the user's current stamp, read from the database that all
+    processes share, so a hit costs one small query and no ORM work; any item,
+    outfit or wear write, in any process, makes it stale.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> WardrobeSnapshot:
+        # Read the stamp before the rows: a write landing mid-load bumps it again
+        version = wardrobe_version(user_id)
+        with self._lock:
+            snapshot = self._entries.get(user_id)
+            if snapshot is not None and snapshot.version == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+
+        snapshot = load_snapshot(user_id, version)
+        if self.max_size > 0:
+            with self._lock:
+                self._entries[user_id] = snapshot
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    def discard(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses}
+
+
+snapshot_cache = SnapshotCache()
+
+
+def get_snapshot(user_id: int) -> WardrobeSnapshot:
+    """The user's current wardrobe snapshot, from the process cache when fresh"""
+    return snapshot_cache.get(user_id)
@@ -0,0 +1,217 @@
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F, Count, Sum
+from django.utils import timezone
+from typing import Dict, Any, Optional
+from .models import WardrobeItem, WardrobeStats, WardrobeStatsBucket
+
+SNAPSHOT_FIELDS = ('user_id', 'category', 'color', 'brand', 'price', 'wear_count')
+DIMENSIONS = ('category', 'color', 'brand')
+
+
+def price_bucket(price) -> Optional[str]:
+    """Name of the price_* counter an item's price falls into (same edges as analytics.PRICE_BUCKETS)"""
+    if price is None:
+        return None
+    if price < 50:
+        return 'under_50'
+    if price < 100:
+        return '50_to_100'
+    if price < 200:
+        return '100_to_200'
+    return 'over_200'
+
+
+def item_snapshot(item) -> Dict[str, Any]:
+    """The fields of an item that feed the rollups"""
+    return {field: getattr(item, field) for field in SNAPSHOT_FIELDS}
+
+
+def stored_snapshot(item) -> Optional[Dict[str, Any]]:
+    """Rollup fields of the item's row as currently stored, or None if it has no row"""
+    if item.pk is None:
+        return None
+    return WardrobeItem.objects.filter(pk=item.pk).values(*SNAPSHOT_FIELDS).first()
+
+
+def _bucket_values(snapshot):
+    for dimension in DIMENSIONS:
+        value = snapshot[dimension]
+        # Analytics never lists items without a brand
+        if dimension == 'brand' and not value:
+            continue
+        yield dimension, value
+
+
+def _contributions(changes):
+    """Net per-user stat deltas and per-bucket deltas for (snapshot, sign) pairs"""
+    stats, buckets = {}, {}
+    for snapshot, sign in changes:
+        price = snapshot['price']
+        wear = snapshot['wear_count'] * sign
+        value = Decimal(price or 0) * sign
+
+        deltas = stats.setdefault(snapshot['user_id'], {})
+        deltas['total_items'] = deltas.get('total_items', 0) + sign
+        deltas['total_wear'] = deltas.get('total_wear', 0) + wear
+        deltas['total_value'] = deltas.get('total_value', 0) + value
+        if price is not None:
+            bucket = f'price_{price_bucket(price)}'
+            deltas[bucket] = deltas.get(bucket, 0) + sign
+
+        for dimension, key in _bucket_values(snapshot):
+            count, total_value, total_wear = buckets.get((snapshot['user_id'], dimension, key), (0, 0, 0))
+            buckets[(snapshot['user_id'], dimension, key)] = (count + sign, total_value + value, total_wear + wear)
+
+    stats = {user_id: {field: delta for field, delta in deltas.items() if delta} for user_id, deltas in stats.items()}
+    buckets = {key: delta for key, delta in buckets.items() if any(delta)}
+    return stats, buckets
+
+
+def _apply(changes) -> bool:
+    """Apply item contributions to existing rollups; False if a user has no rollup yet"""
+    stats, buckets = _contributions(changes)
+
+    for user_id, deltas in stats.items():
+        updates = {field: F(field) + delta for field, delta in deltas.items()}
+        if not WardrobeStats.objects.filter(user_id=user_id).update(updated_at=timezone.now(), **updates):
+            return False
+
+    for (user_id, dimension, key), (count, total_value, total_wear) in buckets.items():
+        rows = WardrobeStatsBucket.objects.filter(user_id=user_id, dimension=dimension, value=key)
+
+        def add():
+            return rows.update(
+                count=F('count') + count,
+                total_value=F('total_value') + total_value,
+                total_wear=F('total_wear') + total_wear,
+            )
+
+        if not add() and count > 0:
+            try:
+                # Savepoint: a concurrent save may create the same bucket first
+                with transaction.atomic():
+                    WardrobeStatsBucket.objects.create(
+                        user_id=user_id, dimension=dimension, value=key,
+                        count=count, total_value=total_value, total_wear=total_wear,
+                    )
+            except IntegrityError:
+                add()
+        elif count < 0:
+            rows.filter(count__lte=0).delete()
+    return True
+
+
+def _written(field, update_fields) -> bool:
+    names = {field, field[:-3]} if field.endswith('_id') else {field}
+    return not names.isdisjoint(update_fields)
+
+
+def affects_stats(update_fields) -> bool:
+    """Whether a save with these update_fields can change the rollups"""
+    return update_fields is None or any(_written(field, update_fields) for field in SNAPSHOT_FIELDS)
+
+
+@transaction.atomic
+def record_item_saved(item, old_snapshot, update_fields=None):
+    """Apply an item create (old_snapshot=None) or update to its owner's rollup as a delta"""
+    new_snapshot = item_snapshot(item)
+    if update_fields is not None and old_snapshot is not None:
+        # Only the listed fields reached the database
+        new_snapshot = {
+            field: new_snapshot[field] if _written(field, update_fields) else old_snapshot[field]
+            for field in SNAPSHOT_FIELDS
+        }
+
+    changes = [(new_snapshot, 1)]
+    if old_snapshot is not None:
+        changes.append((old_snapshot, -1))
+    if not _apply(changes):
+        rebuild_user_stats(item.user_id)
+
+
+@transaction.atomic
+def record_item_deleted(snapshot):
+    # A missing rollup is built lazily on next read, so a failed apply needs no rebuild
+    _apply([(snapshot, -1)])
+
+
+@transaction.atomic
+def record_items_worn(wears):
+    """
+    Add wear for (item, times) pairs whose counters were bumped with a queryset update
+    (which skips signals). Items sharing a histogram bucket cost one query per bucket.
+    """
+    changes = []
+    for item, times in wears:
+        before = item_snapshot(item)
+        changes.append(({**before, 'wear_count': before['wear_count'] + times}, 1))
+        changes.append((before, -1))
+    if not _apply(changes):
+        for user_id in {item.user_id for item, _ in wears}:
+            rebuild_user_stats(user_id)
+
+
+def record_outfit_count(user_id, delta: int):
+    WardrobeStats.objects.filter(user_id=user_id).update(
+        total_outfits=F('total_outfits') + delta,
+        updated_at=timezone.now(),
+    )
+
+
+@transaction.atomic
+def rebuild_user_stats(user_id) -> WardrobeStats:
+    """Recompute a user's rollup from their items and outfits"""
+    from .analytics import wardrobe_summary
+
+    summary = wardrobe_summary(user_id)
+    price_ranges = summary['price_ranges']
+    stats, _ = WardrobeStats.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            'total_items': summary['total_items'],
+            'total_outfits': summary['total_outfits'],
+            'total_value': summary['total_value'],
+            'total_wear': summary['total_wear'],
+            'price_under_50': price_ranges['under_50'],
+            'price_50_to_100': price_ranges['50_to_100'],
+            'price_100_to_200': price_ranges['100_to_200'],
+            'price_over_200': price_ranges['over_200'],
+        }
+    )
+
+    items = WardrobeItem.objects.filter(user_id=user_id)
+    buckets = []
+    for dimension in DIMENSIONS:
+        rows = items.exclude(brand='') if dimension == 'brand' else items
+        for row in rows.values(dimension).annotate(
+            count=Count('id'), total_value=Sum('price'), total_wear=Sum('wear_count')
+        ).order_by():
+            buckets.append(WardrobeStatsBucket(
+                user_id=user_id,
+                dimension=dimension,
+                value=row[dimension],
+                count=row['count'],
+                total_value=row['total_value'] or 0,
+                total_wear=row['total_wear'] or 0,
+            ))
+
+    WardrobeStatsBucket.objects.filter(user_id=user_id).delete()
+    WardrobeStatsBucket.objects.bulk_create(buckets)
+    return stats
+
+
+def get_wardrobe_stats(user) -> WardrobeStats:
+    """A user's rollup, built on first access"""
+    try:
+        return WardrobeStats.objects.get(user=user)
+    except WardrobeStats.DoesNotExist:
+        return rebuild_user_stats(user.pk)
+
+
+def get_histograms(user) -> Dict[str, list]:
+    """Rollup histogram rows per dimension, largest first"""
+    histograms = {dimension: [] for dimension in DIMENSIONS}
+    for bucket in WardrobeStatsBucket.objects.filter(user=user, count__gt=0).order_by('-count', 'value'):
+        histograms[bucket.dimension].append(bucket)
+    return histograms
@@ -0,0 +1,92 @@
+from typing import Dict, Any, List
+from .colors import loaded_value
+
+STYLES = ('casual', 'formal', 'trendy', 'classic', 'versatile')
+STYLE_KEYWORDS = {
+    'casual': ('casual', 'relaxed', 'comfortable', 'everyday'),
+    'formal': ('formal', 'dress', 'business', 'professional'),
+    'trendy': ('trendy', 'fashion', 'modern', 'contemporary'),
+    'classic': ('classic', 'timeless', 'traditional', 'elegant'),
+}
+
+FORMALITY_CHOICES = [
+    ('casual', 'Casual'),
+    ('smart-casual', 'Smart casual'),
+    ('formal', 'Formal'),
+]
+FORMAL_INDICATORS = ('suit', 'dress', 'blazer', 'formal', 'business')
+CASUAL_INDICATORS = ('jeans', 'casual', 't-shirt', 'sneakers', 'hoodie')
+
+SEASONS = ('spring', 'summer', 'fall', 'winter')
+# Bit per season; 0 means all-season
+SEASON_BITS = {season: 1 << index for index, season in enumerate(SEASONS)}
+SEASONAL_KEYWORDS = {
+    'spring': ('light', 'cotton', 'spring'),
+    'summer': ('summer', 'shorts', 'tank', 'sandals', 'light'),
+    'fall': ('fall', 'autumn', 'jacket', 'boots'),
+    'winter': ('winter', 'coat', 'warm', 'wool', 'heavy'),
+}
+
+# Matched against the color as entered, not its family: 'khaki' or 'charcoal' do not count
+VERSATILE_COLORS = frozenset({'black', 'white', 'navy', 'gray', 'beige'})
+VERSATILE_CATEGORIES = frozenset({'Tops', 'Bottoms'})
+
+# Model fields the features are derived from, and the columns they are stored in
+SOURCE_FIELDS = frozenset({'name', 'tags', 'color', 'category'})
+FEATURE_FIELDS = ('primary_style', 'style_mask', 'formality', 'season_mask', 'versatility')
+
+
+def _item_text(item) -> str:
+    return f"{item.name} {' '.join(item.tags)}".lower()
+
+
+def compute_features(item) -> Dict[str, Any]:
+    """Style features of an item, with the same keyword rules the engine always used"""
+    text = _item_text(item)
+
+    styles = [style for style, keywords in STYLE_KEYWORDS.items() if any(keyword in text for keyword in keywords)]
+    if not styles:
+        styles = ['versatile']
+
+    if any(indicator in text for indicator in FORMAL_INDICATORS):
+        formality = 'formal'
+    elif any(indicator in text for indicator in CASUAL_INDICATORS):
+        formality = 'casual'
+    else:
+        formality = 'smart-casual'
+
+    season_mask = 0
+    for season, keywords in SEASONAL_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            season_mask |= SEASON_BITS[season]
+
+    versatility = 0.5
+    if (item.color or '').lower() in VERSATILE_COLORS:
+        versatility += 0.3
+    if item.category in VERSATILE_CATEGORIES:
+        versatility += 0.2
+
+    return {
+        'primary_style': styles[0],
+        'style_mask': sum(1 << STYLES.index(style) for style in styles),
+        'formality': formality,
+        'season_mask': season_mask,
+        'versatility': min(versatility, 1.0),
+    }
+
+
+def item_features(item) -> Dict[str, Any]:
+    """Stored features when the row has them (saved or backfilled), computed otherwise"""
+    stored = {field: loaded_value(item, field) for field in FEATURE_FIELDS}
+    if stored['formality'] and None not in stored.values():
+        return stored
+    return compute_features(item)
+
+
+def styles_from_mask(mask: int) -> List[str]:
+    return [style for index, style in enumerate(STYLES) if mask & (1 << index)]
+
+
+def seasons_from_mask(mask: int) -> List[str]:
+    """Season names for a mask, ['all-season'] when no season keyword matched"""
+    return [season for season in SEASONS if mask & SEASON_BITS[season]] or ['all-season']
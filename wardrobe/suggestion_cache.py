@@ -0,0 +1,89 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import caches
+from typing import List, Dict, Callable, Optional
+from .profiling import metrics
+
+CACHE_ALIAS = getattr(settings, 'AI_SUGGESTION_CACHE', 'ai_suggestions')
+KEY_PREFIX = 'ai-suggestions:v1'
+HITS_KEY = f'{KEY_PREFIX}:stats:hits'
+MISSES_KEY = f'{KEY_PREFIX}:stats:misses'
+
+
+def _normalize(value) -> str:
+    """Case- and whitespace-insensitive form of a prompt input"""
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def suggestion_cache_key(item) -> str:
+    """Content address of the shopping-suggestion prompt for an item"""
+    inputs = {
+        'category': _normalize(item.category),
+        'color': _normalize(item.color),
+        'brand': _normalize(item.brand) or 'unknown brand',
+        'name': _normalize(item.name),
+    }
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{digest}'
+
+
+def _count(cache, key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_or_compute_suggestions(item, compute: Callable[[], List[Dict]]) -> List[Dict]:
+    """
+    Return cached suggestions for the item's prompt, calling compute() on a miss.
+    Expiry (TTL) and LRU eviction come from the configured cache backend.
+    """
+    cache = caches[CACHE_ALIAS]
+    key = suggestion_cache_key(item)
+
+    suggestions = cache.get(key)
+    if suggestions is not None:
+        _count(cache, HITS_KEY)
+        return suggestions
+
+    _count(cache, MISSES_KEY)
+    suggestions = compute()
+    cache.set(key, suggestions)
+    return suggestions
+
+
+def get_cached_suggestions(item) -> Optional[List[Dict]]:
+    """Cached suggestions for the item's prompt, or None without computing anything"""
+    cache = caches[CACHE_ALIAS]
+    suggestions = cache.get(suggestion_cache_key(item))
+    if suggestions is not None:
+        _count(cache, HITS_KEY)
+    return suggestions
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the suggestion cache"""
+    cache = caches[CACHE_ALIAS]
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def _prometheus_metrics():
+    stats = cache_stats()
+    return {
+        'stylevault_suggestion_cache_hits_total': ('counter', 'Shopping suggestion cache hits', stats['hits']),
+        'stylevault_suggestion_cache_misses_total': ('counter', 'Shopping suggestion cache misses', stats['misses']),
+    }
+
+
+metrics.register_collector(_prometheus_metrics)
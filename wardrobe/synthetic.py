@@ -0,0 +1,143 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+from django.db import transaction
+from django.db.models import Count, Max
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+from .compatibility_index import rebuild_user_index
+from .models import WardrobeItem, Outfit, OutfitItem, WearEvent
+from .search import index_items
+from .stats import rebuild_user_stats
+from .versions import bump_wardrobe_version
+
+# Free-text colors as users type them, so color normalization is exercised too
+COLORS = [
+    'black', 'white', 'navy', 'gray', 'beige', 'blue', 'red', 'green', 'brown', 'cream',
+    'Charcoal', 'Light Blue', 'olive', 'burgundy', 'khaki', 'off white', 'denim', 'mustard',
+]
+BRANDS = ['', 'Levi\'s', 'Zara', 'Uniqlo', 'H&M', 'Nike', 'COS', 'Everlane', 'Patagonia']
+TAGS = [
+    'casual', 'formal', 'work', 'weekend', 'summer', 'winter', 'cotton', 'wool',
+    'classic', 'trendy', 'relaxed', 'business', 'light', 'warm', 'timeless', 'everyday',
+]
+NAMES = {
+    'Tops': ['T-shirt', 'Oxford shirt', 'Sweater', 'Polo', 'Blouse', 'Tank top', 'Hoodie'],
+    'Bottoms': ['Jeans', 'Chinos', 'Dress trousers', 'Shorts', 'Skirt', 'Joggers'],
+    'Outerwear': ['Wool coat', 'Denim jacket', 'Blazer', 'Rain jacket', 'Puffer'],
+    'Shoes': ['Sneakers', 'Boots', 'Loafers', 'Sandals', 'Oxfords'],
+    'Accessories': ['Belt', 'Scarf', 'Watch', 'Cap', 'Tote bag'],
+}
+OCCASIONS = ['work', 'casual', 'date', 'weekend', 'formal', 'travel', 'party', 'gym']
+OUTFIT_SIZE = (2, 5)
+WEAR_HISTORY_DAYS = 365
+
+
+def generate_items(user, count: int, rng: random.Random, batch_size: int = 1000) -> List[WardrobeItem]:
+    """Bulk insert `count` random items spread over every category, with derived columns filled in"""
+    categories = [choice for choice, _ in WardrobeItem.CATEGORY_CHOICES]
+    items = []
+    for index in range(count):
+        category = rng.choice(categories)
+        item = WardrobeItem(
+            user=user,
+            name=f'{rng.choice(NAMES[category])} {index}',
+            category=category,
+            color=rng.choice(COLORS),
+            brand=rng.choice(BRANDS),
+            price=Decimal(rng.randint(5, 400)) if rng.random() > 0.1 else None,
+            image_url=f'https://example.com/items/{index}.jpg',
+            tags=rng.sample(TAGS, rng.randint(0, 4)),
+        )
+        item.update_derived_fields()
+        items.append(item)
+    return WardrobeItem.objects.bulk_create(items, batch_size=batch_size)
+
+
+def generate_outfits(user, items: List[WardrobeItem], count: int, rng: random.Random) -> List[Outfit]:
+    """Outfits of a few distinct items each"""
+    seasons = [choice for choice, _ in Outfit.SEASON_CHOICES]
+    outfits = Outfit.objects.bulk_create([
+        Outfit(
+            user=user,
+            name=f'Outfit {index}',
+            occasion=rng.choice(OCCASIONS),
+            season=rng.choice(seasons),
+            rating=rng.randint(1, 5) if rng.random() > 0.3 else None,
+        )
+        for index in range(count)
+    ])
+    if items:
+        OutfitItem.objects.bulk_create([
+            OutfitItem(outfit=outfit, wardrobe_item=item)
+            for outfit in outfits
+            for item in rng.sample(items, min(len(items), rng.randint(*OUTFIT_SIZE)))
+        ], batch_size=1000)
+    return outfits
+
+
+def generate_wear_events(user, items: List[WardrobeItem], outfits: List[Outfit], count: int,
+                         rng: random.Random) -> int:
+    """
+    Wear events over the past year, then wear_count and last_worn brought in line
+    with them (bulk_create skips the code paths that maintain those columns).
+    """
+    if not items or not count:
+        return 0
+    now = timezone.now()
+    WearEvent.objects.bulk_create([
+        WearEvent(
+            user=user,
+            wardrobe_item=rng.choice(items),
+            outfit=rng.choice(outfits) if outfits and rng.random() < 0.3 else None,
+            worn_at=now - timedelta(minutes=rng.randint(0, WEAR_HISTORY_DAYS * 24 * 60)),
+        )
+        for _ in range(count)
+    ], batch_size=1000)
+
+    totals = WearEvent.objects.filter(user=user).values('wardrobe_item_id').annotate(
+        count=Count('id'), last=Max('worn_at')
+    )
+    by_id = {item.pk: item for item in items}
+    worn = []
+    for row in totals:
+        item = by_id[row['wardrobe_item_id']]
+        item.wear_count = row['count']
+        last = row['last']
+        item.last_worn = timezone.localdate(last) if timezone.is_aware(last) else last.date()
+        worn.append(item)
+    WardrobeItem.objects.bulk_update(worn, ['wear_count', 'last_worn'], batch_size=1000)
+    return count
+
+
+def generate_wardrobe(user, items: int = 200, outfits: int = 20, wear_events: int = 500, seed: int = 0) -> Dict[str, int]:
+    """
+    Fill a user's wardrobe with reproducible synthetic data (same seed, same rows)
+    and rebuild the indexes and rollups that bulk inserts skip.
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        created = generate_items(user, items, rng)
+        created_outfits = generate_outfits(user, created, outfits, rng)
+        generate_wear_events(user, created, created_outfits, wear_events, rng)
+        index_items(created)
+        rebuild_user_index(user.pk)
+        rebuild_user_stats(user.pk)
+        bump_wardrobe_version(user.pk)
+    return {'items': len(created), 'outfits': len(created_outfits), 'wear_events': wear_events}
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Point the default connection at a fresh test database for the duration, created and
+    destroyed like the test runner does, so benchmark users never touch real data or
+    hold locks on it. Writes commit normally, so on-commit work runs as in production.
+    """
+    old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'}, serialized_aliases=set())
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
@@ -0,0 +1,861 @@
+import csv
+import hashlib
+import io
+import json
+import random
+import tempfile
+import tracemalloc
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from .ai_recommendations import AIRecommendationEngine
+from .colors import ColorKnowledgeBase, colors_match, normalize_color
+from .compatibility_index import MATCHES_PER_ITEM, rebuild_user_index
+from .exporter import SECTIONS
+from .importer import import_items
+from .management.commands.check_import_time import LAZY_MODULES, measure_startup
+from .outfit_generator import FIT_WEIGHT, PAIR_WEIGHT, OutfitGenerator, load_candidates
+from .models import (
+    ItemCompatibility, Outfit, OutfitItem, RecommendationJob, WardrobeItem, WardrobeStats, WardrobeStatsBucket,
+    WearEvent,
+)
+from .pagination import encode_cursor
+from .profiling import query_budget
+from .search import search_items
+from .snapshot import get_snapshot, snapshot_cache
+from .style_features import compute_features, item_features
+from .synthetic import BRANDS, COLORS, TAGS, generate_items
+from .thumbnails import THUMBNAIL_NAME, HTTPImageFetcher, ImageFetchError
+from .versions import wardrobe_version
+
+User = get_user_model()
+
+
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', WARDROBE_THUMBNAILS=False,
+    WARDROBE_INDEX_WORKERS=0,
+)
+class WardrobeTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', password='pw')
+        self.client.login(username='tester', password='pw')
+        # Version stamps roll back with each test but the process cache does not
+        snapshot_cache.clear()
+
+    def add_item(self, **fields):
+        fields = {'name': 'Shirt', 'category': 'Tops', 'color': 'white', **fields}
+        with self.captureOnCommitCallbacks(execute=True):
+            return WardrobeItem.objects.create(user=self.user, **fields)
+
+
+class HTTPImageFetcherTests(SimpleTestCase):
+    def setUp(self):
+        self.fetcher = HTTPImageFetcher()
+
+    def test_rejects_internal_addresses(self):
+        urls = [
+            'http://127.0.0.1/image.jpg',
+            'http://169.254.169.254/latest/meta-data/',
+            'http://10.0.0.5/image.jpg',
+            'http://[::1]/image.jpg',
+            'file:///etc/passwd',
+        ]
+        with mock.patch.object(self.fetcher.session, 'get') as get:
+            for url in urls:
+                with self.subTest(url=url), self.assertRaises(ImageFetchError):
+                    self.fetcher.fetch(url)
+            get.assert_not_called()
+
+    def test_rejects_hostnames_resolving_to_internal_addresses(self):
+        resolved = [(2, 1, 6, '', ('192.168.1.10', 80))]
+        with mock.patch('socket.getaddrinfo', return_value=resolved), \
+                mock.patch.object(self.fetcher.session, 'get') as get:
+            with self.assertRaises(ImageFetchError):
+                self.fetcher.fetch('http://images.example.com/a.jpg')
+            get.assert_not_called()
+
+    def test_checks_every_redirect_hop(self):
+        def resolve(host, port, **kwargs):
+            return [(2, 1, 6, '', (host if host[0].isdigit() else '93.184.216.34', port))]
+
+        redirect = mock.MagicMock(is_redirect=True, headers={'Location': 'http://169.254.169.254/'})
+        redirect.__enter__.return_value = redirect
+        with mock.patch('socket.getaddrinfo', side_effect=resolve), \
+                mock.patch.object(self.fetcher.session, 'get', return_value=redirect) as get:
+            with self.assertRaises(ImageFetchError):
+                self.fetcher.fetch('http://images.example.com/a.jpg')
+            self.assertEqual(get.call_count, 1)
+            self.assertFalse(get.call_args.kwargs['allow_redirects'])
+
+
+class ThumbnailPipelineTests(WardrobeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.images = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        media = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(
+            MEDIA_ROOT=media,
+            WARDROBE_THUMBNAILS=True,
+            WARDROBE_THUMBNAIL_WORKERS=0,
+            WARDROBE_IMAGE_FETCHER='wardrobe.thumbnails.LocalImageFetcher',
+            WARDROBE_IMAGE_FETCHER_ROOT=str(self.images),
+        ))
+        (self.images / 'items').mkdir()
+        Image.new('RGB', (1200, 800), (30, 60, 200)).save(self.images / 'items' / '1.jpg', 'JPEG')
+
+    def test_builds_content_hashed_webp_thumbnails(self):
+        item = self.add_item(image_url='https://example.com/items/1.jpg')
+        item.refresh_from_db()
+        self.assertEqual(item.thumbnail_source, item.image_url)
+        self.assertEqual(sorted(item.thumbnails['webp'], key=int), ['160', '320', '640'])
+        for size, name in item.thumbnails['webp'].items():
+            with self.subTest(size=size):
+                self.assertTrue(name.startswith('thumbs/'))
+                self.assertRegex(name[len('thumbs/'):], THUMBNAIL_NAME)
+                with default_storage.open(name) as stored:
+                    data = stored.read()
+                self.assertIn(hashlib.sha256(data).hexdigest()[:20], name)
+                with Image.open(io.BytesIO(data)) as image:
+                    self.assertEqual(image.format, 'WEBP')
+                    self.assertEqual(max(image.size), int(size))
+
+        # The same image is neither fetched nor stored twice
+        with mock.patch('wardrobe.thumbnails.LocalImageFetcher.fetch') as fetch:
+            other = self.add_item(name='Other shirt', image_url=item.image_url)
+        fetch.assert_not_called()
+        other.refresh_from_db()
+        self.assertEqual(other.thumbnails, item.thumbnails)
+
+    def test_missing_or_escaping_paths_get_no_thumbnails(self):
+        for url in ('https://example.com/items/2.jpg', 'https://example.com/../../etc/passwd'):
+            with self.subTest(url=url), self.assertLogs('wardrobe.thumbnail_jobs', 'WARNING'):
+                item = self.add_item(image_url=url)
+                item.refresh_from_db()
+                self.assertEqual((item.thumbnails, item.thumbnail_source), ({}, url))
+
+    @override_settings(WARDROBE_IMAGE_FETCHER='wardrobe.thumbnails.HTTPImageFetcher')
+    def test_internal_urls_are_not_fetched(self):
+        with mock.patch('requests.Session.get') as get:
+            for url in ('http://127.0.0.1/items/1.jpg', 'http://10.0.0.5/items/1.jpg', 'http://[::1]/items/1.jpg'):
+                with self.subTest(url=url), self.assertLogs('wardrobe.thumbnail_jobs', 'WARNING'):
+                    item = self.add_item(image_url=url)
+                    item.refresh_from_db()
+                    self.assertEqual((item.thumbnails, item.thumbnail_source), ({}, url))
+        get.assert_not_called()
+
+
+class WardrobeVersionTests(WardrobeTestCase):
+    def test_writes_bump_the_stored_version(self):
+        self.assertEqual(wardrobe_version(self.user.pk), 0)
+        item = self.add_item()
+        first = wardrobe_version(self.user.pk)
+        self.assertGreater(first, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            item.delete()
+        self.assertGreater(wardrobe_version(self.user.pk), first)
+
+    def test_snapshot_follows_the_version(self):
+        self.add_item()
+        self.assertEqual(len(get_snapshot(self.user.pk)), 1)
+        self.add_item(name='Jeans', category='Bottoms')
+        self.assertEqual(len(get_snapshot(self.user.pk)), 2)
+
+    def test_etag_changes_within_the_same_second(self):
+        self.add_item()
+        response = self.client.get('/api/wardrobe-items/')
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/wardrobe-items/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.add_item(name='Jeans', category='Bottoms')
+        response = self.client.get('/api/wardrobe-items/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+@override_settings(AI_LLM_CLIENT='wardrobe.llm.LocalStylistClient', AI_RECOMMENDATION_WORKERS=0)
+class RecommendationJobTests(WardrobeTestCase):
+    def start_job(self, item):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(f'/api/wardrobe-items/{item.pk}/recommendations/?async=1')
+        return response.json()['recommendations']['suggestions_job']['token']
+
+    def test_job_state_is_stored_for_any_process(self):
+        item = self.add_item()
+        token = self.start_job(item)
+        job = self.client.get(f'/api/recommendation-jobs/{token}/').json()
+        self.assertEqual(job['status'], 'complete')
+        self.assertTrue(job['shopping_suggestions'])
+
+        other = User.objects.create_user('other', password='pw')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(f'/api/recommendation-jobs/{token}/').status_code, 404)
+
+    def test_lost_pending_job_reports_failed(self):
+        item = self.add_item()
+        RecommendationJob.objects.create(token='lost', user=self.user, item=item)
+        RecommendationJob.objects.filter(token='lost').update(created_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.client.get('/api/recommendation-jobs/lost/').json()['status'], 'failed')
+
+
+@override_settings(WARDROBE_PERFORMANCE_BUDGETS_STRICT=True, AI_LLM_CLIENT='wardrobe.llm.LocalStylistClient')
+class PerformanceBudgetTests(WardrobeTestCase):
+    """Hot endpoints stay within WARDROBE_PERFORMANCE_BUDGETS; a regression raises BudgetExceeded"""
+
+    def setUp(self):
+        super().setUp()
+        categories = ['Tops', 'Bottoms', 'Shoes', 'Outerwear']
+        self.items = [
+            self.add_item(name=f'Item {index}', category=categories[index % 4], color=['white', 'navy', 'black'][index % 3],
+                          tags=['casual'])
+            for index in range(12)
+        ]
+        for index in range(3):
+            outfit = Outfit.objects.create(user=self.user, name=f'Outfit {index}', occasion='work')
+            for item in self.items[index * 4:index * 4 + 4]:
+                OutfitItem.objects.create(outfit=outfit, wardrobe_item=item)
+        self.outfit = outfit
+        for cache in caches.all():
+            cache.clear()
+
+    def test_read_endpoints(self):
+        item = self.items[0].pk
+        urls = [
+            reverse('wardrobe_api:wardrobe-items'),
+            reverse('wardrobe_api:wardrobe-item-detail', args=[item]),
+            reverse('wardrobe_api:ai-recommendations', args=[item]),
+            reverse('wardrobe_api:outfits'),
+            reverse('wardrobe_api:outfit-detail', args=[self.outfit.pk]),
+            reverse('wardrobe_api:outfit-suggest'),
+            reverse('wardrobe_api:analytics'),
+            reverse('wardrobe:dashboard'),
+            reverse('wardrobe:wardrobe_list'),
+            reverse('wardrobe:outfit_list'),
+            reverse('wardrobe:outfit_detail', args=[self.outfit.pk]),
+            reverse('wardrobe:analytics'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_write_endpoints(self):
+        response = self.client.post(reverse('wardrobe_api:increment-wear', args=[self.items[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            reverse('wardrobe_api:batch-recommendations'),
+            {'item_ids': [item.pk for item in self.items[:4]]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class MetricsEndpointTests(WardrobeTestCase):
+    def test_staff_only_by_default(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/api/metrics/', REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 200)
+
+    @override_settings(AI_LLM_CLIENT='wardrobe.llm.LocalStylistClient')
+    def test_reports_suggestion_cache_counters(self):
+        self.user.is_staff = True
+        self.user.save()
+        item = self.add_item()
+        self.client.get(reverse('wardrobe_api:ai-recommendations', args=[item.pk]))
+        body = self.client.get('/api/metrics/').content.decode()
+        self.assertIn('stylevault_suggestion_cache_hits_total ', body)
+        self.assertIn('stylevault_suggestion_cache_misses_total ', body)
+
+    @override_settings(WARDROBE_METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_allowed_scraper_address(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/metrics/', REMOTE_ADDR='10.0.0.5').status_code, 200)
+
+    @override_settings(WARDROBE_SERVER_TIMING=False)
+    def test_server_timing_off(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/wardrobe-items/'))
+
+    @override_settings(WARDROBE_SERVER_TIMING=True)
+    def test_server_timing_on(self):
+        self.assertIn('sql;dur=', self.client.get('/api/wardrobe-items/')['Server-Timing'])
+
+
+class QueryPlanTests(WardrobeTestCase):
+    def test_hot_queries_use_indexes(self):
+        self.add_item()
+        # Raises CommandError naming the queries that scan a whole table
+        call_command('check_query_plans', stdout=StringIO())
+
+
+class OutfitListQueryTests(WardrobeTestCase):
+    """Listing outfits costs the same number of queries however many outfits and items there are"""
+
+    def add_outfits(self, count):
+        for index in range(count):
+            outfit = Outfit.objects.create(user=self.user, name=f'Outfit {index}', occasion='work')
+            for item in [self.add_item(name=f'Top {index}'), self.add_item(name=f'Jeans {index}', category='Bottoms')]:
+                OutfitItem.objects.create(outfit=outfit, wardrobe_item=item)
+        caches['default'].clear()
+
+    def test_api_outfit_list(self):
+        # Session, user, wardrobe version, outfits and their prefetched items
+        for count in (2, 6):
+            self.add_outfits(count)
+            with self.assertNumQueries(5):
+                self.assertEqual(self.client.get(reverse('wardrobe_api:outfits')).status_code, 200)
+
+    def test_outfit_list_page(self):
+        for count in (2, 6):
+            self.add_outfits(count)
+            with self.assertNumQueries(4):
+                self.assertEqual(self.client.get(reverse('wardrobe:outfit_list')).status_code, 200)
+
+
+class StartupImportTests(SimpleTestCase):
+    def test_optional_modules_load_lazily(self):
+        # A fresh interpreter run with -X importtime, as a new worker would start
+        _, modules = measure_startup()
+        self.assertEqual([module for module in LAZY_MODULES if module in modules], [])
+
+
+class ImportTests(WardrobeTestCase):
+    def post_file(self, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/wardrobe-items/import/', {'file': SimpleUploadedFile(name, content)})
+
+    def test_invalid_encoding_reports_rows_already_imported(self):
+        row = (
+            b'{"name": "Shirt", "category": "Tops", "color": "white",'
+            b' "image_url": "https://example.com/shirt.jpg"}\n'
+        )
+        response = self.post_file('items.jsonl', row * 300 + b'{"name": "Caf\xe9"}\n' + row * 5)
+        report = response.json()
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(report['created'], 0)
+        self.assertEqual(WardrobeItem.objects.filter(user=self.user).count(), report['created'])
+        self.assertIn('UTF-8', report['errors'][-1]['errors']['non_field_errors'][0])
+
+    def test_invalid_encoding_only(self):
+        response = self.post_file('items.csv', b'name,category,color\nCaf\xe9,Tops,white\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['created'], 0)
+
+    def import_cost(self, rows):
+        """Queries and peak traced memory of importing `rows` rows in chunks of 50"""
+        data = (
+            (number, {'name': f'Shirt {number}', 'category': 'Tops', 'color': 'white',
+                      'image_url': 'https://example.com/shirt.jpg'})
+            for number in range(rows)
+        )
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                report = import_items(self.user, data, chunk_size=50)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(report['created'], rows)
+        return len(queries), peak
+
+    def test_chunks_do_not_depend_on_wardrobe_size(self):
+        # The first import also creates the user's stats rows
+        self.import_cost(1)
+        small = self.import_cost(200)
+        generate_items(self.user, 3000, random.Random(0))
+        large = self.import_cost(200)
+        self.assertEqual(large[0], small[0])
+        self.assertLess(large[1], small[1] + 512 * 1024)
+
+    def test_compatibility_index_is_rebuilt_after_import(self):
+        self.add_item(name='Jeans', category='Bottoms', color='blue', tags=['casual'])
+        row = (
+            b'{"name": "Tee", "category": "Tops", "color": "white", "tags": ["casual"],'
+            b' "image_url": "https://example.com/tee.jpg"}\n'
+        )
+        self.assertEqual(self.post_file('items.jsonl', row).status_code, 201)
+        tee = WardrobeItem.objects.get(user=self.user, name='Tee')
+        self.assertTrue(ItemCompatibility.objects.filter(item=tee, match__name='Jeans').exists())
+        self.assertTrue(ItemCompatibility.objects.filter(item__name='Jeans', match=tee).exists())
+
+
+class StatsBucketTests(WardrobeTestCase):
+    def test_bucket_created_concurrently(self):
+        self.add_item()
+        update = QuerySet.update
+
+        def update_then_race(queryset, **fields):
+            updated = update(queryset, **fields)
+            if queryset.model is WardrobeStatsBucket and not updated:
+                # Another request creates the bucket between this update and the insert
+                WardrobeStatsBucket.objects.create(user=self.user, dimension='color', value='green', count=1)
+            return updated
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=update_then_race):
+            self.add_item(name='Polo', color='green')
+        bucket = WardrobeStatsBucket.objects.get(user=self.user, dimension='color', value='green')
+        self.assertEqual(bucket.count, 2)
+
+
+class AnalyticsTests(WardrobeTestCase):
+    def test_page_lists_every_least_worn_item(self):
+        for index in range(12):
+            self.add_item(name=f'Shirt {index}')
+        self.assertEqual(len(self.client.get(reverse('wardrobe:analytics')).context['least_worn']), 12)
+        self.assertEqual(len(self.client.get(reverse('wardrobe_api:analytics')).json()['least_worn']), 10)
+
+
+class StyleFeatureTests(SimpleTestCase):
+    def test_versatility_uses_the_color_as_entered(self):
+        def versatility(color):
+            return compute_features(WardrobeItem(name='Chinos', category='Bottoms', color=color, tags=[]))['versatility']
+
+        self.assertEqual(versatility('Navy'), 1.0)
+        # Same family as beige, but not one of the versatile colors
+        self.assertEqual(versatility('khaki'), 0.7)
+
+
+class ColorNormalizationTests(SimpleTestCase):
+    CASES = [
+        # Hex codes, 3 or 6 digits, go to the nearest swatch's family
+        ('#FFFFFF', 'white'),
+        ('#fff', 'white'),
+        ('#000', 'black'),
+        ('#000080', 'navy'),
+        ('#1F2A5C', 'navy'),
+        ('#c0c0c0', 'gray'),
+        ('#800020', 'red'),
+        ('#8B4513', 'brown'),
+        ('#808000', 'green'),
+        # Known names and phrases, then the last known word
+        ('ivory', 'white'),
+        ('navy blue', 'navy'),
+        ('light blue', 'blue'),
+        ('burgundy', 'red'),
+        ('Heather grey', 'gray'),
+        ('washed out olive', 'green'),
+        # Case, whitespace and punctuation
+        ('NAVY', 'navy'),
+        ('  Navy   Blue ', 'navy'),
+        ('off-white', 'white'),
+        (' #FF0000 ', 'red'),
+        # Unknown input keeps its cleaned text, so it only matches itself and neutrals
+        ('Periwinkle', 'periwinkle'),
+        ('Sea-Foam!', 'sea foam'),
+        ('#abcd', 'abcd'),
+        ('#ggg', 'ggg'),
+        ('', ''),
+        (None, ''),
+        ('x' * 40, 'x' * 30),
+    ]
+
+    def test_normalize(self):
+        knowledge_base = ColorKnowledgeBase()
+        for color, family in self.CASES:
+            with self.subTest(color=color):
+                self.assertEqual(knowledge_base.normalize(color), family)
+                self.assertEqual(normalize_color(color), family)
+
+    def test_match(self):
+        cases = [
+            ('Light Blue', 'navy blue', True),
+            ('light blue', 'Burgundy', False),
+            ('#1F2A5C', 'red', True),
+            ('#ff0000', 'olive', False),
+            ('periwinkle', 'Periwinkle', True),
+            ('periwinkle', 'green', False),
+            ('periwinkle', 'Black', True),
+        ]
+        for color1, color2, expected in cases:
+            with self.subTest(color1=color1, color2=color2):
+                self.assertIs(colors_match(color1, color2), expected)
+                self.assertIs(colors_match(color2, color1), expected)
+
+
+class WardrobeMatrixTests(WardrobeTestCase):
+    def scalar_matches(self, engine, item, wardrobe):
+        """The per-pair engine path WardrobeMatrix replaces"""
+        matches = [
+            (engine._calculate_compatibility(item, other), other) for other in wardrobe
+        ]
+        matches = sorted([match for match in matches if match[0] > 0.6], key=lambda match: match[0], reverse=True)
+        return [
+            (other.pk, score, engine._get_compatibility_reason(item, other)) for score, other in matches[:5]
+        ]
+
+    def test_matches_the_scalar_engine(self):
+        wardrobe = generate_items(self.user, 80, random.Random(7))
+        engine = AIRecommendationEngine()
+        matrix = engine.build_wardrobe_matrix(wardrobe)
+
+        scalar = [[engine._calculate_compatibility(item, other) for other in wardrobe] for item in wardrobe]
+        self.assertEqual(matrix.score_pairs().shape, (80, 80))
+        for row, expected in zip(matrix.score_pairs().tolist(), scalar):
+            for score, expected_score in zip(row, expected):
+                self.assertAlmostEqual(score, expected_score)
+
+        matched = 0
+        for item in wardrobe:
+            matches = [
+                (match['id'], match['compatibility_score'], match['reason'])
+                for match in matrix.top_matches(item)
+            ]
+            expected = self.scalar_matches(engine, item, wardrobe)
+            self.assertEqual([(pk, reason) for pk, _, reason in matches], [(pk, reason) for pk, _, reason in expected])
+            for (_, score, _), (_, expected_score, _) in zip(matches, expected):
+                self.assertAlmostEqual(score, expected_score)
+            matched += len(matches)
+        self.assertGreater(matched, 0)
+
+
+class CompatibilityIndexTests(WardrobeTestCase):
+    def stored(self, **filters):
+        return sorted(ItemCompatibility.objects.filter(user=self.user, **filters).values_list(
+            'item_id', 'match_id', 'score', 'colors_match', 'categories_match'
+        ))
+
+    def assertIndexMatchesRebuild(self):
+        stored = self.stored()
+        rebuild_user_index(self.user.pk)
+        self.assertEqual(stored, self.stored())
+
+    def random_fields(self, rng):
+        return {
+            'category': rng.choice([choice for choice, _ in WardrobeItem.CATEGORY_CHOICES]),
+            'color': rng.choice(COLORS),
+            'brand': rng.choice(BRANDS),
+            'tags': rng.sample(TAGS, rng.randint(0, 3)),
+        }
+
+    def test_saving_an_item(self):
+        jeans = self.add_item(name='Jeans', category='Bottoms', color='blue', tags=['casual'])
+        tee = self.add_item(name='Tee', category='Tops', color='white', tags=['casual'])
+        self.assertEqual(self.stored(item=tee), [(tee.pk, jeans.pk, 1.0, True, True)])
+        self.assertEqual(self.stored(item=jeans), [(jeans.pk, tee.pk, 1.0, True, True)])
+
+        tee.tags = ['formal']
+        tee.save(update_fields=['tags'])
+        self.assertEqual(self.stored(item=tee), [(tee.pk, jeans.pk, 0.7, True, True)])
+        self.assertEqual(self.stored(item=jeans), [(jeans.pk, tee.pk, 0.7, True, True)])
+
+        tee.category = 'Bottoms'
+        tee.save()
+        self.assertEqual(self.stored(), [])
+
+    def test_keeps_only_the_top_matches(self):
+        jeans = self.add_item(name='Jeans', category='Bottoms', color='blue', tags=['casual'])
+        tees = [self.add_item(name=f'Tee {index}', tags=['casual']) for index in range(MATCHES_PER_ITEM + 2)]
+        # Ties go to the newest items, as in the lookup
+        self.assertEqual([match for _, match, *_ in self.stored(item=jeans)], sorted(tee.pk for tee in tees[2:]))
+
+        tees[-1].delete()
+        self.assertEqual([match for _, match, *_ in self.stored(item=jeans)], sorted(tee.pk for tee in tees[1:-1]))
+        self.assertIndexMatchesRebuild()
+
+    def test_writes_keep_the_index_equal_to_a_rebuild(self):
+        rng = random.Random(3)
+        items = [self.add_item(name=f'Item {index}', **self.random_fields(rng)) for index in range(40)]
+        self.assertIndexMatchesRebuild()
+        self.assertLessEqual(
+            max(ItemCompatibility.objects.filter(item=item).count() for item in items), MATCHES_PER_ITEM
+        )
+
+        for step in range(30):
+            item = rng.choice(items)
+            if step % 3 == 2:
+                items.remove(item)
+                item.delete()
+            else:
+                for field, value in self.random_fields(rng).items():
+                    setattr(item, field, value)
+                item.save()
+            self.assertIndexMatchesRebuild()
+
+
+class BulkWearTests(WardrobeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shirt = self.add_item()
+        self.jeans = self.add_item(name='Jeans', category='Bottoms', color='blue')
+
+    def post(self, url, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, content_type='application/json')
+
+    def wear_totals(self):
+        return (
+            list(WardrobeItem.objects.filter(user=self.user).order_by('pk').values_list('wear_count', flat=True)),
+            WardrobeStats.objects.get(user=self.user).total_wear,
+            WardrobeStatsBucket.objects.get(user=self.user, dimension='category', value='Tops').total_wear,
+        )
+
+    def test_retried_batch_is_recorded_once(self):
+        batch = {'events': [
+            {'item': self.shirt.pk, 'idempotency_key': 'phone-1'},
+            {'item': self.shirt.pk, 'idempotency_key': 'phone-2', 'worn_at': '2026-01-05T09:00:00Z'},
+            {'item': self.jeans.pk, 'idempotency_key': 'phone-3'},
+        ]}
+        first = self.post(reverse('wardrobe_api:bulk-wear-events'), batch)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['recorded'], 3)
+        self.assertEqual(self.wear_totals(), ([2, 1], 3, 2))
+
+        retry = self.post(reverse('wardrobe_api:bulk-wear-events'), batch)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json()['recorded'], 0)
+        self.assertEqual(sorted(retry.json()['duplicates']), ['phone-1', 'phone-2', 'phone-3'])
+        self.assertEqual(self.wear_totals(), ([2, 1], 3, 2))
+        self.assertEqual(WearEvent.objects.filter(user=self.user).count(), 3)
+
+    def test_retried_outfit_wear_is_recorded_once(self):
+        outfit = Outfit.objects.create(user=self.user, name='Casual', occasion='casual')
+        outfit.items.add(self.shirt, self.jeans)
+        for _ in range(2):
+            response = self.post(reverse('wardrobe_api:outfit-wear', args=[outfit.pk]), {'idempotency_key': 'sunday'})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.wear_totals(), ([1, 1], 2, 1))
+
+
+class SearchTests(WardrobeTestCase):
+    def search(self, query, user=None):
+        user = user or self.user
+        return [item.name for item in search_items(WardrobeItem.objects.filter(user=user), user, query)]
+
+    def test_matches_words_by_prefix_across_fields(self):
+        self.add_item(name='Oxford shirt', brand='Uniqlo', color='Light Blue', tags=['work', 'cotton'])
+        self.add_item(name='Denim jacket', category='Outerwear', color='blue', tags=['casual'])
+        self.assertEqual(self.search('oxf'), ['Oxford shirt'])
+        self.assertEqual(self.search('uniqlo cotton'), ['Oxford shirt'])
+        self.assertEqual(sorted(self.search('blue')), ['Denim jacket', 'Oxford shirt'])
+        self.assertEqual(self.search('wool'), [])
+        # Quotes and operators are searched as plain words
+        self.assertEqual(self.search('"denim" OR NOT'), [])
+
+    def test_only_searches_the_users_items(self):
+        other = User.objects.create_user('other', password='pw')
+        with self.captureOnCommitCallbacks(execute=True):
+            WardrobeItem.objects.create(user=other, name='Wool coat', category='Outerwear', color='gray')
+        self.assertEqual(self.search('wool'), [])
+        self.assertEqual(self.search('wool', user=other), ['Wool coat'])
+
+    def test_name_matches_rank_first(self):
+        self.add_item(name='Scarf', category='Accessories', color='gray', tags=['wool', 'winter'])
+        self.add_item(name='Wool sweater', color='navy')
+        self.add_item(name='Beanie', category='Accessories', color='black', brand='Wool&Co')
+        self.assertEqual(self.search('wool')[0], 'Wool sweater')
+
+    def test_saves_and_deletes_update_the_index(self):
+        item = self.add_item(name='Polo')
+        item.name = 'Rugby shirt'
+        item.save(update_fields=['name'])
+        self.assertEqual(self.search('polo'), [])
+        self.assertEqual(self.search('rugby'), ['Rugby shirt'])
+
+        item.delete()
+        self.assertEqual(self.search('rugby'), [])
+
+    def test_api_search(self):
+        self.add_item(name='Chinos', category='Bottoms', color='khaki')
+        self.add_item(name='Jeans', category='Bottoms', color='blue')
+        response = self.client.get(reverse('wardrobe_api:wardrobe-items'), {'q': 'chin'})
+        self.assertEqual([item['name'] for item in response.json()['results']], ['Chinos'])
+
+    def test_migration_indexes_existing_items(self):
+        # Rows the signals never saw: bulk inserts and a queryset update
+        items = generate_items(self.user, 20, random.Random(5))
+        shirt = self.add_item(name='Linen shirt')
+        WardrobeItem.objects.filter(pk=shirt.pk).update(name='Linen blazer')
+        self.assertEqual(self.search(items[0].name), [])
+
+        migration = import_module('wardrobe.migrations.0009_item_search_index')
+        migration.create_search_index(apps, SimpleNamespace(connection=connection))
+        for item in items:
+            self.assertIn(item.name, self.search(item.name))
+        self.assertEqual(self.search('linen'), ['Linen blazer'])
+        self.assertEqual(self.search('shirt linen'), [])
+
+
+class HexColorMigrationTests(WardrobeTestCase):
+    def test_refreshes_stored_families(self):
+        hex_item = self.add_item(color='#1F2A5C')
+        named = self.add_item(name='Chinos', category='Bottoms', color='khaki')
+        WardrobeItem.objects.filter(pk=hex_item.pk).update(color_family='f a c')
+        migration = import_module('wardrobe.migrations.0010_hex_color_families')
+        migration.refresh_hex_color_families(apps, None)
+        families = dict(WardrobeItem.objects.values_list('pk', 'color_family'))
+        self.assertEqual(families, {hex_item.pk: 'navy', named.pk: 'beige'})
+
+
+class KeysetPaginationTests(WardrobeTestCase):
+    def walk(self, params):
+        """Names on every page of the item list API, following next links"""
+        pages = []
+        url = reverse('wardrobe_api:wardrobe-items')
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            pages.append([item['name'] for item in response.json()['results']])
+            url, params = response.json()['next'], None
+        return pages
+
+    def test_ties_on_the_sort_key_span_pages(self):
+        items = [self.add_item(name=f'Shirt {index}') for index in range(7)]
+        # Same created_at for every row: only the id tie-break orders them
+        WardrobeItem.objects.filter(user=self.user).update(created_at=timezone.now())
+        pages = self.walk({'page_size': 3})
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), [item.name for item in reversed(items)])
+
+    def test_last_page(self):
+        for index in range(4):
+            self.add_item(name=f'Shirt {index}')
+        # A full last page has no next link, rather than one to an empty page
+        self.assertEqual([len(page) for page in self.walk({'page_size': 2})], [2, 2])
+        self.assertEqual(self.walk({'page_size': 10}), [['Shirt 3', 'Shirt 2', 'Shirt 1', 'Shirt 0']])
+
+    def test_invalid_cursor(self):
+        self.add_item()
+        url = reverse('wardrobe_api:wardrobe-items')
+        created = '2026-01-01T00:00:00+00:00'
+        for cursor in [
+            'not base64!', 'e30', encode_cursor([created]), encode_cursor(['yesterday', 1]),
+            encode_cursor([5, 1]), encode_cursor([created, 2 ** 70]),
+        ]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('cursor', response.json())
+        # Template pages start over from the first page instead
+        response = self.client.get(reverse('wardrobe:wardrobe_list'), {'cursor': 'not base64!'})
+        self.assertEqual(response.status_code, 200)
+
+
+class ExportTests(WardrobeTestCase):
+    def export(self, fmt, **params):
+        response = self.client.get(reverse('wardrobe_api:export', args=[fmt]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response
+
+    def test_csv_columns_and_rows(self):
+        self.add_item(name='Oxford', tags=['work', 'cotton'])
+        self.add_item(name='Jeans', category='Bottoms', color='blue', price=Decimal('59.90'))
+        rows = list(csv.reader(io.StringIO(b''.join(self.export('csv').streaming_content).decode())))
+        self.assertEqual(rows[0], list(SECTIONS['items'][2]))
+        self.assertEqual(len(rows), 3)
+        records = {row[1]: dict(zip(rows[0], row)) for row in rows[1:]}
+        self.assertEqual(records['Oxford']['tags'], 'work, cotton')
+        self.assertEqual(records['Jeans']['price'], '59.90')
+
+    def test_jsonl_and_zip_cover_every_section(self):
+        shirt = self.add_item()
+        outfit = Outfit.objects.create(user=self.user, name='Office', occasion='work')
+        outfit.items.add(shirt)
+        lines = [json.loads(line) for line in b''.join(self.export('jsonl').streaming_content).splitlines()]
+        self.assertEqual([line['type'] for line in lines], ['items', 'outfits', 'outfit_items'])
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(self.export('zip').streaming_content)))
+        self.assertEqual(archive.namelist(), [f'{section}.csv' for section in SECTIONS])
+        self.assertEqual(len(archive.read('items.csv').decode().splitlines()), 2)
+
+    def export_cost(self, items):
+        """Rows streamed and peak traced memory of a CSV export, without keeping the output"""
+        WardrobeItem.objects.filter(user=self.user).delete()
+        generate_items(self.user, items, random.Random(0))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.export('csv')
+        # Nothing is read until the body is consumed
+        self.assertFalse([query for query in queries if 'wardrobe_wardrobeitem' in query['sql']])
+        rows = 0
+        tracemalloc.start()
+        try:
+            for chunk in response.streaming_content:
+                rows += chunk.count(b'\n')
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(rows, items + 1)
+        return peak
+
+    def test_streams_in_chunks(self):
+        small = self.export_cost(1500)
+        large = self.export_cost(6000)
+        self.assertLess(large, small * 1.5)
+
+
+class OutfitGeneratorTests(WardrobeTestCase):
+    def brute_force(self, items, occasion, k):
+        """Every complete outfit scored directly with the engine's rules, best first"""
+        engine = AIRecommendationEngine()
+        by_slot = {slot: [item for item in items if item.category == slot]
+                   for slot in ('Tops', 'Bottoms', 'Shoes', 'Outerwear', 'Accessories')}
+        outfits = []
+        for outerwear in by_slot['Outerwear'] + [None]:
+            for accessory in by_slot['Accessories'] + [None]:
+                for top in by_slot['Tops']:
+                    for bottom in by_slot['Bottoms']:
+                        for shoes in by_slot['Shoes']:
+                            chosen = [item for item in (top, bottom, shoes, outerwear, accessory) if item]
+                            pairs = [
+                                (engine._calculate_compatibility(a, b) + engine._calculate_compatibility(b, a)) / 2
+                                for index, a in enumerate(chosen) for b in chosen[index + 1:]
+                            ]
+                            fit = [
+                                OutfitGenerator._occasion_fit(item, item_features(item), occasion) for item in chosen
+                            ]
+                            score = PAIR_WEIGHT * sum(pairs) / len(pairs) + FIT_WEIGHT * sum(fit) / len(fit)
+                            outfits.append(round(score, 4))
+        return sorted(outfits, reverse=True)[:k]
+
+    def test_matches_exhaustive_search_on_a_small_wardrobe(self):
+        generate_items(self.user, 18, random.Random(11))
+        items = load_candidates(self.user)
+        for occasion in ('', 'work', 'formal'):
+            with self.subTest(occasion=occasion):
+                suggestions = OutfitGenerator(items).suggest(occasion=occasion, k=5)
+                self.assertEqual([suggestion['score'] for suggestion in suggestions],
+                                 self.brute_force(items, occasion, 5))
+
+    def test_outfits_are_complete(self):
+        generate_items(self.user, 200, random.Random(2))
+        suggestions = OutfitGenerator(load_candidates(self.user)).suggest(occasion='casual', season='summer', k=5)
+        self.assertEqual(len(suggestions), 5)
+        self.assertEqual([s['score'] for s in suggestions], sorted((s['score'] for s in suggestions), reverse=True))
+        for suggestion in suggestions:
+            categories = [item.category for item in suggestion['items']]
+            self.assertEqual(len(categories), len(set(categories)))
+            self.assertTrue({'Tops', 'Bottoms', 'Shoes'} <= set(categories))
+            for item in suggestion['items']:
+                mask = item_features(item)['season_mask']
+                self.assertTrue(not mask or mask & 2, item)
+
+    def test_needs_every_required_slot(self):
+        self.add_item()
+        self.add_item(name='Jeans', category='Bottoms', color='blue')
+        self.assertEqual(OutfitGenerator(load_candidates(self.user)).suggest(), [])
+
+    def test_large_wardrobe_within_budget(self):
+        generate_items(self.user, 1500, random.Random(4))
+        url = reverse('wardrobe_api:outfit-suggest')
+        # Warm the snapshot cache and the response cache key lookups
+        self.client.get(url, {'occasion': 'work', 'k': 5})
+        with query_budget('outfit suggest', queries=6, total_ms=100):
+            response = self.client.get(url, {'occasion': 'work', 'season': 'fall', 'k': 5})
+        self.assertEqual(len(response.json()['outfits']), 5)
@@ -0,0 +1,116 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Set
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from .models import WardrobeItem
+from .thumbnails import ImageFetchError, build_thumbnails
+from .versions import bump_wardrobe_version
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+# image_url -> ids of the items waiting for it, present while a job for it is
+# queued or running, so each image is fetched once
+_pending: Dict[str, Set[int]] = {}
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'WARDROBE_THUMBNAIL_WORKERS', 2),
+            thread_name_prefix='thumbnails'
+        )
+    return _executor
+
+
+def thumbnails_enabled() -> bool:
+    return getattr(settings, 'WARDROBE_THUMBNAILS', True)
+
+
+def needs_thumbnails(item) -> bool:
+    """Thumbnails were never attempted for the item's current image_url"""
+    return bool(item.image_url) and item.thumbnail_source != item.image_url
+
+
+def _save(url: str, item_ids: Iterable[int], thumbnails):
+    """Record the result on the items still showing `url`"""
+    items = WardrobeItem.objects.filter(pk__in=list(item_ids), image_url=url)
+    user_ids = set(items.values_list('user_id', flat=True))
+    items.update(thumbnails=thumbnails, thumbnail_source=url)
+    # Cached pages and API responses embed the image URLs
+    for user_id in user_ids:
+        bump_wardrobe_version(user_id)
+
+
+def process_image(url: str, item_ids: Iterable[int], reuse: bool = True) -> Dict[str, Dict[str, str]]:
+    """
+    Build thumbnails for one image URL, record them on the given items and return
+    them. With `reuse`, an image some item already has thumbnails for is not fetched
+    again. A failure is recorded as empty thumbnails, so pages keep showing image_url
+    and the image is not retried on every save (see the generate_thumbnails command).
+    """
+    existing = None
+    if reuse:
+        existing = WardrobeItem.objects.filter(thumbnail_source=url).exclude(thumbnails={}).values_list(
+            'thumbnails', flat=True
+        ).first()
+    if existing:
+        thumbnails = existing
+    else:
+        try:
+            thumbnails = build_thumbnails(url)
+        except (ImageFetchError, ValueError) as exc:
+            logger.warning(f"No thumbnails for {url}: {exc}")
+            thumbnails = {}
+    _save(url, item_ids, thumbnails)
+    return thumbnails
+
+
+def _run(url: str):
+    # Items queued for the same URL while this job runs are handled here too
+    while True:
+        with _lock:
+            item_ids = _pending[url]
+            if not item_ids:
+                del _pending[url]
+                return
+            _pending[url] = set()
+        try:
+            process_image(url, item_ids)
+        except Exception as e:
+            logger.error(f"Error in background thumbnail job: {str(e)}")
+        finally:
+            close_old_connections()
+
+
+def schedule_thumbnails(items: Iterable) -> int:
+    """
+    Queue thumbnail generation for items whose image changed, once the current
+    transaction commits. With WARDROBE_THUMBNAIL_WORKERS = 0 the work runs inline
+    at commit instead, which is what tests want. Returns how many items were queued.
+    """
+    by_url: Dict[str, Set[int]] = {}
+    for item in items:
+        if needs_thumbnails(item):
+            by_url.setdefault(item.image_url, set()).add(item.pk)
+    if not by_url or not thumbnails_enabled():
+        return 0
+
+    def submit():
+        inline = getattr(settings, 'WARDROBE_THUMBNAIL_WORKERS', 2) <= 0
+        for url, item_ids in by_url.items():
+            if inline:
+                process_image(url, item_ids)
+                continue
+            with _lock:
+                queued = url in _pending
+                _pending.setdefault(url, set()).update(item_ids)
+            if not queued:
+                _get_executor().submit(_run, url)
+
+    transaction.on_commit(submit)
+    return sum(len(item_ids) for item_ids in by_url.values())
@@ -0,0 +1,246 @@
+import abc
+import hashlib
+import io
+import ipaddress
+import logging
+import re
+import socket
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Thumbnails live under MEDIA_ROOT/thumbs/, named by a hash of their own bytes so
+# they never change once written and can be cached by browsers for good
+THUMBNAIL_DIR = 'thumbs'
+THUMBNAIL_NAME = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{20}-\d{1,4}\.(webp|avif)$')
+CONTENT_TYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+# Preferred first in <picture> sources
+FORMAT_ORDER = ('avif', 'webp')
+ENCODER_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'avif': {'format': 'AVIF', 'quality': 60},
+}
+MAX_REDIRECTS = 3
+
+
+class ImageFetchError(Exception):
+    """The source image could not be fetched"""
+
+
+class ImageFetcher(abc.ABC):
+    """Fetches source images by URL; subclasses implement fetch()"""
+
+    def __init__(self):
+        self.max_bytes = getattr(settings, 'WARDROBE_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+        self.timeout = getattr(settings, 'WARDROBE_IMAGE_FETCH_TIMEOUT', 10)
+
+    @abc.abstractmethod
+    def fetch(self, url: str) -> bytes:
+        """The image's bytes; raises ImageFetchError when it cannot be fetched"""
+
+
+def check_public_url(url: str):
+    """
+    Reject URLs that are not http(s) or whose host resolves to anything but a global
+    address (loopback, private networks, link-local cloud metadata and the like), so
+    item image URLs cannot be used to reach internal services.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ImageFetchError(f'Unsupported URL: {url}')
+    try:
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        addresses = socket.getaddrinfo(parsed.hostname, port, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError, ValueError) as exc:
+        raise ImageFetchError(f'Cannot resolve {url}: {exc}') from exc
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split('%')[0])
+        if not address.is_global or address.is_multicast:
+            raise ImageFetchError(f'Refusing to fetch {url}: {address} is not a public address')
+
+
+class HTTPImageFetcher(ImageFetcher):
+    """
+    Downloads over HTTP(S), streaming so oversized images are abandoned early. Only
+    public hosts are fetched, and redirects are followed by hand so every hop is checked.
+    """
+
+    def __init__(self):
+        super().__init__()
+        import requests
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'StyleVault thumbnailer'
+
+    def fetch(self, url: str) -> bytes:
+        import requests
+        target = url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                check_public_url(target)
+                with self.session.get(target, stream=True, timeout=self.timeout, allow_redirects=False) as response:
+                    if response.is_redirect:
+                        target = urljoin(target, response.headers['Location'])
+                        continue
+                    response.raise_for_status()
+                    chunks, size = [], 0
+                    for chunk in response.iter_content(64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise ImageFetchError(f'Image larger than {self.max_bytes} bytes: {url}')
+                        chunks.append(chunk)
+                    return b''.join(chunks)
+        except requests.RequestException as exc:
+            raise ImageFetchError(f'Cannot fetch {url}: {exc}') from exc
+        raise ImageFetchError(f'Too many redirects: {url}')
+
+
+class LocalImageFetcher(ImageFetcher):
+    """
+    Reads images from settings.WARDROBE_IMAGE_FETCHER_ROOT instead of the network,
+    by URL path: https://example.com/items/3.jpg -> <root>/items/3.jpg
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.root = Path(getattr(settings, 'WARDROBE_IMAGE_FETCHER_ROOT', settings.MEDIA_ROOT)).resolve()
+
+    def fetch(self, url: str) -> bytes:
+        path = (self.root / urlparse(url).path.lstrip('/')).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            raise ImageFetchError(f'No local image for {url}')
+        if path.stat().st_size > self.max_bytes:
+            raise ImageFetchError(f'Image larger than {self.max_bytes} bytes: {url}')
+        return path.read_bytes()
+
+
+@lru_cache(maxsize=None)
+def _load_fetcher(path: str) -> ImageFetcher:
+    return import_string(path)()
+
+
+def get_image_fetcher() -> ImageFetcher:
+    """The process-wide fetcher named by settings.WARDROBE_IMAGE_FETCHER"""
+    return _load_fetcher(getattr(settings, 'WARDROBE_IMAGE_FETCHER', 'wardrobe.thumbnails.HTTPImageFetcher'))
+
+
+@receiver(setting_changed)
+def reset_image_fetcher(setting, **kwargs):
+    if setting.startswith('WARDROBE_IMAGE_'):
+        _load_fetcher.cache_clear()
+
+
+def thumbnail_sizes() -> List[int]:
+    """Bounding box edges in pixels, largest first"""
+    return sorted(getattr(settings, 'WARDROBE_THUMBNAIL_SIZES', (160, 320, 640)), reverse=True)
+
+
+@lru_cache(maxsize=1)
+def supported_formats() -> tuple:
+    """Configured formats this Pillow build can encode (AVIF needs Pillow 11.2+ or pillow-avif-plugin)"""
+    from PIL import Image
+    Image.init()
+    wanted = getattr(settings, 'WARDROBE_THUMBNAIL_FORMATS', FORMAT_ORDER)
+    formats = tuple(fmt for fmt in FORMAT_ORDER if fmt in wanted and ENCODER_OPTIONS[fmt]['format'] in Image.SAVE)
+    skipped = set(wanted) - set(formats)
+    if skipped:
+        logger.info(f"Thumbnail formats not supported by Pillow, skipped: {', '.join(sorted(skipped))}")
+    return formats
+
+
+def render_thumbnails(data: bytes) -> Dict[str, Dict[int, bytes]]:
+    """
+    Encoded thumbnails of an image, {format: {size: bytes}}. Each is scaled to fit
+    a size x size box (never enlarged), rotated per its EXIF orientation and written
+    without metadata. Raises ValueError for anything Pillow cannot decode.
+    """
+    from PIL import Image, ImageOps
+
+    sizes = thumbnail_sizes()
+    max_pixels = getattr(settings, 'WARDROBE_IMAGE_MAX_PIXELS', 40_000_000)
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > max_pixels:
+                raise ValueError(f'Image of {source.width}x{source.height} exceeds {max_pixels} pixels')
+            # JPEGs decode straight to a reduced scale close to the largest thumbnail
+            source.draft('RGB', (sizes[0], sizes[0]))
+            image = ImageOps.exif_transpose(source)
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ValueError(f'Unreadable image: {exc}') from exc
+
+    rendered = {fmt: {} for fmt in supported_formats()}
+    # Each size is scaled down from the previous one rather than from the original
+    for size in sizes:
+        image.thumbnail((size, size), Image.LANCZOS)
+        for fmt, by_size in rendered.items():
+            buffer = io.BytesIO()
+            image.save(buffer, **ENCODER_OPTIONS[fmt])
+            by_size[size] = buffer.getvalue()
+    return rendered
+
+
+def store_thumbnail(data: bytes, size: int, fmt: str) -> str:
+    """Save under a content-hashed name and return it; identical thumbnails are stored once"""
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    name = f'{THUMBNAIL_DIR}/{digest[:2]}/{digest}-{size}.{fmt}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def build_thumbnails(url: str) -> Dict[str, Dict[str, str]]:
+    """
+    Fetch an image once and store its thumbnails, returning the stored names as
+    {format: {size: name}} for WardrobeItem.thumbnails (sizes are strings, as in JSON).
+    """
+    rendered = render_thumbnails(get_image_fetcher().fetch(url))
+    return {
+        fmt: {str(size): store_thumbnail(data, size, fmt) for size, data in by_size.items()}
+        for fmt, by_size in rendered.items()
+    }
+
+
+def thumbnail_urls(thumbnails: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Stored names mapped to their media URLs"""
+    return {
+        fmt: {size: default_storage.url(name) for size, name in by_size.items()}
+        for fmt, by_size in thumbnails.items()
+    }
+
+
+def pick_thumbnail(thumbnails: Dict[str, Dict[str, str]], size: Optional[int] = None) -> Optional[str]:
+    """
+    URL of the WebP thumbnail (the format every browser decodes) closest to `size`
+    from above, or the largest one; None when there are no thumbnails
+    """
+    by_size = thumbnails.get('webp')
+    if not by_size:
+        return None
+    size = size or getattr(settings, 'WARDROBE_THUMBNAIL_DEFAULT_SIZE', 320)
+    sizes = sorted(int(key) for key in by_size)
+    chosen = next((candidate for candidate in sizes if candidate >= size), sizes[-1])
+    return default_storage.url(by_size[str(chosen)])
+
+
+def picture_sources(thumbnails: Dict[str, Dict[str, str]]) -> List[Dict[str, str]]:
+    """<source> type and srcset per format, best compression first"""
+    return [
+        {
+            'type': CONTENT_TYPES[fmt],
+            'srcset': ', '.join(
+                f'{default_storage.url(name)} {size}w'
+                for size, name in sorted(thumbnails[fmt].items(), key=lambda entry: int(entry[0]))
+            ),
+        }
+        for fmt in FORMAT_ORDER if thumbnails.get(fmt)
+    ]
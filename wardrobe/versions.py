@@ -0,0 +1,32 @@
+import time
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from .models import WardrobeVersion
+
+
+def wardrobe_version(user_id: int) -> int:
+    """
+    Current version stamp of a user's wardrobe (items, outfits and wears), 0 until
+    the first write. Stamps live in the database, so every process sees the same one,
+    and are nanosecond clock values, so a rebuilt database never reuses an old one.
+    """
+    return WardrobeVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+
+
+def _bump(user_id: int):
+    # Never moves backwards, even if clocks differ between processes
+    newer = Greatest(F('version') + 1, Value(time.time_ns(), output_field=models.BigIntegerField()))
+    if WardrobeVersion.objects.filter(user_id=user_id).update(version=newer):
+        return
+    try:
+        with transaction.atomic():
+            WardrobeVersion.objects.create(user_id=user_id, version=time.time_ns())
+    except IntegrityError:
+        # Created by a concurrent bump
+        WardrobeVersion.objects.filter(user_id=user_id).update(version=newer)
+
+
+def bump_wardrobe_version(user_id: int):
+    """Invalidate everything cached for a user's wardrobe once the current transaction commits"""
+    transaction.on_commit(lambda: _bump(user_id))
@@ -1,11 +1,18 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Sum, Avg
-from django.http import JsonResponse
-from django.core.paginator import Paginator
+from django.http import FileResponse, Http404, HttpResponseNotModified, JsonResponse
+from django.core.files.storage import default_storage
+from django.views.decorators.http import require_safe
 from .models import WardrobeItem, Outfit
 from .forms import WardrobeItemForm, OutfitForm, WardrobeFilterForm
+from .analytics import build_analytics
+from .stats import get_wardrobe_stats, get_histograms
+from .wear import record_wear
+from .search import search_items
+from .pagination import paginate_request
+from .outfits import with_item_count, with_preview_items, with_items
+from .thumbnails import CONTENT_TYPES, THUMBNAIL_DIR, THUMBNAIL_NAME
 import json
 
 def landing_page(request):
@@ -19,21 +26,23 @@ def dashboard(request):
     """Main dashboard with analytics"""
     user = request.user
     
-    # Get wardrobe statistics
+    # Get wardrobe statistics from the per-user rollup
     wardrobe_items = WardrobeItem.objects.filter(user=user)
     outfits = Outfit.objects.filter(user=user)
     
+    wardrobe_stats = get_wardrobe_stats(user)
     stats = {
-        'total_items': wardrobe_items.count(),
-        'total_value': wardrobe_items.aggregate(Sum('price'))['price__sum'] or 0,
-        'total_outfits': outfits.count(),
-        'avg_wear_count': wardrobe_items.aggregate(Avg('wear_count'))['wear_count__avg'] or 0,
+        'total_items': wardrobe_stats.total_items,
+        'total_value': wardrobe_stats.total_value,
+        'total_outfits': wardrobe_stats.total_outfits,
+        'avg_wear_count': wardrobe_stats.avg_wear_count,
     }
     
     # Category breakdown
-    category_stats = wardrobe_items.values('category').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    category_stats = [
+        {'category': bucket.value, 'count': bucket.count}
+        for bucket in get_histograms(user)['category']
+    ]
     
     # Most worn items
     most_worn = wardrobe_items.order_by('-wear_count')[:5]
@@ -69,11 +78,8 @@ def wardrobe_list(request):
         brand = form.cleaned_data.get('brand')
         
         if search:
-            items = items.filter(
-                Q(name__icontains=search) |
-                Q(brand__icontains=search) |
-                Q(color__icontains=search)
-            )
+            # Ranked full-text search over name, brand, color and tags
+            items = search_items(items, request.user, search)
         
         if category:
             items = items.filter(category=category)
@@ -84,10 +90,8 @@ def wardrobe_list(request):
         if brand:
             items = items.filter(brand__icontains=brand)
     
-    # Pagination
-    paginator = Paginator(items, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination: cost does not grow with page depth
+    page_obj = paginate_request(request, items, 12)
     
     context = {
         'form': form,
@@ -156,12 +160,10 @@ def wardrobe_delete(request, pk):
 @login_required
 def outfit_list(request):
     """List all outfits"""
-    outfits = Outfit.objects.filter(user=request.user).prefetch_related('items')
+    outfits = with_preview_items(with_item_count(Outfit.objects.filter(user=request.user)))
     
-    # Pagination
-    paginator = Paginator(outfits, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination: cost does not grow with page depth
+    page_obj = paginate_request(request, outfits, 9)
     
     return render(request, 'wardrobe/outfit_list.html', {
         'page_obj': page_obj,
@@ -191,7 +193,7 @@ def outfit_add(request):
 @login_required
 def outfit_detail(request, pk):
     """View outfit details"""
-    outfit = get_object_or_404(Outfit, pk=pk, user=request.user)
+    outfit = get_object_or_404(with_items(Outfit.objects.all()), pk=pk, user=request.user)
     return render(request, 'wardrobe/outfit_detail.html', {'outfit': outfit})
 
 @login_required
@@ -212,58 +214,25 @@ def increment_wear_count(request, pk):
     """Increment wear count for an item (AJAX)"""
     if request.method == 'POST':
         item = get_object_or_404(WardrobeItem, pk=pk, user=request.user)
-        item.wear_count += 1
-        item.save()
-        return JsonResponse({'success': True, 'new_count': item.wear_count})
+        new_count = record_wear(item)
+        return JsonResponse({'success': True, 'new_count': new_count})
     
     return JsonResponse({'success': False})
 
 @login_required
 def analytics(request):
     """Advanced analytics page"""
-    user = request.user
-    items = WardrobeItem.objects.filter(user=user)
-    outfits = Outfit.objects.filter(user=user)
-    
-    # Category analysis
-    category_data = items.values('category').annotate(
-        count=Count('id'),
-        total_value=Sum('price'),
-        avg_wear=Avg('wear_count')
-    ).order_by('-count')
-    
-    # Color analysis
-    color_data = items.values('color').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]
-    
-    # Brand analysis
-    brand_data = items.exclude(brand='').values('brand').annotate(
-        count=Count('id'),
-        total_value=Sum('price')
-    ).order_by('-count')[:10]
-    
-    # Wear patterns
-    most_worn = items.order_by('-wear_count')[:10]
-    least_worn = items.filter(wear_count__lt=3)
-    
-    # Price analysis
-    price_ranges = {
-        'under_50': items.filter(price__lt=50).count(),
-        '50_to_100': items.filter(price__gte=50, price__lt=100).count(),
-        '100_to_200': items.filter(price__gte=100, price__lt=200).count(),
-        'over_200': items.filter(price__gte=200).count(),
-    }
+    data = build_analytics(request.user, least_worn_limit=None)
     
     context = {
-        'category_data': category_data,
-        'color_data': color_data,
-        'brand_data': brand_data,
-        'most_worn': most_worn,
-        'least_worn': least_worn,
-        'price_ranges': price_ranges,
-        'total_items': items.count(),
-        'total_outfits': outfits.count(),
+        'category_data': data['category_data'],
+        'color_data': data['color_data'],
+        'brand_data': data['brand_data'],
+        'most_worn': data['most_worn'],
+        'least_worn': data['least_worn'],
+        'price_ranges': data['price_ranges'],
+        'total_items': data['total_items'],
+        'total_outfits': data['total_outfits'],
     }
     
     return render(request, 'wardrobe/analytics.html', context)
@@ -314,4 +283,26 @@ def recommendations(request):
         'total_items': items.count(),
     }
     
-    return render(request, 'wardrobe/recommendations.html', context)
\ No newline at end of file
+    return render(request, 'wardrobe/recommendations.html', context)
+
+
+# Thumbnail names change with their content, so browsers and proxies may keep them forever
+THUMBNAIL_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+@require_safe
+def serve_thumbnail(request, name):
+    """Serve a content-hashed thumbnail from MEDIA_ROOT/thumbs/ with far-future caching"""
+    if not THUMBNAIL_NAME.match(name):
+        raise Http404
+    etag = f'"{name.rsplit("/", 1)[-1]}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        try:
+            handle = default_storage.open(f'{THUMBNAIL_DIR}/{name}')
+        except FileNotFoundError:
+            raise Http404
+        response = FileResponse(handle, content_type=CONTENT_TYPES[name.rsplit('.', 1)[-1]])
+    response['ETag'] = etag
+    response['Cache-Control'] = THUMBNAIL_CACHE_CONTROL
+    return response
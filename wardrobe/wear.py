@@ -0,0 +1,88 @@
+from collections import namedtuple
+from django.db import transaction
+from django.db.models import F, Q, Case, When, Value
+from django.utils import timezone
+from typing import List, Dict, Any
+from .models import WardrobeItem, WearEvent
+from .stats import record_items_worn
+from .versions import bump_wardrobe_version
+
+Wear = namedtuple('Wear', ['item', 'worn_at', 'outfit', 'idempotency_key'], defaults=[None, None, None])
+
+
+def _worn_on(worn_at):
+    return timezone.localdate(worn_at) if timezone.is_aware(worn_at) else worn_at.date()
+
+
+@transaction.atomic
+def record_wears(user_id, wears: List[Wear]) -> Dict[str, Any]:
+    """
+    Log many wears for one user's items in a single transaction.
+
+    Events whose idempotency key was already recorded are skipped, new events are
+    inserted with one bulk_create, and every touched item's wear_count and last_worn
+    are bumped by one UPDATE ... CASE, so concurrent writers never lose increments.
+    """
+    now = timezone.now()
+    wears = [wear._replace(worn_at=wear.worn_at or now) for wear in wears]
+
+    keys = {wear.idempotency_key for wear in wears if wear.idempotency_key}
+    seen = set(WearEvent.objects.filter(user_id=user_id, idempotency_key__in=keys).values_list('idempotency_key', flat=True))
+
+    new_wears, duplicates = [], []
+    for wear in wears:
+        if wear.idempotency_key and wear.idempotency_key in seen:
+            duplicates.append(wear.idempotency_key)
+            continue
+        if wear.idempotency_key:
+            seen.add(wear.idempotency_key)
+        new_wears.append(wear)
+
+    WearEvent.objects.bulk_create([
+        WearEvent(
+            user_id=user_id,
+            wardrobe_item=wear.item,
+            outfit=wear.outfit,
+            worn_at=wear.worn_at,
+            idempotency_key=wear.idempotency_key,
+        )
+        for wear in new_wears
+    ])
+
+    items, counts, last_worn = {}, {}, {}
+    for wear in new_wears:
+        pk = wear.item.pk
+        items[pk] = wear.item
+        counts[pk] = counts.get(pk, 0) + 1
+        last_worn[pk] = max(last_worn.get(pk, _worn_on(wear.worn_at)), _worn_on(wear.worn_at))
+
+    if counts:
+        WardrobeItem.objects.filter(pk__in=counts).update(
+            wear_count=F('wear_count') + Case(
+                *[When(pk=pk, then=Value(count)) for pk, count in counts.items()],
+                default=Value(0)
+            ),
+            # Backdated wears never move last_worn backwards
+            last_worn=Case(
+                *[When(Q(pk=pk) & (Q(last_worn__isnull=True) | Q(last_worn__lt=day)), then=Value(day))
+                  for pk, day in last_worn.items()],
+                default=F('last_worn')
+            ),
+            updated_at=now,
+        )
+        record_items_worn([(items[pk], count) for pk, count in counts.items()])
+        # The queryset update skips the post_save signals
+        bump_wardrobe_version(user_id)
+
+    return {
+        'recorded': len(new_wears),
+        'duplicates': duplicates,
+        'items': list(WardrobeItem.objects.filter(pk__in=counts).values('id', 'wear_count', 'last_worn')),
+    }
+
+
+def record_wear(item, outfit=None, worn_at=None) -> int:
+    """Log one wear of an item and return its new wear count"""
+    result = record_wears(item.user_id, [Wear(item, worn_at, outfit)])
+    item.wear_count, item.last_worn = result['items'][0]['wear_count'], result['items'][0]['last_worn']
+    return item.wear_count